@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NumPy dynamics processor against the pydub compress_dynamic_range path
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from time import time
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
+
+import numpy as np
+from pydub import AudioSegment
+
+from src.utils.audio_dynamics import DynamicsConfig, DynamicsProcessor, rms_dbfs
+
+SETTINGS = DynamicsConfig(target_loudness=-18.0, attack=10.0, release=50.0, threshold=-24.0, ratio=2.0)
+
+
+def make_test_audio(path: Path, seconds: int, sample_rate=24000):
+    """Speech-like test signal: amplitude-modulated tones with pauses"""
+    t = np.arange(seconds * sample_rate) / sample_rate
+    envelope = (0.2 + 0.8 * (np.sin(2 * np.pi * 0.7 * t) > 0)) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    signal = 0.6 * envelope * np.sin(2 * np.pi * 220 * t) + 0.05 * np.random.default_rng(0).standard_normal(len(t))
+    pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+    AudioSegment(pcm.tobytes(), frame_rate=sample_rate, sample_width=2, channels=1).export(str(path), format="mp3")
+
+
+def pydub_enhance(path: Path):
+    audio = AudioSegment.from_file(str(path))
+    enhanced = (
+        audio.apply_gain(-audio.dBFS + SETTINGS.target_loudness)
+        .compress_dynamic_range(
+            threshold=SETTINGS.threshold, ratio=SETTINGS.ratio, attack=SETTINGS.attack, release=SETTINGS.release
+        )
+        .normalize(headroom=0.1)
+    )
+    enhanced.export(str(path), format="mp3", parameters=["-q:a", "2"])
+
+
+def numpy_enhance(path: Path):
+    DynamicsProcessor(SETTINGS).process_file(path)
+
+
+def level(path: Path):
+    audio = AudioSegment.from_file(str(path))
+    samples = np.array(audio.get_array_of_samples(), dtype=np.float32) / 32768
+    return rms_dbfs(samples), float(np.max(np.abs(samples)))
+
+
+def benchmark(seconds: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = Path(temp_dir) / "source.mp3"
+        make_test_audio(source, seconds)
+
+        print(f"\n🔄 {seconds}s of audio")
+        for name, enhance in (("numpy", numpy_enhance), ("pydub", pydub_enhance)):
+            target = Path(temp_dir) / f"{name}.mp3"
+            shutil.copy(source, target)
+
+            start_time = time()
+            enhance(target)
+            elapsed = time() - start_time
+
+            rms_db, peak = level(target)
+            print(f"   {name}: {elapsed:.2f}s | rms {rms_db:.2f} dBFS | peak {peak:.3f}")
+
+
+if __name__ == "__main__":
+    durations = [int(arg) for arg in sys.argv[1:]] or [10, 60]
+    for seconds in durations:
+        benchmark(seconds)
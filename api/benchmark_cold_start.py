@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark of src.main:app, with an import-time profile.
+Each run starts a fresh interpreter, imports the app and serves a first request,
+like a new Cloud Run instance would.
+
+    python benchmark_cold_start.py [runs] [top]
+"""
+
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from statistics import median
+from typing import Dict, List, Tuple
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+COLD_START_SNIPPET = """
+import json
+from time import perf_counter
+
+start = perf_counter()
+from src.main import app
+imported = perf_counter()
+
+from fastapi.testclient import TestClient
+
+with TestClient(app) as client:
+    client.get("/")
+served = perf_counter()
+
+print(json.dumps({"import": imported - start, "first_request": served - imported}))
+"""
+
+
+def run_python(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=API_DIR, capture_output=True, text=True, check=True)
+
+
+def import_profile() -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) of every module imported by src.main, from python -X importtime"""
+    result = run_python(["-X", "importtime", "-c", "import src.main"])
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def print_import_profile(top: int):
+    modules = import_profile()
+
+    packages: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+
+    total = sum(packages.values())
+    print(f"\n📦 Import of src.main: {total / 1e6:.2f}s over {len(modules)} modules")
+
+    print(f"\n   Top {top} packages by import time:")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"   {self_us / 1e3:8.1f}ms  {package}")
+
+    print(f"\n   Top {top} src modules by cumulative import time:")
+    src_modules = [module for module in modules if module[0].startswith("src")]
+    for name, _, cumulative_us in sorted(src_modules, key=lambda module: -module[2])[:top]:
+        print(f"   {cumulative_us / 1e3:8.1f}ms  {name}")
+
+
+def benchmark_cold_start(runs: int):
+    timings = [json.loads(run_python(["-c", COLD_START_SNIPPET]).stdout.splitlines()[-1]) for _ in range(runs)]
+
+    print(f"\n🔄 Cold start over {runs} runs")
+    for stage in ("import", "first_request"):
+        values = [timing[stage] for timing in timings]
+        print(f"   {stage}: median {median(values):.2f}s | min {min(values):.2f}s | max {max(values):.2f}s")
+
+    totals = [timing["import"] + timing["first_request"] for timing in timings]
+    print(f"   total: median {median(totals):.2f}s")
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    print_import_profile(top)
+    benchmark_cold_start(runs)
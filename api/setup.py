@@ -24,8 +24,6 @@ setup(
         "google-api-python-client",
         "google-generativeai",
         "ruff",
-        "seewav",
-        "pycairo",
         "watchdog",
         "async-web-search",
     ],
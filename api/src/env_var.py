@@ -16,3 +16,39 @@ CSE_ID = environ["CSE_ID"]
 CSE_API_KEY = environ["GOOGLE_API_KEY"]
 
 PROD_ENV = environ.get("ENV", "dev") == "prod"
+
+TTS_MAX_CONCURRENCY = int(environ.get("TTS_MAX_CONCURRENCY", "8"))
+TTS_REQUESTS_PER_MINUTE = int(environ.get("TTS_REQUESTS_PER_MINUTE", "500"))
+TTS_CHARS_PER_MINUTE = int(environ.get("TTS_CHARS_PER_MINUTE", "200000"))
+
+AUDIO_ENHANCEMENT = environ.get("AUDIO_ENHANCEMENT", "true").lower() == "true"
+
+HLS_PACKAGING = environ.get("HLS_PACKAGING", "false").lower() == "true"
+
+POST_GENERATION_QUEUE = environ.get("POST_GENERATION_QUEUE", "false").lower() == "true"
+# the post-generation worker runs on the API host and can read its local files
+POST_GENERATION_SHARED_HOST = environ.get("POST_GENERATION_SHARED_HOST", "false").lower() == "true"
+
+VIDEO_PRESET = environ.get("VIDEO_PRESET", "veryfast")
+VIDEO_CRF = int(environ.get("VIDEO_CRF", "28"))
+VIDEO_AAC_BITRATE = environ.get("VIDEO_AAC_BITRATE", "192k")
+
+WAVEFORM_VIDEO = environ.get("WAVEFORM_VIDEO", "true").lower() == "true"
+WAVEFORM_PREVIEW = environ.get("WAVEFORM_PREVIEW", "true").lower() == "true"
+WAVEFORM_RENDER_WORKERS = int(environ.get("WAVEFORM_RENDER_WORKERS", "1"))
+
+BLOB_EXISTS_TTL = int(environ.get("BLOB_EXISTS_TTL", "300"))
+BLOB_MISSING_TTL = int(environ.get("BLOB_MISSING_TTL", "10"))
+SIGNED_URL_EXPIRY_MARGIN = int(environ.get("SIGNED_URL_EXPIRY_MARGIN", "3600"))
+
+GCS_CHUNK_SIZE = int(environ.get("GCS_CHUNK_SIZE_MB", "32")) * 1024 * 1024
+GCS_TRANSFER_WORKERS = int(environ.get("GCS_TRANSFER_WORKERS", "8"))
+BLOB_CACHE_MAX_BYTES = int(environ.get("BLOB_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+STORAGE_BACKEND = environ.get("STORAGE_BACKEND", "gcs").lower()
+STORAGE_LOCAL_ROOT = environ.get("STORAGE_LOCAL_ROOT", "/tmp/audiora/storage")
+STORAGE_LATENCY_MS = float(environ.get("STORAGE_LATENCY_MS", "0"))
+STORAGE_BANDWIDTH_MBPS = float(environ.get("STORAGE_BANDWIDTH_MBPS", "0"))
+
+SESSION_CACHE_TTL = float(environ.get("SESSION_CACHE_TTL", "0"))
+SESSION_WRITE_WINDOW = float(environ.get("SESSION_WRITE_WINDOW", "1"))
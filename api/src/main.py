@@ -1,13 +1,14 @@
-from io import BytesIO
 from time import time
 from typing import Any, Callable, Generator
 
 from fastapi import BackgroundTasks, FastAPI, Form, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi_utilities import add_timer_middleware
 
-from .services.storage import BLOB_BASE_URI, StorageManager, UploadItemParams
+from .services.storage import StorageManager, local_blob_cache
+from .services.storage_backends import not_found_error
+from .utils.audiocast_stream import stream_audiocast_segments
 from .utils.chat_request import chat_request
 from .utils.chat_utils import (
     ContentCategory,
@@ -15,6 +16,7 @@ from .utils.chat_utils import (
     SessionChatRequest,
 )
 from .utils.custom_sources.base_utils import SourceContent
+from .utils.custom_sources.content_store import ContentStore, hash_upload
 from .utils.custom_sources.extract_url_content import ExtractURLContent, ExtractURLContentRequest
 from .utils.custom_sources.generate_url_source import (
     CustomSourceManager,
@@ -25,17 +27,19 @@ from .utils.custom_sources.generate_url_source import (
     generate_custom_source,
 )
 from .utils.custom_sources.manage_attachments import ManageAttachments
-from .utils.custom_sources.read_content import ReadContent
 from .utils.custom_sources.save_copied_source import CopiedPasteSourceRequest, save_copied_source
 from .utils.custom_sources.save_uploaded_sources import UploadedFiles
-from .utils.decorators.retry_decorator import RetryConfig, retry
 from .utils.detect_content_category import DetectContentCategoryRequest, detect_content_category
 from .utils.generate_audiocast import GenerateAudioCastRequest, GenerateAudiocastException, generate_audiocast
 from .utils.generate_audiocast_source import GenerateAiSourceRequest, generate_ai_source
 from .utils.get_audiocast import get_audiocast
 from .utils.get_session_title import GetSessionTitleModel, get_session_title
+from .utils.hls_packager import PLAYLIST_NAME, get_playlist, get_signed_segment_url
+from .utils.session_cache import request_scope
 from .utils.session_manager import SessionManager, SessionModel
 from .utils.summarize_custom_sources import SummarizeCustomSourcesRequest, summarize_custom_sources
+from .utils.tts_scheduler import get_tts_scheduler
+from .utils.waveform_peaks import PEAKS_NAME, get_peaks
 
 app = FastAPI(title="Audiora", version="1.0.0")
 
@@ -67,11 +71,30 @@ async def log_request_headers(request: Request, call_next: Callable):
     return await call_next(request)
 
 
+@app.middleware("http")
+async def session_request_scope(request: Request, call_next: Callable):
+    """read each session from Firestore at most once per request"""
+    with request_scope():
+        return await call_next(request)
+
+
 @app.get("/")
 def root():
     return {"message": "Hello World"}
 
 
+@app.get("/tts-scheduler/stats")
+def tts_scheduler_stats_endpoint():
+    """TTS queue depth and wait times of this worker"""
+    return get_tts_scheduler().stats().__dict__
+
+
+@app.get("/storage/blob-cache/stats")
+def blob_cache_stats_endpoint():
+    """Hits, misses and evictions of this worker's local blob cache"""
+    return local_blob_cache.stats()
+
+
 @app.post("/chat/{session_id}", response_model=Generator[str, Any, None])
 async def chat_endpoint(
     session_id: str,
@@ -128,6 +151,65 @@ def get_audiocast_endpoint(session_id: str):
     return result
 
 
+@app.get("/audiocast/{session_id}/stream")
+async def stream_audiocast_endpoint(session_id: str):
+    """
+    Stream audiocast segments in script order while they are still being generated
+    """
+    return StreamingResponse(
+        stream_audiocast_segments(session_id),
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.get(f"/audiocast/{{session_id}}/{PLAYLIST_NAME}")
+def get_audiocast_playlist_endpoint(session_id: str):
+    """
+    Get the HLS playlist of a packaged audiocast
+    """
+    playlist = get_playlist(session_id)
+    if not playlist:
+        raise HTTPException(status_code=404, detail=f"HLS playlist not found for session_id: {session_id}")
+
+    return Response(
+        content=playlist,
+        media_type="application/vnd.apple.mpegurl",
+        headers={"Cache-Control": "public, max-age=3600"},
+    )
+
+
+@app.get("/audiocast/{session_id}/hls/{segment_name}")
+def get_audiocast_segment_endpoint(session_id: str, segment_name: str):
+    """
+    Redirect to a signed URL of an HLS segment
+    """
+    try:
+        signed = get_signed_segment_url(session_id, segment_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=404, detail=f"HLS segment not found: {segment_name}")
+
+    return RedirectResponse(signed.url, headers={"Cache-Control": f"public, max-age={signed.max_age}"})
+
+
+@app.get(f"/audiocast/{{session_id}}/{PEAKS_NAME}")
+def get_audiocast_peaks_endpoint(session_id: str):
+    """
+    Get the multi-resolution waveform peaks of an audiocast
+    """
+    peaks = get_peaks(session_id)
+    if not peaks:
+        raise HTTPException(status_code=404, detail=f"Waveform peaks not found for session_id: {session_id}")
+
+    return Response(
+        content=peaks,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=86400"},
+    )
+
+
 @app.post("/generate-aisource", response_model=str)
 async def generate_aisource_endpoint(request: GenerateAiSourceRequest):
     source_content = await generate_ai_source(request)
@@ -137,24 +219,23 @@ async def generate_aisource_endpoint(request: GenerateAiSourceRequest):
 
 
 @app.get("/get-signed-url", response_model=str)
-async def get_signed_url_endpoint(blobname: str):
+def get_signed_url_endpoint(blobname: str):
     """
     Get signed URL for generated audiocast
     """
-
-    @retry(RetryConfig(max_retries=3, delay=5, backoff=1.5))
-    def handler() -> str | None:
-        return StorageManager().get_signed_url(blobname=blobname)
-
-    url = handler()
-    if not url:
+    try:
+        signed = StorageManager().sign_url(blobname=blobname)
+    except not_found_error():
+        raise HTTPException(status_code=404, detail=f"Blob not found: {blobname}")
+    except Exception as e:
+        print(f"Failed to get signed URL for {blobname}: {e}")
         raise HTTPException(status_code=500, detail="Failed to get signed URL")
 
     return JSONResponse(
-        content=url,
+        content=signed.url,
         headers={
             "Content-Type": "application/json",
-            "Cache-Control": "public, max-age=86390, immutable",
+            "Cache-Control": f"public, max-age={signed.max_age}, immutable",
         },
     )
 
@@ -229,32 +310,20 @@ async def detect_category_endpoint(request: DetectContentCategoryRequest):
 @app.post("/store-file-upload", response_model=str)
 async def store_file_upload(file: UploadFile, filename: str = Form(...), preserve: bool = Form(False)):
     """
-    Store file uploaded from the frontend
+    Store file uploaded from the frontend.
+    Files are addressed by the hash of their content, so identical uploads are stored and parsed once.
     """
     print(f"Storing file: {filename}. Preserve: {preserve}")
 
-    storage_manager = StorageManager()
-    file_exists = storage_manager.check_blob_exists(filename)
-    if file_exists:
-        return storage_manager.get_gcs_url(filename)
+    content_store = ContentStore()
+    digest = await hash_upload(file)
 
-    file_content = await ReadContent()._read_file(file, preserve=preserve)
-    content_type = (
-        file.content_type or "application/octet-stream"
-        if preserve or isinstance(file_content, BytesIO)
-        else "text/plain"
-    )
-
-    result = storage_manager.upload_to_gcs(
-        item=file_content,
-        blobname=f"{BLOB_BASE_URI}/{filename}",
-        params=UploadItemParams(
-            cache_control="public, max-age=31536000",
-            content_type=content_type,
-        ),
-    )
+    if not preserve:
+        url = await content_store.store_text(file, digest)
+        if url:
+            return url
 
-    return result
+    return await content_store.store_raw(file, digest)
 
 
 @app.post("/summarize-custom-sources", response_model=str)
@@ -1,3 +0,0 @@
-from src.services.admin_sdk import init_admin_sdk
-
-init_admin_sdk()
@@ -1,7 +1,6 @@
-import firebase_admin
-
-
 def init_admin_sdk():
+    import firebase_admin
+
     try:
         app = firebase_admin.get_app()
         print(f"Firebase Admin SDK already initialized ~> {app.project_id}")
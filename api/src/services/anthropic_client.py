@@ -1,13 +1,22 @@
-from anthropic import Anthropic, AsyncAnthropic
+from typing import TYPE_CHECKING
 
 from src.env_var import ANTHROPIC_API_KEY
+from src.services.providers import lazy_provider
 
+if TYPE_CHECKING:
+    from anthropic import Anthropic, AsyncAnthropic
 
-def get_anthropic():
+
+def get_anthropic() -> "AsyncAnthropic":
     """Return anthropic async client"""
+    from anthropic import AsyncAnthropic
+
     return AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
 
 
-def get_anthropic_sync():
-    """Return anthropic sync client"""
+@lazy_provider
+def get_anthropic_sync() -> "Anthropic":
+    """Return anthropic sync client, shared by the process"""
+    from anthropic import Anthropic
+
     return Anthropic(api_key=ANTHROPIC_API_KEY)
@@ -1,13 +1,47 @@
 from datetime import datetime
-from typing import Dict, Literal
+from typing import TYPE_CHECKING, Dict, List, Literal
 
-from firebase_admin.firestore import client, firestore
+from src.services.admin_sdk import init_admin_sdk
+from src.services.providers import lazy_provider
 
-firestore_client = client()
-server_timestamp = firestore.SERVER_TIMESTAMP
-increment = firestore.Increment
-arrayUnion = firestore.ArrayUnion
-arrayRemove = firestore.ArrayRemove
+if TYPE_CHECKING:
+    from google.cloud import firestore
+
+
+@lazy_provider
+def get_firestore_client() -> "firestore.Client":
+    """Firestore client of the Firebase app, initialized on first use"""
+    from firebase_admin.firestore import client
+
+    init_admin_sdk()
+    return client()
+
+
+# Firestore sentinels and transforms; the SDK is imported on first use, not with this module
+
+
+def server_timestamp():
+    from google.cloud import firestore
+
+    return firestore.SERVER_TIMESTAMP
+
+
+def increment(value: int | float) -> "firestore.Increment":
+    from google.cloud import firestore
+
+    return firestore.Increment(value)
+
+
+def arrayUnion(values: List) -> "firestore.ArrayUnion":
+    from google.cloud import firestore
+
+    return firestore.ArrayUnion(values)
+
+
+def arrayRemove(values: List) -> "firestore.ArrayRemove":
+    from google.cloud import firestore
+
+    return firestore.ArrayRemove(values)
 
 
 Collection = Literal["audiora_sessions", "audiora_audiocasts"]
@@ -21,10 +55,10 @@ collections: Dict[Collection, Collection] = {
 class DBManager:
     @property
     def _timestamp(self):
-        return server_timestamp
+        return server_timestamp()
 
     def _get_collection(self, collection: Collection):
-        return firestore_client.collection(collections[collection])
+        return get_firestore_client().collection(collections[collection])
 
     def _create_document(self, collection: Collection, data: Dict):
         return self._get_collection(collection).add(
@@ -1,20 +1,46 @@
 from dataclasses import dataclass
 from typing import Any, Callable, Literal, Optional
 
-from google import genai
-from google.genai import types
-
 from src.env_var import GEMINI_API_KEY
+from src.services.providers import lazy_provider
 
 ModelName = Literal["gemini-2.5-flash-lite", "gemini-2.5-flash", "gemini-2.5-pro", "gemini-2.0-flash"]
 
 
-class GeminiClient:
-    _client = genai.Client(api_key=GEMINI_API_KEY)
-    _models = _client.models
-    _types = types
-    _Content = types.Content
-    _Part = types.Part
+@lazy_provider
+def get_gemini():
+    from google import genai
+
+    return genai.Client(api_key=GEMINI_API_KEY)
+
+
+class _GeminiClient:
+    """Shared Gemini client and types, imported and created on first use"""
+
+    @property
+    def _client(self):
+        return get_gemini()
+
+    @property
+    def _models(self):
+        return get_gemini().models
+
+    @property
+    def _types(self):
+        from google.genai import types
+
+        return types
+
+    @property
+    def _Content(self):
+        return self._types.Content
+
+    @property
+    def _Part(self):
+        return self._types.Part
+
+
+GeminiClient = _GeminiClient()
 
 
 @dataclass
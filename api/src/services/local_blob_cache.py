@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict
+from urllib.parse import quote
+from uuid import uuid4
+
+from src.env_var import BLOB_CACHE_MAX_BYTES
+from src.services.storage_backends import BlobInfo
+
+BLOB_CACHE_DIR = "/tmp/audiora/blob_cache"
+META_SUFFIX = ".meta"
+
+
+@dataclass
+class BlobCacheConfig:
+    local_dir: str = BLOB_CACHE_DIR
+    max_bytes: int = BLOB_CACHE_MAX_BYTES
+
+
+@dataclass
+class CachedBlobMeta:
+    generation: int | None
+    md5_hash: str | None
+    size: int | None
+
+
+def has_media_headers(file_path: Path) -> bool:
+    """probe the container headers of an audio or video file instead of decoding it"""
+    from pydub.utils import mediainfo
+
+    try:
+        return float(mediainfo(str(file_path)).get("duration", 0)) > 0
+    except Exception:
+        return False
+
+
+class LocalBlobCache:
+    """
+    Size-bounded cache of downloaded blobs on local disk, which is memory on Cloud Run.
+    - an entry is valid while it matches the stored object's generation (or MD5) and size,
+    and, for audio and video, while its container headers probe
+    - downloads are written to a .part file and renamed, so readers never see partial files
+    - every file in the directory counts toward the byte budget, including artifacts kept next to a download
+    (e.g. decoded PCM), and the least-recently-used ones are evicted first
+    """
+
+    _lock = threading.Lock()
+    _stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __init__(self, config: BlobCacheConfig | None = None):
+        self.config = config or BlobCacheConfig()
+        Path(self.config.local_dir).mkdir(parents=True, exist_ok=True)
+
+    def local_path(self, blobname: str) -> Path:
+        """path a blob is cached at"""
+        return Path(self.config.local_dir) / quote(blobname, safe="")
+
+    def _meta_path(self, path: Path) -> Path:
+        return path.with_name(f"{path.name}{META_SUFFIX}")
+
+    def _count(self, stat: str, value=1):
+        with self._lock:
+            self._stats[stat] += value
+
+    def stats(self) -> Dict[str, int]:
+        """hits, misses and evictions since the process started, served at /storage/blob-cache/stats"""
+        with self._lock:
+            return dict(self._stats)
+
+    def _read_meta(self, path: Path) -> CachedBlobMeta | None:
+        try:
+            return CachedBlobMeta(**json.loads(self._meta_path(path).read_text()))
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+
+    def _write_meta(self, path: Path, blob: BlobInfo):
+        meta_path = self._meta_path(path)
+        tmp_path = meta_path.with_name(f"{meta_path.name}.{uuid4()}.part")
+        meta = CachedBlobMeta(generation=blob.generation, md5_hash=blob.md5_hash, size=blob.size)
+        tmp_path.write_text(json.dumps(asdict(meta)))
+        os.replace(tmp_path, meta_path)
+
+    def is_valid(self, path: Path, blob: BlobInfo) -> bool:
+        """whether the cached copy at path is the stored blob, complete"""
+        meta = self._read_meta(path)
+        if not meta:
+            return False
+
+        same_content = meta.generation == blob.generation or bool(meta.md5_hash and meta.md5_hash == blob.md5_hash)
+        try:
+            same_size = path.stat().st_size == blob.size
+        except FileNotFoundError:
+            return False
+        if not (same_content and same_size):
+            return False
+
+        if (blob.content_type or "").startswith(("audio/", "video/")):
+            return has_media_headers(path)
+        return True
+
+    def fetch(self, blob: BlobInfo, download: Callable[[Path], None]) -> Path:
+        """
+        Local copy of a blob, downloaded only if the cached copy is missing or stale.
+        `download` must write the blob to the given path atomically.
+        """
+        path = self.local_path(blob.name)
+        if self.is_valid(path, blob):
+            self._count("hits")
+            # mark as recently used for LRU eviction
+            os.utime(path)
+            return path
+
+        self._count("misses")
+        self._meta_path(path).unlink(missing_ok=True)
+        download(path)
+        self._write_meta(path, blob)
+        self._evict(keep=path)
+        return path
+
+    def discard(self, blobname: str):
+        """remove the cached copy of a blob and its metadata"""
+        path = self.local_path(blobname)
+        self._meta_path(path).unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+
+    def _evict(self, keep: Path) -> None:
+        """Remove least-recently-used files until the cache fits its byte budget"""
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.config.local_dir):
+                if entry.is_file() and not entry.name.endswith(".part"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.config.max_bytes:
+                    break
+                if path in (str(keep), str(self._meta_path(keep))):
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                    self._stats["evictions"] += 1
+                    # a metadata file without its blob is useless
+                    self._meta_path(Path(path)).unlink(missing_ok=True)
+                except FileNotFoundError:
+                    pass
@@ -1,7 +1,34 @@
-from openai import Client
+import asyncio
+from typing import TYPE_CHECKING
+from weakref import WeakKeyDictionary
 
 from src.env_var import OPENAI_API_KEY
+from src.services.providers import lazy_provider
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, Client
+
+_async_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = WeakKeyDictionary()
+
+
+@lazy_provider
+def get_openai() -> "Client":
+    """Return openai sync client, shared by the process"""
+    from openai import Client
 
-def get_openai():
     return Client(api_key=OPENAI_API_KEY)
+
+
+def get_openai_async() -> "AsyncOpenAI":
+    """
+    Return openai async client pooled per event loop.
+    The underlying connection pool is bound to the loop it was first used on.
+    """
+    from openai import AsyncOpenAI
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if not client:
+        client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        _async_clients[loop] = client
+    return client
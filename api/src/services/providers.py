@@ -0,0 +1,50 @@
+import os
+from threading import Lock
+from typing import Callable, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyProvider(Generic[T]):
+    """
+    An SDK client created on first use and shared by the process.
+    - nothing is created at import time, so importing the app stays cheap on cold starts
+    - forked children drop the instance: gunicorn --preload imports the app in the master,
+    and clients holding sockets, channels or threads must not be shared with the workers
+    """
+
+    _registry: List["LazyProvider"] = []
+
+    def __init__(self, factory: Callable[[], T]):
+        self.factory = factory
+        self._instance: Optional[T] = None
+        self._lock = Lock()
+        LazyProvider._registry.append(self)
+
+    def __call__(self) -> T:
+        """the shared instance, created on the first call"""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self.factory()
+        return self._instance
+
+    def reset(self):
+        """drop the instance, so the next call creates a new one"""
+        self._instance = None
+        # a lock held by another thread at fork time would never be released in the child
+        self._lock = Lock()
+
+    @classmethod
+    def reset_all(cls):
+        """drop the instances of every provider, e.g. in a forked child"""
+        for provider in cls._registry:
+            provider.reset()
+
+
+def lazy_provider(factory: Callable[[], T]) -> LazyProvider[T]:
+    """Register a client factory, called once per process on first use"""
+    return LazyProvider(factory)
+
+
+os.register_at_fork(after_in_child=LazyProvider.reset_all)
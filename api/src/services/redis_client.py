@@ -1,6 +1,9 @@
 from typing import Optional
 
+from redis import Redis
 from redis.asyncio import Redis as AsyncRedis
+from redis.backoff import NoBackoff
+from redis.retry import Retry
 
 from src.env_var import REDIS_HOST, REDIS_PASSWORD
 
@@ -32,3 +35,36 @@ class RedisClient:
 def get_redis() -> AsyncRedis:
     """Return asynchronous Redis object"""
     return RedisClient()
+
+
+class SyncRedisClient:
+    _instance: Optional[Redis] = None
+
+    def __new__(cls) -> Redis:
+        """
+        Singleton pattern for the synchronous redis client
+        """
+        if not cls._instance:
+            cls._instance = cls._create_instance()
+        return cls._instance
+
+    @classmethod
+    def _create_instance(cls) -> Redis:
+        """
+        Initialize a synchronous Redis client for code running outside the event loop, e.g. StorageManager.
+        Short timeouts and no retries, since its callers use Redis as a cache and fall back when it is unavailable.
+        """
+        return Redis(
+            password=REDIS_PASSWORD,
+            port=6379,
+            host=REDIS_HOST,
+            ssl=True,
+            socket_timeout=1,
+            socket_connect_timeout=1,
+            retry=Retry(NoBackoff(), 0),
+        )
+
+
+def get_sync_redis() -> Redis:
+    """Return synchronous Redis object"""
+    return SyncRedisClient()
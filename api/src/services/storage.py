@@ -1,61 +1,57 @@
 import datetime
-import os
-from dataclasses import dataclass
-from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict
+from time import time
 from uuid import uuid4
 
-from google.auth import compute_engine, default
-from google.auth.transport import requests
-from google.cloud import storage
-from pydub import AudioSegment
-
 from src.env_var import BUCKET_NAME
+from src.services.local_blob_cache import LocalBlobCache
+from src.services.storage_backends import (
+    BlobInfo,
+    UploadItem,
+    UploadItemParams,
+    blob_not_found,
+    get_storage_backend,
+)
+from src.services.storage_cache import SignedUrl, blob_existence_cache, signed_url_cache
 
-storage_client = storage.Client()
-bucket = storage_client.bucket(BUCKET_NAME)
 BLOB_BASE_URI = "audiora/assets"
 
+local_blob_cache = LocalBlobCache()
 
-def listBlobs(prefix):
-    blobs = bucket.list_blobs(prefix=prefix)
-    return [blob for blob in blobs]
 
+class StorageManager:
+    """
+    Blob storage of the app, on the backend chosen by STORAGE_BACKEND (see storage_backends).
+    URLs keep the gs://{BUCKET_NAME}/ form whatever the backend.
+    """
 
-@dataclass
-class UploadItemParams:
-    content_type: str
-    cache_control: str = "public, max-age=31536000"
-    metadata: Dict[str, Any] | None = None
+    bucket_name = BUCKET_NAME
 
+    @property
+    def backend(self):
+        """the storage backend shared by the process"""
+        return get_storage_backend()
 
-class StorageManager:
-    bucket_name = BUCKET_NAME
+    def blob_exists(self, blobname: str) -> bool:
+        """
+        check if a blob exists with a single metadata lookup by name,
+        served from the existence cache when possible
+        """
+        exists = blob_existence_cache.get(blobname)
+        if exists is None:
+            exists = self.backend.exists(blobname)
+            blob_existence_cache.set(blobname, exists)
+        return exists
 
     def check_blob_exists(self, filename: str, root_path=BLOB_BASE_URI):
         """check if a file exists in the bucket"""
-        blobname = f"{root_path}/{filename}"
-        blobs = listBlobs(prefix=root_path)
-        return any(blob.name == blobname for blob in blobs)
-
-    def upload_to_gcs(self, item: str | Path | BytesIO, blobname: str, params: UploadItemParams):
-        """upload item to GCS"""
-        blob = bucket.blob(blobname)
-        blob.content_type = params.content_type
-        blob.cache_control = params.cache_control
+        return self.blob_exists(f"{root_path}/{filename}")
 
-        if params.metadata:
-            blob.metadata = {**(blob.metadata or dict()), **params.metadata}
-
-        if isinstance(item, Path):
-            blob.upload_from_filename(str(item))
-        elif isinstance(item, str):
-            blob.upload_from_string(item)
-        else:
-            blob.upload_from_file(item)
-
-        return f"gs://{BUCKET_NAME}/{blob.name}"
+    def upload_to_gcs(self, item: UploadItem, blobname: str, params: UploadItemParams):
+        """upload item to GCS, from a file, a string or bytes, or an in-memory buffer"""
+        self.backend.upload(item, blobname, params)
+        blob_existence_cache.set(blobname, True)
+        return f"gs://{BUCKET_NAME}/{blobname}"
 
     def upload_audio_to_gcs(self, tmp_audio_path: str, filename=str(uuid4())):
         """upload audio file to GCS"""
@@ -81,60 +77,58 @@ class StorageManager:
 
     def download_from_gcs(self, filename: str):
         """
-        Download any item on GCS to disk
+        Download any item on GCS to disk, through the local blob cache
         """
-        blobname = f"{BLOB_BASE_URI}/{filename}"
-        blob = bucket.blob(blobname)
+        info = self.get_blob_info(f"{BLOB_BASE_URI}/{filename}")
+        path = local_blob_cache.fetch(info, lambda file_path: self.backend.download(info, file_path))
+        return str(path)
+
+    def get_local_path(self, filename: str) -> Path:
+        """path download_from_gcs stores a file at"""
+        return local_blob_cache.local_path(f"{BLOB_BASE_URI}/{filename}")
+
+    def discard_local_copy(self, filename: str):
+        """remove a file's copy from the local blob cache"""
+        local_blob_cache.discard(f"{BLOB_BASE_URI}/{filename}")
+
+    def download_blob(self, blobname: str, file_path: Path):
+        """Download a blob to a file"""
+        self.backend.download(self.get_blob_info(blobname), file_path)
+
+    def get_blob_info(self, blobname: str) -> BlobInfo:
+        """metadata of a blob, e.g. its size and content type"""
+        info = self.backend.stat(blobname)
+        if not info:
+            raise blob_not_found(blobname)
+        return info
+
+    def read_blob(self, blobname: str) -> bytes:
+        """content of a blob, in memory"""
+        return self.backend.read(blobname)
+
+    def sign_url(self, blobname: str, expiration=datetime.timedelta(days=1)) -> SignedUrl:
+        """
+        get a signed URL for a blob with its expiry.
+        The URL is reused from the cache until shortly before it expires.
+        """
+        return signed_url_cache.get_or_sign(blobname, expiration, lambda: self._sign_url(blobname, expiration))
 
-        tmp_file_path = f"/tmp/{filename}"
-        if os.path.exists(tmp_file_path):
-            try:
-                audio = AudioSegment.from_file(tmp_file_path)
-                if audio.duration_seconds > 0:
-                    return tmp_file_path
-            except Exception:
-                os.remove(tmp_file_path)
+    def _sign_url(self, blobname: str, expiration: datetime.timedelta) -> SignedUrl:
+        if not self.blob_exists(blobname):
+            raise blob_not_found(blobname)
 
-        blob.download_to_filename(tmp_file_path)
-        return tmp_file_path
+        expires_at = time() + expiration.total_seconds()
+        return SignedUrl(self.backend.sign_url(blobname, expiration), expires_at)
 
     def get_signed_url(self, blobname, expiration=datetime.timedelta(days=1)):
         """get a signed URL for a blob"""
-        blob = bucket.blob(blobname)
-        if not blob.exists():
-            raise Exception(f"Blob {blobname} does not exist")
-
-        if os.environ.get("ENV", "dev") == "prod":
-            credentials, _ = default()
-            auth_request = requests.Request()
-            credentials.refresh(auth_request)
-
-            signing_credentials = compute_engine.IDTokenCredentials(
-                auth_request, "", service_account_email=credentials.service_account_email
-            )
-
-            return blob.generate_signed_url(
-                version="v4",
-                expiration=expiration,
-                method="GET",
-                credentials=signing_credentials,
-            )
-        else:
-            return blob.generate_signed_url(
-                version="v4",
-                expiration=expiration,
-                method="GET",
-            )
+        return self.sign_url(blobname, expiration).url
 
     def get_gcs_url(self, filename: str):
         """get full path to a file in the bucket"""
         blobname = f"{BLOB_BASE_URI}/{filename}"
         return f"gs://{BUCKET_NAME}/{blobname}"
 
-    def get_blob(self, blobname: str):
-        """get a blob object"""
-        return bucket.blob(blobname)
-
     def get_blobname_from_url(self, url: str):
         """get blobname from a URL"""
         return url.replace(f"gs://{self.bucket_name}/", "")
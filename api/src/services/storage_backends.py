@@ -0,0 +1,440 @@
+import base64
+import datetime
+import hashlib
+import json
+import os
+import shutil
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from io import BytesIO
+from pathlib import Path
+from threading import Lock
+from time import sleep, time_ns
+from typing import IO, TYPE_CHECKING, Any, Dict, Optional, Type
+from uuid import uuid4
+
+from src.env_var import (
+    BUCKET_NAME,
+    GCS_CHUNK_SIZE,
+    GCS_TRANSFER_WORKERS,
+    PROD_ENV,
+    STORAGE_BACKEND,
+    STORAGE_BANDWIDTH_MBPS,
+    STORAGE_LATENCY_MS,
+    STORAGE_LOCAL_ROOT,
+)
+from src.services.providers import lazy_provider
+
+if TYPE_CHECKING:
+    from google.auth.compute_engine import IDTokenCredentials
+    from google.cloud.storage import Bucket
+
+UploadItem = str | bytes | Path | IO[bytes]
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+@dataclass
+class UploadItemParams:
+    content_type: str
+    cache_control: str = "public, max-age=31536000"
+    metadata: Dict[str, Any] | None = None
+
+
+@dataclass
+class BlobInfo:
+    name: str
+    size: int | None
+    content_type: str | None = None
+    generation: int | None = None
+    md5_hash: str | None = None
+    metadata: Dict[str, Any] | None = None
+
+
+def not_found_error() -> Type[Exception]:
+    """
+    google-api-core's NotFound, which every backend raises for a missing blob.
+    Imported on first use, since google-api-core pulls in grpc.
+    """
+    from google.api_core.exceptions import NotFound
+
+    return NotFound
+
+
+def blob_not_found(blobname: str) -> Exception:
+    """the error to raise for a missing blob"""
+    return not_found_error()(f"Blob {blobname} does not exist")
+
+
+def _atomic_download(file_path: Path, write_to) -> None:
+    """call write_to with a temporary path and move the result into place once it is complete"""
+    tmp_path = file_path.with_name(f"{file_path.name}.{uuid4()}.part")
+    try:
+        write_to(tmp_path)
+        os.replace(tmp_path, file_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+class StorageBackend(ABC):
+    """
+    Object storage behind StorageManager.
+    Blobs are addressed by name, e.g. audiora/assets/{session_id}.
+    """
+
+    @abstractmethod
+    def exists(self, blobname: str) -> bool:
+        """whether a blob exists"""
+
+    @abstractmethod
+    def stat(self, blobname: str) -> Optional[BlobInfo]:
+        """metadata of a blob, or None if it does not exist"""
+
+    @abstractmethod
+    def upload(self, item: UploadItem, blobname: str, params: UploadItemParams) -> None:
+        """store an item as a blob, replacing any previous version"""
+
+    @abstractmethod
+    def download(self, info: BlobInfo, file_path: Path) -> None:
+        """download a blob to a file, which only appears once the download is complete"""
+
+    @abstractmethod
+    def read(self, blobname: str) -> bytes:
+        """contents of a blob; raises NotFound if it does not exist"""
+
+    @abstractmethod
+    def sign_url(self, blobname: str, expiration: datetime.timedelta) -> str:
+        """URL clients can read the blob from until expiration"""
+
+
+class GCSBackend(StorageBackend):
+    """
+    Google Cloud Storage. The SDK is imported and the client created on first use.
+    - files larger than one chunk are uploaded as parallel chunks (XML multipart upload)
+    and downloaded as parallel byte-range slices
+    - other large items (e.g. in-memory buffers) use resumable uploads in GCS_CHUNK_SIZE chunks,
+    so a failed request resumes from the last chunk instead of starting over
+    """
+
+    _signing_credentials: Optional["IDTokenCredentials"] = None
+
+    def __init__(self, bucket_name=BUCKET_NAME):
+        self.bucket_name = bucket_name
+        self._bucket: Optional["Bucket"] = None
+        self._lock = Lock()
+
+    @property
+    def bucket(self) -> "Bucket":
+        """the bucket, with the client created on first use"""
+        from google.cloud import storage
+
+        with self._lock:
+            if self._bucket is None:
+                self._bucket = storage.Client().bucket(self.bucket_name)
+            return self._bucket
+
+    def signing_credentials(self) -> "IDTokenCredentials":
+        """
+        Credentials used to sign URLs in prod, created once and shared.
+        They sign through the IAM API and refresh their own access token when it expires.
+        """
+        from google.auth import compute_engine, default
+        from google.auth.transport import requests
+
+        with self._lock:
+            if not GCSBackend._signing_credentials:
+                credentials, _ = default()
+                auth_request = requests.Request()
+                credentials.refresh(auth_request)
+
+                GCSBackend._signing_credentials = compute_engine.IDTokenCredentials(
+                    auth_request, "", service_account_email=credentials.service_account_email
+                )
+            return GCSBackend._signing_credentials
+
+    def exists(self, blobname: str) -> bool:
+        """one metadata request for the blob"""
+        return self.bucket.blob(blobname).exists()
+
+    def stat(self, blobname: str) -> Optional[BlobInfo]:
+        """metadata of a blob from a single get_blob request, or None"""
+        blob = self.bucket.get_blob(blobname)
+        if not blob:
+            return None
+        return BlobInfo(
+            name=blob.name,
+            size=blob.size,
+            content_type=blob.content_type,
+            generation=blob.generation,
+            md5_hash=blob.md5_hash,
+            metadata=blob.metadata,
+        )
+
+    def upload(self, item: UploadItem, blobname: str, params: UploadItemParams) -> None:
+        """upload with retries: parallel chunks for large files, resumable uploads for large buffers"""
+        from google.cloud.storage import transfer_manager
+        from google.cloud.storage.retry import DEFAULT_RETRY
+
+        blob = self.bucket.blob(blobname, chunk_size=GCS_CHUNK_SIZE)
+        blob.content_type = params.content_type
+        blob.cache_control = params.cache_control
+
+        if params.metadata:
+            blob.metadata = {**(blob.metadata or dict()), **params.metadata}
+
+        if isinstance(item, Path):
+            if item.stat().st_size > GCS_CHUNK_SIZE and GCS_TRANSFER_WORKERS > 1:
+                transfer_manager.upload_chunks_concurrently(
+                    str(item),
+                    blob,
+                    chunk_size=GCS_CHUNK_SIZE,
+                    max_workers=GCS_TRANSFER_WORKERS,
+                    worker_type=transfer_manager.THREAD,
+                )
+            else:
+                blob.upload_from_filename(str(item), retry=DEFAULT_RETRY)
+        elif isinstance(item, (str, bytes)):
+            blob.upload_from_string(item, retry=DEFAULT_RETRY)
+        else:
+            # the size of an in-memory buffer is known, so small buffers go in a single request
+            size = item.getbuffer().nbytes - item.tell() if isinstance(item, BytesIO) else None
+            blob.upload_from_file(item, size=size, retry=DEFAULT_RETRY)
+
+    def download(self, info: BlobInfo, file_path: Path) -> None:
+        """download the generation in info, as parallel slices when it spans several chunks"""
+        from google.cloud.storage import transfer_manager
+
+        # pinned to the generation the caller saw, so every slice reads the same object
+        blob = self.bucket.blob(info.name, generation=info.generation)
+
+        def write_to(tmp_path: Path):
+            if (info.size or 0) > GCS_CHUNK_SIZE and GCS_TRANSFER_WORKERS > 1:
+                transfer_manager.download_chunks_concurrently(
+                    blob,
+                    str(tmp_path),
+                    chunk_size=GCS_CHUNK_SIZE,
+                    max_workers=GCS_TRANSFER_WORKERS,
+                    worker_type=transfer_manager.THREAD,
+                )
+            else:
+                blob.download_to_filename(str(tmp_path))
+
+        _atomic_download(file_path, write_to)
+
+    def read(self, blobname: str) -> bytes:
+        """download a blob into memory"""
+        return self.bucket.blob(blobname).download_as_bytes()
+
+    def sign_url(self, blobname: str, expiration: datetime.timedelta) -> str:
+        """V4 signed URL, signed through the IAM API in prod"""
+        return self.bucket.blob(blobname).generate_signed_url(
+            version="v4",
+            expiration=expiration,
+            method="GET",
+            credentials=self.signing_credentials() if PROD_ENV else None,
+        )
+
+
+class SimulatedLink:
+    """
+    Latency and bandwidth of a simulated network, for load tests against the local backends.
+    Every request waits for the latency, and transfers additionally for size / bandwidth.
+    """
+
+    def __init__(self, latency_ms: float = STORAGE_LATENCY_MS, bandwidth_mbps: float = STORAGE_BANDWIDTH_MBPS):
+        self.latency = latency_ms / 1000
+        self.bytes_per_second = bandwidth_mbps * 1_000_000 / 8
+
+    def request(self):
+        """wait out the latency of a request without a body"""
+        if self.latency:
+            sleep(self.latency)
+
+    def transfer(self, size: int):
+        """wait out the latency and transfer time of size bytes"""
+        delay = self.latency
+        if self.bytes_per_second:
+            delay += size / self.bytes_per_second
+        if delay:
+            sleep(delay)
+
+
+def _read_item(item: UploadItem) -> bytes:
+    if isinstance(item, Path):
+        return item.read_bytes()
+    if isinstance(item, str):
+        return item.encode()
+    if isinstance(item, bytes):
+        return item
+    return item.read()
+
+
+def _md5_hash(data: bytes) -> str:
+    """base64 MD5 digest, in the format GCS reports it"""
+    return base64.b64encode(hashlib.md5(data).digest()).decode()
+
+
+def _file_md5_hash(file_path: Path) -> str:
+    digest = hashlib.md5()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(COPY_BUFFER_SIZE):
+            digest.update(chunk)
+    return base64.b64encode(digest.digest()).decode()
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Blobs kept in process memory.
+    Each process has its own store, so run the API with a single worker when using it.
+    """
+
+    def __init__(self, link: SimulatedLink | None = None):
+        self.link = link or SimulatedLink()
+        self._blobs: Dict[str, tuple[bytes, BlobInfo]] = {}
+        self._lock = Lock()
+
+    def exists(self, blobname: str) -> bool:
+        """whether a blob is in the store"""
+        self.link.request()
+        with self._lock:
+            return blobname in self._blobs
+
+    def stat(self, blobname: str) -> Optional[BlobInfo]:
+        """metadata of a stored blob, or None"""
+        self.link.request()
+        with self._lock:
+            entry = self._blobs.get(blobname)
+        return entry[1] if entry else None
+
+    def upload(self, item: UploadItem, blobname: str, params: UploadItemParams) -> None:
+        """keep a copy of the item in memory"""
+        data = _read_item(item)
+        self.link.transfer(len(data))
+        info = BlobInfo(
+            name=blobname,
+            size=len(data),
+            content_type=params.content_type,
+            generation=time_ns(),
+            md5_hash=_md5_hash(data),
+            metadata=params.metadata,
+        )
+        with self._lock:
+            self._blobs[blobname] = (data, info)
+
+    def read(self, blobname: str) -> bytes:
+        """stored bytes of a blob"""
+        with self._lock:
+            entry = self._blobs.get(blobname)
+        if not entry:
+            raise blob_not_found(blobname)
+        self.link.transfer(len(entry[0]))
+        return entry[0]
+
+    def download(self, info: BlobInfo, file_path: Path) -> None:
+        """write the stored bytes to a file"""
+        data = self.read(info.name)
+        _atomic_download(file_path, lambda tmp_path: tmp_path.write_bytes(data))
+
+    def sign_url(self, blobname: str, expiration: datetime.timedelta) -> str:
+        """a memory:// URL, only meaningful to this process"""
+        return f"memory://{blobname}"
+
+
+class LocalFSBackend(StorageBackend):
+    """
+    Blobs stored as files under a local directory, with their metadata in JSON files next to them.
+    Unlike MemoryBackend, the store is shared by every process on the machine.
+    """
+
+    def __init__(self, root: str = STORAGE_LOCAL_ROOT, link: SimulatedLink | None = None):
+        self.root = Path(root)
+        self.link = link or SimulatedLink()
+
+    def _path(self, blobname: str) -> Path:
+        return self.root / "blobs" / blobname
+
+    def _meta_path(self, blobname: str) -> Path:
+        return self.root / "meta" / f"{blobname}.json"
+
+    def exists(self, blobname: str) -> bool:
+        """whether the blob's metadata file exists"""
+        self.link.request()
+        return self._meta_path(blobname).exists()
+
+    def stat(self, blobname: str) -> Optional[BlobInfo]:
+        """metadata of a blob from its JSON file, or None"""
+        self.link.request()
+        try:
+            return BlobInfo(**json.loads(self._meta_path(blobname).read_text()))
+        except FileNotFoundError:
+            return None
+
+    def upload(self, item: UploadItem, blobname: str, params: UploadItemParams) -> None:
+        """write the blob, then its metadata, each through a .part file and a rename"""
+        path = self._path(blobname)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = path.with_name(f"{path.name}.{uuid4()}.part")
+        try:
+            if isinstance(item, Path):
+                shutil.copyfile(item, tmp_path)
+            else:
+                tmp_path.write_bytes(_read_item(item))
+            size = tmp_path.stat().st_size
+            md5_hash = _file_md5_hash(tmp_path)
+            self.link.transfer(size)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        info = BlobInfo(
+            name=blobname,
+            size=size,
+            content_type=params.content_type,
+            generation=time_ns(),
+            md5_hash=md5_hash,
+            metadata=params.metadata,
+        )
+        meta_path = self._meta_path(blobname)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_meta_path = meta_path.with_name(f"{meta_path.name}.{uuid4()}.part")
+        tmp_meta_path.write_text(json.dumps(asdict(info)))
+        os.replace(tmp_meta_path, meta_path)
+
+    def read(self, blobname: str) -> bytes:
+        """contents of the blob's file"""
+        try:
+            data = self._path(blobname).read_bytes()
+        except FileNotFoundError:
+            raise blob_not_found(blobname)
+        self.link.transfer(len(data))
+        return data
+
+    def download(self, info: BlobInfo, file_path: Path) -> None:
+        """copy the blob's file"""
+
+        def write_to(tmp_path: Path):
+            try:
+                shutil.copyfile(self._path(info.name), tmp_path)
+            except FileNotFoundError:
+                raise blob_not_found(info.name)
+            self.link.transfer(tmp_path.stat().st_size)
+
+        _atomic_download(file_path, write_to)
+
+    def sign_url(self, blobname: str, expiration: datetime.timedelta) -> str:
+        """file:// URL of the blob"""
+        return self._path(blobname).resolve().as_uri()
+
+
+@lazy_provider
+def get_storage_backend() -> StorageBackend:
+    """The storage backend chosen by STORAGE_BACKEND: gcs (default), local or memory"""
+    if STORAGE_BACKEND == "memory":
+        return MemoryBackend()
+    elif STORAGE_BACKEND == "local":
+        return LocalFSBackend()
+    elif STORAGE_BACKEND == "gcs":
+        return GCSBackend()
+
+    raise ValueError(f"Unknown storage backend: {STORAGE_BACKEND}")
@@ -0,0 +1,201 @@
+import json
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from threading import Lock
+from time import monotonic, time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from src.env_var import BLOB_EXISTS_TTL, BLOB_MISSING_TTL, SIGNED_URL_EXPIRY_MARGIN
+from src.services.redis_client import get_sync_redis
+
+EXISTS_KEY_PREFIX = "blob_exists"
+SIGNED_URL_KEY_PREFIX = "signed_url"
+LOCAL_MAX_ENTRIES = 10_000
+CLIENT_EXPIRY_MARGIN = 10  # seconds
+REDIS_RETRY_AFTER = 30  # seconds
+
+
+_redis_retry_at = 0.0
+
+
+def _redis_call(method: str, *args, **kwargs):
+    """
+    Run a command on the shared Redis tier.
+    After a failure, Redis is skipped for REDIS_RETRY_AFTER seconds, so an unavailable Redis
+    (e.g. a local run) costs one timeout instead of one per lookup.
+    """
+    global _redis_retry_at
+    if monotonic() < _redis_retry_at:
+        return None
+    try:
+        return getattr(get_sync_redis(), method)(*args, **kwargs)
+    except RedisError as e:
+        print(f"Storage cache Redis unavailable, retrying in {REDIS_RETRY_AFTER}s: {e}")
+        _redis_retry_at = monotonic() + REDIS_RETRY_AFTER
+        return None
+
+
+def _evict(entries: Dict, is_expired: Callable[[Any], bool]):
+    """keep an in-process cache bounded: drop expired entries, then the oldest ones"""
+    if len(entries) < LOCAL_MAX_ENTRIES:
+        return
+    for key in [key for key, value in entries.items() if is_expired(value)]:
+        del entries[key]
+    while len(entries) >= LOCAL_MAX_ENTRIES:
+        del entries[next(iter(entries))]
+
+
+class BlobExistenceCache:
+    """
+    Two-tier cache of blob existence: in-process, then Redis (shared by workers and the post-generation worker).
+    - missing blobs are cached too, with a shorter TTL, since they usually appear shortly after (e.g. a pending upload)
+    - upload_to_gcs records the blob as existing, so writes through StorageManager are visible right away
+    to this process and to Redis; other processes keep their in-process entry until it expires
+    (exists_ttl, 300s by default, or missing_ttl, 10s, for a blob they saw missing), which bounds how stale they get
+    - Redis is optional: without it, only the in-process tier is used
+    """
+
+    def __init__(self, exists_ttl=BLOB_EXISTS_TTL, missing_ttl=BLOB_MISSING_TTL):
+        self.exists_ttl = exists_ttl
+        self.missing_ttl = missing_ttl
+        self._entries: Dict[str, Tuple[bool, float]] = {}
+        self._lock = Lock()
+
+    def _key(self, blobname: str):
+        return f"{EXISTS_KEY_PREFIX}:{blobname}"
+
+    def _ttl(self, exists: bool):
+        return self.exists_ttl if exists else self.missing_ttl
+
+    def _set_local(self, blobname: str, exists: bool):
+        with self._lock:
+            now = monotonic()
+            _evict(self._entries, lambda entry: entry[1] <= now)
+            self._entries[blobname] = (exists, now + self._ttl(exists))
+
+    def get(self, blobname: str) -> Optional[bool]:
+        """cached existence of a blob, or None if unknown"""
+        with self._lock:
+            entry = self._entries.get(blobname)
+            if entry and entry[1] > monotonic():
+                return entry[0]
+            self._entries.pop(blobname, None)
+
+        value = _redis_call("get", self._key(blobname))
+        if value is None:
+            return None
+
+        exists = value == b"1"
+        self._set_local(blobname, exists)
+        return exists
+
+    def set(self, blobname: str, exists: bool):
+        """record the existence of a blob in both tiers"""
+        self._set_local(blobname, exists)
+        _redis_call("set", self._key(blobname), "1" if exists else "0", ex=self._ttl(exists))
+
+    def invalidate(self, blobname: str):
+        """forget a blob in this process and in Redis; other processes keep theirs until it expires"""
+        with self._lock:
+            self._entries.pop(blobname, None)
+        _redis_call("delete", self._key(blobname))
+
+
+@dataclass
+class SignedUrl:
+    url: str
+    expires_at: float  # unix time
+
+    @property
+    def max_age(self) -> int:
+        """how long clients may cache the URL"""
+        return max(int(self.expires_at - time()) - CLIENT_EXPIRY_MARGIN, 0)
+
+
+class SignedUrlCache:
+    """
+    Two-tier cache of signed URLs per blob and expiration, in-process then Redis.
+    - a URL is reused until shortly before it expires (SIGNED_URL_EXPIRY_MARGIN, at most half its lifetime)
+    - concurrent requests for the same URL in a process are single-flight: one signs, the others wait for it
+    - Redis is optional: without it, only the in-process tier is used
+    """
+
+    def __init__(self, margin=SIGNED_URL_EXPIRY_MARGIN):
+        self.margin = margin
+        self._entries: Dict[str, Tuple[SignedUrl, float]] = {}
+        self._lock = Lock()
+        self._inflight: Dict[str, Lock] = {}
+
+    def _key(self, blobname: str, expiration: timedelta):
+        return f"{SIGNED_URL_KEY_PREFIX}:{int(expiration.total_seconds())}:{blobname}"
+
+    def _reusable_until(self, signed: SignedUrl, expiration: timedelta) -> float:
+        """unix time until which the URL can still be handed out"""
+        return signed.expires_at - min(self.margin, expiration.total_seconds() / 2)
+
+    def _set_local(self, key: str, signed: SignedUrl, reusable_until: float):
+        with self._lock:
+            now = time()
+            _evict(self._entries, lambda entry: entry[1] <= now)
+            self._entries[key] = (signed, reusable_until)
+
+    def get(self, blobname: str, expiration: timedelta) -> Optional[SignedUrl]:
+        """cached URL of a blob that can still be handed out, or None"""
+        key = self._key(blobname, expiration)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time():
+                return entry[0]
+            self._entries.pop(key, None)
+
+        value = _redis_call("get", key)
+        if value is None:
+            return None
+
+        signed = SignedUrl(**json.loads(value))
+        reusable_until = self._reusable_until(signed, expiration)
+        if reusable_until <= time():
+            return None
+
+        self._set_local(key, signed, reusable_until)
+        return signed
+
+    def set(self, blobname: str, expiration: timedelta, signed: SignedUrl):
+        """cache a URL in both tiers until it stops being reusable"""
+        key = self._key(blobname, expiration)
+        reusable_until = self._reusable_until(signed, expiration)
+        ttl = int(reusable_until - time())
+        if ttl <= 0:
+            return
+
+        self._set_local(key, signed, reusable_until)
+        _redis_call("set", key, json.dumps(asdict(signed)), ex=ttl)
+
+    def get_or_sign(self, blobname: str, expiration: timedelta, sign: Callable[[], SignedUrl]) -> SignedUrl:
+        """cached URL of a blob, or a new one from sign"""
+        signed = self.get(blobname, expiration)
+        if signed:
+            return signed
+
+        key = self._key(blobname, expiration)
+        with self._lock:
+            inflight = self._inflight.setdefault(key, Lock())
+
+        try:
+            with inflight:
+                # another request may have signed it while we waited
+                signed = self.get(blobname, expiration)
+                if not signed:
+                    signed = sign()
+                    self.set(blobname, expiration, signed)
+                return signed
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is inflight:
+                    del self._inflight[key]
+
+
+blob_existence_cache = BlobExistenceCache()
+signed_url_cache = SignedUrlCache()
@@ -0,0 +1,232 @@
+import os
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from src.utils.audio_filter_graph import PostProcessConfig, build_filter_chain
+from src.utils.decoded_audio import DecodedAudio, discard_decoded_audio, get_pcm_path
+
+TRUE_PEAK_OVERSAMPLE = 4
+
+
+@dataclass
+class DynamicsConfig:
+    target_loudness: float = -20.0  # dBFS (RMS) before compression
+    attack: float = 5.0  # ms
+    release: float = 100.0  # ms
+    threshold: float = -20.0  # dBFS
+    ratio: float = 2.5
+    headroom: float = 0.1  # dB below full scale after true-peak normalization
+    block_seconds: float = 30.0
+
+
+def db_to_gain(db):
+    return np.power(10.0, np.asarray(db) / 20.0)
+
+
+def gain_to_db(gain: float) -> float:
+    return 20.0 * float(np.log10(gain)) if gain > 0 else -np.inf
+
+
+def rms_dbfs(samples: np.ndarray) -> float:
+    """RMS level of float PCM in dBFS, matching pydub's AudioSegment.dBFS"""
+    if not samples.size:
+        return -np.inf
+    return gain_to_db(float(np.sqrt(np.mean(np.square(samples, dtype=np.float64)))))
+
+
+def true_peak(samples: np.ndarray, oversample=TRUE_PEAK_OVERSAMPLE) -> float:
+    """Inter-sample peak of float PCM of shape (frames, channels), estimated by FFT oversampling"""
+    frames = samples.shape[0]
+    if not frames:
+        return 0.0
+
+    spectrum = np.fft.rfft(samples, axis=0)
+    upsampled = np.fft.irfft(spectrum, n=frames * oversample, axis=0) * oversample
+    return float(max(np.max(np.abs(upsampled)), np.max(np.abs(samples))))
+
+
+class Compressor:
+    """
+    Feed-forward RMS compressor with the same parameters as pydub's compress_dynamic_range,
+    computed on whole blocks with NumPy instead of a per-sample Python loop.
+    - level detection: sliding RMS over the attack window (cumulative sums)
+    - gain reduction: (1 - 1/ratio) * dB over threshold
+    - smoothing: gain reduction rises at most at the attack rate and falls at most at the release rate,
+    both as linear dB ramps, solved with running max/min accumulations
+    State is carried across blocks, so a long file can be processed block by block.
+    """
+
+    def __init__(self, sample_rate: int, config: DynamicsConfig):
+        self.threshold_rms = float(db_to_gain(config.threshold))
+        self.slope = 1.0 - 1.0 / config.ratio
+        self.window = max(int(sample_rate * config.attack / 1000), 1)
+
+        # ramp rates in dB per sample, scaled like pydub: the reduction of a full-scale signal over attack/release
+        full_scale_reduction = self.slope * max(-config.threshold, 1.0)
+        self.attack_rate = full_scale_reduction / max(sample_rate * config.attack / 1000, 1)
+        self.release_rate = full_scale_reduction / max(sample_rate * config.release / 1000, 1)
+
+        self._tail = np.zeros(0, dtype=np.float64)  # power of the last `window` frames of the previous block
+        self._release_env = 0.0
+        self._reduction = 0.0
+
+    def gain_reduction(self, block: np.ndarray) -> np.ndarray:
+        """Smoothed gain reduction in dB for every frame of the block"""
+        power = np.mean(np.square(block, dtype=np.float64), axis=1)
+        history = np.concatenate([self._tail, power])
+        cumulative = np.concatenate([[0.0], np.cumsum(history)])
+
+        offset = len(self._tail)
+        ends = np.arange(offset, len(history)) + 1
+        starts = np.maximum(ends - self.window, 0)
+        rms = np.sqrt(np.maximum(cumulative[ends] - cumulative[starts], 0.0) / (ends - starts))
+
+        with np.errstate(divide="ignore"):
+            over_db = 20.0 * np.log10(rms / self.threshold_rms)
+        target = self.slope * np.clip(over_db, 0.0, None)
+
+        steps = np.arange(1, len(target) + 1, dtype=np.float64)
+
+        # instant rise, release-limited fall: env[n] = max(prev - r*n, max_i(target[i] - r*(n-i)))
+        release_env = np.maximum.accumulate(target + self.release_rate * steps) - self.release_rate * steps
+        release_env = np.maximum(release_env, self._release_env - self.release_rate * steps)
+
+        # attack-limited rise: y[n] = min(prev + a*n, min_i(env[i] + a*(n-i)))
+        reduction = np.minimum.accumulate(release_env - self.attack_rate * steps) + self.attack_rate * steps
+        reduction = np.minimum(reduction, self._reduction + self.attack_rate * steps)
+        reduction = np.maximum(reduction, 0.0)
+
+        self._tail = history[-self.window :]
+        self._release_env = float(release_env[-1]) if len(release_env) else self._release_env
+        self._reduction = float(reduction[-1]) if len(reduction) else self._reduction
+
+        return reduction
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Compress a block of float PCM of shape (frames, channels)"""
+        gain = db_to_gain(-self.gain_reduction(block)).astype(np.float32)
+        return block * gain[:, None]
+
+
+class DynamicsProcessor:
+    """
+    Loudness and dynamics processing of PCM as NumPy arrays:
+    gain to target loudness, compression, then true-peak normalization.
+    """
+
+    def __init__(self, config: DynamicsConfig | None = None):
+        self.config = config or DynamicsConfig()
+
+    def _blocks(self, frames: int, sample_rate: int) -> Iterator[Tuple[int, int]]:
+        block = max(int(self.config.block_seconds * sample_rate), 1)
+        for start in range(0, frames, block):
+            yield start, min(start + block, frames)
+
+    def _measure_rms_db(self, samples: np.ndarray, sample_rate: int) -> float:
+        total = 0.0
+        for start, end in self._blocks(len(samples), sample_rate):
+            total += float(np.sum(np.square(samples[start:end], dtype=np.float64)))
+        count = samples.size
+        return gain_to_db(float(np.sqrt(total / count))) if count else -np.inf
+
+    def _compress_in_place(self, samples: np.ndarray, sample_rate: int) -> float:
+        """Apply loudness gain and compression block by block. Returns the true peak of the result."""
+        rms_db = self._measure_rms_db(samples, sample_rate)
+        pre_gain = np.float32(db_to_gain(self.config.target_loudness - rms_db)) if np.isfinite(rms_db) else 1.0
+
+        compressor = Compressor(sample_rate, self.config)
+        peak = 0.0
+        for start, end in self._blocks(len(samples), sample_rate):
+            block = compressor.process(np.asarray(samples[start:end], dtype=np.float32) * pre_gain)
+            samples[start:end] = block
+            peak = max(peak, true_peak(block))
+
+        return peak
+
+    def _normalize_gain(self, peak: float) -> np.float32:
+        if peak <= 0:
+            return np.float32(1.0)
+        return np.float32(db_to_gain(-self.config.headroom - gain_to_db(peak)))
+
+    def process_array(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Process float PCM of shape (frames, channels) in [-1, 1]"""
+        output = np.array(samples, dtype=np.float32, copy=True)
+        peak = self._compress_in_place(output, sample_rate)
+        output *= self._normalize_gain(peak)
+        return np.clip(output, -1.0, 1.0, out=output)
+
+    def process_file(
+        self,
+        file_path: Path,
+        quality_args=("-q:a", "2"),
+        post_process: Optional[PostProcessConfig] = None,
+    ) -> None:
+        """
+        Process an audio file in place with bounded memory.
+        The shared PCM of the file (decoded once, see DecodedAudio) is memory-mapped and processed block by block,
+        then streamed into the encoder. The PCM is updated in place, so it keeps matching the processed audio.
+        With post_process (e.g. the speed-up), its filter chain runs in the encoder, so the audio is still encoded
+        once, and the PCM is rewritten from the filtered stream.
+        """
+        decoded = DecodedAudio.for_audio(file_path)
+        sample_rate, channels = decoded.sample_rate, decoded.channels
+        if not decoded.frames:
+            return
+
+        samples = decoded.samples(mode="r+")
+        tmp_output = file_path.with_name(f"{file_path.stem}.enhanced{file_path.suffix}")
+        post_filters = build_filter_chain(post_process, sample_rate) if post_process else None
+        tmp_pcm = get_pcm_path(tmp_output) if post_filters else None
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "f32le",
+            "-ar",
+            str(sample_rate),
+            "-ac",
+            str(channels),
+            "-i",
+            "pipe:0",
+        ]
+        if post_filters:
+            cmd += ["-filter_complex", f"[0:a]{post_filters},asplit=2[out][pcm]", "-map", "[out]"]
+        cmd += [*quality_args, str(tmp_output)]
+        if tmp_pcm:
+            cmd += ["-map", "[pcm]", "-f", "f32le", str(tmp_pcm)]
+        encoder = None
+        try:
+            peak = self._compress_in_place(samples, sample_rate)
+            normalize_gain = self._normalize_gain(peak)
+
+            encoder = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+            assert encoder.stdin
+            for start, end in self._blocks(len(samples), sample_rate):
+                block = np.clip(samples[start:end] * normalize_gain, -1.0, 1.0)
+                samples[start:end] = block
+                encoder.stdin.write(block.astype("<f4").tobytes())
+            encoder.stdin.close()
+            if encoder.wait() != 0:
+                raise RuntimeError(f"ffmpeg exited with {encoder.returncode}")
+
+            samples.flush()
+            os.replace(tmp_output, file_path)
+            if tmp_pcm:
+                os.replace(tmp_pcm, decoded.pcm_path)
+        except Exception:
+            # the PCM was modified in place and no longer matches the audio
+            del samples
+            discard_decoded_audio(file_path)
+            raise
+        finally:
+            if encoder and encoder.poll() is None:
+                encoder.kill()
+            for path in (tmp_output, tmp_pcm):
+                if path and path.exists():
+                    path.unlink()
@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from typing import List, Literal
+
+LoudnessMode = Literal["loudnorm", "volume", "none"]
+
+# atempo accepts 0.5 - 2.0 per instance on older ffmpeg builds
+ATEMPO_MIN = 0.5
+ATEMPO_MAX = 2.0
+
+
+@dataclass
+class PostProcessConfig:
+    speed_factor: float = 1.15
+    loudness: LoudnessMode = "loudnorm"
+    target_loudness: float = -18.0  # integrated LUFS for loudnorm
+    true_peak: float = -1.5  # dBTP ceiling for loudnorm and the limiter
+    gain_db: float = 0.0  # fixed gain for the "volume" mode
+    limiter: bool = False
+
+
+def _atempo_chain(speed_factor: float) -> List[str]:
+    filters: List[str] = []
+    remaining = speed_factor
+    while remaining > ATEMPO_MAX:
+        filters.append(f"atempo={ATEMPO_MAX}")
+        remaining /= ATEMPO_MAX
+    while remaining < ATEMPO_MIN:
+        filters.append(f"atempo={ATEMPO_MIN}")
+        remaining /= ATEMPO_MIN
+    if abs(remaining - 1.0) > 1e-6:
+        filters.append(f"atempo={remaining:.6f}")
+    return filters
+
+
+def build_filter_chain(config: PostProcessConfig, sample_rate: int) -> str:
+    """
+    Build one ffmpeg filter chain for speed-up, loudness and limiting.
+    - atempo changes speed without changing pitch
+    - loudnorm resamples internally, so the chain resamples back to the source rate
+    """
+    filters = _atempo_chain(config.speed_factor)
+
+    if config.loudness == "loudnorm":
+        filters.append(f"loudnorm=I={config.target_loudness}:TP={config.true_peak}:LRA=11")
+        filters.append(f"aresample={sample_rate}")
+    elif config.loudness == "volume" and config.gain_db:
+        filters.append(f"volume={config.gain_db}dB")
+
+    if config.limiter:
+        limit = min(max(10 ** (config.true_peak / 20), 0.0625), 1.0)
+        filters.append(f"alimiter=limit={limit:.4f}:level=disabled")
+
+    return ",".join(filters)
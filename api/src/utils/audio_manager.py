@@ -1,15 +1,18 @@
 import asyncio
 import logging
-import os
 import re
 import uuid
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import List, Optional
 
+from src.env_var import AUDIO_ENHANCEMENT
 from src.utils.audio_manager_utils import (
     AudioManagerConfig,
     AudioManagerSpeechGenerator,
+    AudioWorkspace,
+    ContentSegment,
     ContentSplitter,
+    OnSegmentReady,
 )
 from src.utils.audio_synthesizer import AudioSynthesizer
 from src.utils.clean_tss_markup import clean_tss_markup
@@ -19,8 +22,8 @@ logger = logging.getLogger(__name__)
 
 
 class AudioManager(AudioManagerSpeechGenerator, ContentSplitter):
-    def __init__(self, custom_config: Optional[AudioManagerConfig] = None):
-        super().__init__()
+    def __init__(self, custom_config: Optional[AudioManagerConfig] = None, session_id: Optional[str] = None):
+        super().__init__(session_id)
 
         self.config = AudioManagerConfig(**custom_config.__dict__) if custom_config else AudioManagerConfig()
         self.config.ensure_directories()
@@ -34,22 +37,29 @@ class AudioManager(AudioManagerSpeechGenerator, ContentSplitter):
         tags.sort()
         return list(set(tags))
 
-    async def generate_speech(self, audio_script: str):
+    async def generate_speech(self, audio_script: str, on_segment: Optional[OnSegmentReady] = None):
         """
         Logic to make audiocast from audio script.
         Args:
             audio_script (str): Audio script to convert to speech.
+            on_segment (OnSegmentReady): Optional callback fired as each segment finishes.
         """
         output_file = f"{self.config.outdir_base}/{str(uuid.uuid4())}.mp3"
-        await self.text_to_speech(audio_script, output_file)
+        await self.text_to_speech(audio_script, output_file, on_segment)
         return output_file
 
-    async def text_to_speech(self, audio_script: str, output_file: str):
+    async def text_to_speech(
+        self,
+        audio_script: str,
+        output_file: str,
+        on_segment: Optional[OnSegmentReady] = None,
+    ):
         """
         Convert audio script to speech and save as an audio file using OpenAI TTS.
         Args:
             audio_script (str): Audio script to convert to speech.
             output_file (str): path to save the output audio file.
+            on_segment (OnSegmentReady): Optional callback fired as each segment finishes.
         Raises:
             Exception: If there's an error in converting text to speech.
         """
@@ -61,42 +71,49 @@ class AudioManager(AudioManagerSpeechGenerator, ContentSplitter):
 
         print(f"nway_content: {nway_content}")
 
-        audio_files = await self.__text_to_speech_openai(nway_content, tags)
+        segments = self.split_long_turns(nway_content, self.config.max_segment_chars)
 
-        if not audio_files:
-            raise Exception("No audio files were generated")
+        with AudioWorkspace.create(self.config.temp_audio_dir) as workspace:
+            audio_files = await self.__text_to_speech_openai(segments, tags, workspace, on_segment)
 
-        await self.__finalize(audio_files, output_file)
+            if not audio_files:
+                raise Exception("No audio files were generated")
+
+            await self.__finalize(audio_files, output_file)
         logger.info(f"Audio saved to {output_file}")
 
-    async def __text_to_speech_openai(self, nway_content: List[Tuple[str, str]], tags: List[str]) -> List[str]:
+    async def __text_to_speech_openai(
+        self,
+        segments: List[ContentSegment],
+        tags: List[str],
+        workspace: AudioWorkspace,
+        on_segment: Optional[OnSegmentReady] = None,
+    ) -> List[str]:
         try:
-            jobs = self._prepare_speech_jobs(nway_content, tags, openai_voices, self.config.temp_audio_dir)
+            jobs = self._prepare_speech_jobs(segments, tags, openai_voices, workspace)
 
-            return await self._process_speech_jobs(jobs)
+            return await self._process_speech_jobs(jobs, workspace, on_segment)
         except Exception as e:
             raise Exception(f"Error converting text to speech with OpenAI: {str(e)}")
 
-    async def __finalize(self, audio_files: List[str], output_file: str, enhance_audio=False) -> None:
+    async def __finalize(self, audio_files: List[str], output_file: str, enhance_audio=AUDIO_ENHANCEMENT) -> None:
         """
         Merge and enhance audio files and save the final output.
         - Run audio processing in thread pool to avoid blocking
+        - Enhancement (loudness, compression, true-peak normalization) runs on the merged PCM with NumPy,
+        and the speed-up runs in the encode that follows
+        - Matching segments are merged by copying their frames, so the enhanced audio is one encode away
+        from the TTS output; segments that cannot be frame-joined are merged by ffmpeg, whose PCM output
+        (not its mp3) feeds the enhancement, so that stays a single lossy generation too
+        - The merged PCM is kept for the post-generation stages, so they do not decode the mp3 again;
+        enhancement rewrites it, so it keeps matching the audio
+        - Segment files are removed together with their workspace
         Args:
-            audio_files (List[str]): List of audio files to merge.
+            audio_files (List[str]): Ordered list of audio files to merge.
             output_file (str): Path to save the final audio output.
+            enhance_audio (bool): Apply dynamics processing to the merged audio.
         """
-        try:
-            synthesizer = AudioSynthesizer()
-            await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                lambda: synthesizer.merge_audio_files(self.config.temp_audio_dir, output_file),
-            )
-            if enhance_audio:
-                await asyncio.get_event_loop().run_in_executor(
-                    self.executor,
-                    lambda: synthesizer.enhance_audio_minimal(Path(output_file)),
-                )
-        finally:
-            for file in audio_files:
-                if os.path.exists(file):
-                    os.remove(file)
+        synthesizer = AudioSynthesizer()
+        await asyncio.to_thread(synthesizer.merge_audio_files, audio_files, output_file, decode_pcm=True)
+        if enhance_audio:
+            await asyncio.to_thread(synthesizer.enhance_audio, Path(output_file))
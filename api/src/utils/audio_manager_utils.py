@@ -1,24 +1,36 @@
 import asyncio
 import os
 import re
-from concurrent.futures import ThreadPoolExecutor
+import shutil
+import uuid
 from dataclasses import dataclass, field
-from functools import partial
 from itertools import cycle, islice
 from pathlib import Path
-from typing import Any, List, Tuple
+from typing import Any, Awaitable, Callable, Coroutine, List, Optional, Set, Tuple
 
 from src.utils.generate_speech_utils import (
+    TTS_MODEL,
+    TTS_RESPONSE_FORMAT,
     GenerateSpeech,
     OpenaiVoice,
     SpeechJob,
 )
+from src.utils.tts_cache import TTSSegmentCache, get_tts_cache_key
+from src.utils.tts_scheduler import get_tts_scheduler
+
+ContentSegment = Tuple[str, str, int]
+"""(speaker tag, text, parent turn) of a size-bounded piece of a speaker turn"""
+
+OnSegmentReady = Callable[[SpeechJob, str], Awaitable[None]]
+"""Called with each speech job and its output file (empty if it failed) as soon as it finishes"""
 
 
 @dataclass
 class AudioManagerConfig:
     temp_audio_dir: str = field(default_factory=lambda: "/tmp/audiora")
     outdir_base: str = field(default_factory=lambda: "/tmp/audiora/output")
+    # Speaker turns longer than this are split at sentence boundaries into parallel TTS jobs
+    max_segment_chars: int = 1500
 
     def ensure_directories(self) -> None:
         """Ensure all required directories exist"""
@@ -26,9 +38,50 @@ class AudioManagerConfig:
             Path(directory).mkdir(parents=True, exist_ok=True)
 
 
+@dataclass
+class AudioWorkspace:
+    """
+    Isolated scratch directory for a single speech generation.
+    Segments are recorded in script order so the merge step never scans a directory.
+    """
+
+    root: Path
+    segments: List[str] = field(default_factory=list)
+
+    @classmethod
+    def create(cls, base_dir: str) -> "AudioWorkspace":
+        """Create a new uniquely named workspace under base_dir"""
+        root = Path(base_dir) / f"ws-{uuid.uuid4()}"
+        root.mkdir(parents=True, exist_ok=False)
+        return cls(root=root)
+
+    def segment_path(self, index: int) -> str:
+        """Path of the segment at the given script position"""
+        return str(self.root / f"{index}.mp3")
+
+    def set_segments(self, audio_files: List[str]) -> List[str]:
+        """Record the ordered manifest of generated segments"""
+        self.segments = [f for f in audio_files if f and os.path.exists(f)]
+        return self.segments
+
+    def cleanup(self) -> None:
+        """Remove the workspace and everything in it"""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self) -> "AudioWorkspace":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.cleanup()
+
+
 class AudioManagerSpeechGenerator:
-    def __init__(self) -> None:
-        self.executor = ThreadPoolExecutor(max_workers=3)
+    _background_tasks: Set[asyncio.Task] = set()
+
+    def __init__(self, session_id: Optional[str] = None) -> None:
+        # TTS calls share the process-wide scheduler; the session id is its fairness group
+        self.session_id = session_id or str(uuid.uuid4())
+        self.tts_cache = TTSSegmentCache()
 
     def _create_voice_mapping(self, tags: List[str], voices: List[Any]):
         """Create mapping of tags to voices"""
@@ -37,21 +90,21 @@ class AudioManagerSpeechGenerator:
 
     def _prepare_speech_jobs(
         self,
-        nway_content: List[Tuple[str, str]],
+        segments: List[ContentSegment],
         tags: List[str],
         voices: List[OpenaiVoice],
-        temp_audio_dir: str,
+        workspace: AudioWorkspace,
     ):
         jobs: List[SpeechJob] = []
         counter = 0
         # Create tag-to-voice mapping
         voice_mapping = self._create_voice_mapping(tags, voices)
 
-        for tag, content_part in nway_content:
+        for tag, content_part, turn in segments:
             if not content_part.strip():
                 continue
             counter += 1
-            file_name = f"{temp_audio_dir}/{counter}.mp3"
+            file_name = workspace.segment_path(counter)
             jobs.append(
                 SpeechJob(
                     content=content_part,
@@ -59,18 +112,51 @@ class AudioManagerSpeechGenerator:
                     output_file=file_name,
                     tag=tag,
                     index=counter,
+                    turn=turn,
                 )
             )
 
         return jobs
 
-    async def _process_speech_jobs(self, jobs: List[SpeechJob]) -> List[str]:
-        loop = asyncio.get_event_loop()
-        tasks = [loop.run_in_executor(self.executor, partial(GenerateSpeech().run, job)) for job in jobs]
+    async def _synthesize(self, job: SpeechJob) -> str:
+        """Serve a segment from the TTS cache, otherwise generate and cache it"""
+        key = get_tts_cache_key(TTS_MODEL, job.voice, TTS_RESPONSE_FORMAT, job.content)
+        if await asyncio.to_thread(self.tts_cache.get, key, TTS_RESPONSE_FORMAT, job.output_file):
+            print(f"TTS cache hit for tag {job.tag} at index {job.index}")
+            return job.output_file
+
+        async with get_tts_scheduler().slot(self.session_id, len(job.content)):
+            output_file = await GenerateSpeech().run_async(job)
 
-        results = await asyncio.gather(*tasks)
-        audio_files = [f for f in results if f and os.path.exists(f)]
-        return audio_files
+        if output_file and await asyncio.to_thread(self.tts_cache.put, key, TTS_RESPONSE_FORMAT, output_file):
+            # the upload to the shared tier stays off the segment's critical path
+            self._run_in_background(asyncio.to_thread(self.tts_cache.upload, key, TTS_RESPONSE_FORMAT))
+        return output_file
+
+    def _run_in_background(self, coro: Coroutine):
+        task = asyncio.create_task(coro)
+        # the event loop keeps only weak references to tasks
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _process_speech_jobs(
+        self,
+        jobs: List[SpeechJob],
+        workspace: AudioWorkspace,
+        on_segment: Optional[OnSegmentReady] = None,
+    ) -> List[str]:
+        async def _run(job: SpeechJob) -> str:
+            output_file = await self._synthesize(job)
+            if on_segment:
+                try:
+                    await on_segment(job, output_file)
+                except Exception as e:
+                    print(f"on_segment callback failed for index {job.index}: {str(e)}")
+            return output_file
+
+        # gather preserves job order, so the manifest follows the script order
+        results = await asyncio.gather(*[_run(job) for job in jobs])
+        return workspace.set_segments(results)
 
 
 class ContentSplitter:
@@ -90,6 +176,58 @@ class ContentSplitter:
         matches = re.findall(r"<(Speaker\d+)>(.*?)</Speaker\d+>", content, re.DOTALL)
         return [(str(speaker), " ".join(content_part.split()).strip()) for speaker, content_part in matches]
 
+    def split_long_turns(self, nway_content: List[Tuple[str, str]], max_chars: int) -> List[ContentSegment]:
+        """
+        Split long speaker turns at sentence boundaries into chunks of at most max_chars.
+        Args:
+            nway_content (List[Tuple[str, str]]): Speaker turns as returned by split_content.
+            max_chars (int): Maximum number of characters per chunk.
+        Returns:
+            List[ContentSegment]: Chunks in script order, each with its speaker tag and parent turn.
+        """
+        segments: List[ContentSegment] = []
+        for turn, (tag, content_part) in enumerate(nway_content, start=1):
+            for chunk in self.chunk_sentences(content_part, max_chars):
+                segments.append((tag, chunk, turn))
+        return segments
+
+    @staticmethod
+    def chunk_sentences(text: str, max_chars: int) -> List[str]:
+        """
+        Pack whole sentences into chunks of at most max_chars.
+        Sentences longer than max_chars are split at clause boundaries, then at word boundaries.
+        """
+        if len(text) <= max_chars:
+            return [text]
+
+        pieces: List[str] = []
+        for sentence in re.split(r"(?<=[.!?…])\s+|(?<=[.!?…][\"')\]])\s+", text):
+            if len(sentence) <= max_chars:
+                pieces.append(sentence)
+                continue
+            for clause in re.split(r"(?<=[,;:])\s+", sentence):
+                while len(clause) > max_chars:
+                    cut = clause.rfind(" ", 0, max_chars)
+                    cut = cut if cut > 0 else max_chars
+                    pieces.append(clause[:cut])
+                    clause = clause[cut:].lstrip()
+                pieces.append(clause)
+
+        chunks: List[str] = []
+        current = ""
+        for piece in pieces:
+            if not piece:
+                continue
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+        if current:
+            chunks.append(current)
+
+        return chunks
+
     @staticmethod
     def validate_content(content: str, tags: List[str]) -> bool:
         """
@@ -1,9 +1,9 @@
-import os
-import re
 from pathlib import Path
-from typing import List, Union
+from typing import List
 
-from pydub import AudioSegment
+from src.utils.audio_filter_graph import PostProcessConfig
+from src.utils.decoded_audio import DecodedAudio, discard_decoded_audio, get_pcm_path
+from src.utils.mp3_concat import merge_mp3_files
 
 
 class AudioEnhancer:
@@ -15,9 +15,12 @@ class AudioEnhancer:
         release=100.0,
         threshold=-20.0,
         ratio=2.5,
+        speed_factor=1.0,
     ) -> None:
         """
         Enhance audio using professional-grade processing.
+        - Loudness, compression and true-peak normalization run on NumPy arrays block by block
+        - The speed change runs as an ffmpeg filter in the same encode
         Args:
             file_path (Path): Path to the audio file
             target_loudness (float): Target loudness in dBFS (default: -20.0)
@@ -25,86 +28,55 @@ class AudioEnhancer:
             release (float): Compressor release time in ms (default: 100.0)
             threshold (float): Compression threshold in dBFS (default: -20.0)
             ratio (float): Compression ratio (default: 2.5)
+            speed_factor (float): Playback speed factor (default: 1.0)
         """
+        from src.utils.audio_dynamics import DynamicsConfig, DynamicsProcessor
+
         try:
-            audio = AudioSegment.from_file(str(file_path))
-            enhanced = (
-                audio.apply_gain(-audio.dBFS + target_loudness)
-                .compress_dynamic_range(
-                    threshold=threshold, ratio=ratio, attack=attack, release=release
-                )
-                .normalize(headroom=0.1)
+            config = DynamicsConfig(
+                target_loudness=target_loudness,
+                attack=attack,
+                release=release,
+                threshold=threshold,
+                ratio=ratio,
             )
-
-            # Export processed audio
-            enhanced.export(
-                str(file_path),
-                format=file_path.suffix.lstrip("."),
-                parameters=["-q:a", "2"],  # High quality encoding
+            # loudness is handled by the dynamics processing, so the filter chain only changes speed
+            post_process = (
+                PostProcessConfig(speed_factor=speed_factor, loudness="none") if speed_factor != 1.0 else None
             )
+            # High quality encoding
+            DynamicsProcessor(config).process_file(file_path, quality_args=("-q:a", "2"), post_process=post_process)
             print(f"Successfully enhanced audio: {file_path}")
         except Exception as e:
             print(f"Audio enhancement failed: {str(e)}")
             print("Continuing with original audio")
 
-    def enhance_audio_minimal(
-        self, file_path: Path, speed_factor: float = 1.15
-    ) -> None:
-        """
-        Minimal processing for multi-speaker content
-        Args:
-            file_path (Path): Path to the audio file
-            speed_factor (float): Playback speed factor (default 1.15) (original 1.0)
-        """
-        try:
-            audio = AudioSegment.from_file(str(file_path))
-            # Adjust speed without changing pitch
-            audio = audio.speedup(playback_speed=speed_factor)
-            # Only normalize if significant volume differences
-            if abs(audio.dBFS + 18.0) > 3.0:  # +/- 3dB tolerance
-                # Calculate gain needed to reach target dBFS of -18.0
-                gain_needed = -18.0 - audio.dBFS
-                audio = audio.apply_gain(gain_needed)
-
-            # Export with high quality
-            audio.export(
-                str(file_path),
-                format=file_path.suffix.lstrip("."),
-                parameters=["-q:a", "2"],
-            )
-        except Exception as e:
-            print(f"Normalization failed: {str(e)}")
-            print("Continuing with original audio")
-
 
 class AudioSynthesizer(AudioEnhancer):
-    def merge_audio_files(self, input_dir: str, output_file: str) -> None:
+    def merge_audio_files(
+        self,
+        audio_files: List[str],
+        output_file: str,
+        decode_pcm=False,
+    ) -> None:
         """
-        Merge all audio files in the input directory sequentially and save the result.
+        Merge the given audio files sequentially and save the result.
+        - Segments are joined at the mp3 frame level when their stream parameters match
+        - Falls back to a streaming ffmpeg concat when they differ
+        - With decode_pcm, the merged PCM is kept next to the output for later stages (see DecodedAudio)
         Args:
-            input_dir (str): Path to the directory containing audio files.
+            audio_files (List[str]): Ordered manifest of audio files to merge.
             output_file (str): Path to save the merged audio file.
+            decode_pcm (bool): Keep the decoded PCM of the merged audio.
         """
         try:
-
-            def natural_sort_key(filename: str) -> List[Union[int, str]]:
-                return [
-                    int(text) if text.isdigit() else text
-                    for text in re.split(r"(\d+)", filename)
-                ]
-
-            combined = AudioSegment.empty()
-            audio_files = sorted(
-                [f for f in os.listdir(input_dir) if f.endswith("mp3")],
-                key=natural_sort_key,
-            )
-            for file in audio_files:
-                if file.endswith("mp3"):
-                    file_path = os.path.join(input_dir, file)
-                    combined += AudioSegment.from_file(file_path, format="mp3")
-
-            combined.export(output_file, format="mp3")
-            print(f"Merged audio saved to {output_file}")
+            discard_decoded_audio(output_file)
+            pcm_output = str(get_pcm_path(output_file)) if decode_pcm else None
+            mode = merge_mp3_files(audio_files, output_file, pcm_output)
+            if decode_pcm and mode == "frames":
+                # frames were copied without decoding, so the merged audio is decoded once here
+                DecodedAudio.for_audio(output_file)
+            print(f"Merged audio saved to {output_file} (mode: {mode})")
         except Exception as e:
             raise Exception(f"Error merging audio files: {str(e)}")
 
@@ -123,4 +95,5 @@ class AudioSynthesizer(AudioEnhancer):
             release=50.0,  # Faster release for natural speech
             threshold=-24.0,  # Lower threshold for voice
             ratio=2.0,  # Gentler compression for voice
+            speed_factor=1.15,  # Faster pace for multi-speaker content
         )
@@ -1,33 +1,36 @@
 import os
 import subprocess
 
+from src.utils.video_mux import STILL_IMAGE_ENCODE, VideoEncodeConfig, audio_copy_args, ensure_aac_track
 
-def create_video_from_audio(audio_path: str, image_path: str, output_path: str):
-    """Create a video with audio and spectrogram overlay."""
-    cmd = [
-        "ffmpeg",
-        "-y",
-        "-loop",
-        "1",
-        "-i",
-        image_path,
-        "-i",
-        audio_path,
-        "-c:v",
-        "libx264",
-        "-tune",
-        "stillimage",
-        "-c:a",
-        "aac",
-        "-b:a",
-        "192k",
-        "-pix_fmt",
-        "yuv420p",
-        "-shortest",
-        output_path,
-    ]
 
+def create_video_from_audio(
+    audio_path: str,
+    image_path: str,
+    output_path: str,
+    video: VideoEncodeConfig = STILL_IMAGE_ENCODE,
+):
+    """
+    Create a video with audio and spectrogram overlay.
+    The still image is encoded once and the audio is stream-copied from its shared AAC track.
+    """
     try:
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-loop",
+            "1",
+            "-i",
+            image_path,
+            "-i",
+            str(ensure_aac_track(audio_path)),
+            "-map",
+            "0:v",
+            *video.args(),
+            *audio_copy_args(1),
+            "-shortest",
+            output_path,
+        ]
         subprocess.run(cmd, check=True)
         os.remove(image_path)  # Clean up temporary spectrogram
         return True
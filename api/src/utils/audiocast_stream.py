@@ -0,0 +1,157 @@
+import asyncio
+import os
+from typing import AsyncGenerator, Dict, List, Literal, Optional
+
+from src.services.redis_client import get_redis
+from src.utils.generate_speech_utils import SpeechJob
+from src.utils.mp3_concat import strip_to_frames
+
+StreamState = Literal["preparing", "streaming", "done", "failed"]
+
+STREAM_TTL = 3600
+POLL_INTERVAL = 0.25
+# how long to wait for a generation to start, and for the source and script of a started one
+START_TIMEOUT = 60
+PREPARE_TIMEOUT = 600
+IDLE_TIMEOUT = 180
+
+
+def _segments_key(session_id: str):
+    return f"audiocast_stream:{session_id}:segments"
+
+
+def _state_key(session_id: str):
+    return f"audiocast_stream:{session_id}:state"
+
+
+class SegmentReorderBuffer:
+    """
+    Hold segments that finish out of order and release them in script order.
+    A segment pushed as None (failed TTS job) is skipped once its turn comes.
+    """
+
+    def __init__(self, start_index=1):
+        self._next_index = start_index
+        self._pending: Dict[int, Optional[bytes]] = {}
+
+    @property
+    def pending(self) -> int:
+        """Number of segments waiting for an earlier one"""
+        return len(self._pending)
+
+    def push(self, index: int, data: Optional[bytes]) -> List[bytes]:
+        """Add a finished segment and return every segment that is now ready, in order"""
+        self._pending[index] = data
+
+        ready: List[bytes] = []
+        while self._next_index in self._pending:
+            segment = self._pending.pop(self._next_index)
+            self._next_index += 1
+            if segment:
+                ready.append(segment)
+
+        return ready
+
+
+def read_segment_frames(output_file: str) -> Optional[bytes]:
+    """Audio frames of a finished segment, or None if it was not generated"""
+    if not output_file or not os.path.exists(output_file):
+        return None
+    with open(output_file, "rb") as f:
+        return strip_to_frames(f.read())
+
+
+class AudiocastStreamPublisher:
+    """
+    Publish TTS segments of an in-progress generation for progressive playback.
+    Segments go through Redis so any worker can serve the stream.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.buffer = SegmentReorderBuffer()
+        self.redis = get_redis()
+
+    async def _set_state(self, state: StreamState, reset=False):
+        try:
+            if reset:
+                await self.redis.delete(_segments_key(self.session_id))
+            await self.redis.set(_state_key(self.session_id), state, ex=STREAM_TTL)
+        except Exception as e:
+            print(f"Failed to set audiocast stream of {self.session_id} to {state}: {str(e)}")
+
+    async def prepare(self):
+        """Reset any previous stream for this session, and keep listeners waiting while source and script are made"""
+        await self._set_state("preparing", reset=True)
+
+    async def start(self):
+        """Mark the stream as receiving segments"""
+        await self._set_state("streaming", reset=True)
+
+    async def on_segment(self, job: SpeechJob, output_file: str):
+        """Callback for AudioManager.generate_speech"""
+        data: Optional[bytes] = None
+        try:
+            data = await asyncio.to_thread(read_segment_frames, output_file)
+        except Exception as e:
+            print(f"Skipping unreadable segment {job.index} of {self.session_id}: {str(e)}")
+
+        # a segment that cannot be read still takes its turn, or every later segment would wait behind it
+        ready = self.buffer.push(job.index, data)
+        if ready:
+            key = _segments_key(self.session_id)
+            await self.redis.rpush(key, *ready)
+            await self.redis.expire(key, STREAM_TTL)
+
+    async def finish(self, state: StreamState = "done"):
+        """Mark the stream as complete so listeners can close their connection"""
+        await self._set_state(state)
+
+
+async def stream_audiocast_segments(session_id: str) -> AsyncGenerator[bytes, None]:
+    """
+    Yield audio segments of a session in script order as soon as they are published.
+    Waits for the generation to start and for its source and script to be made,
+    and ends once it is done, failed or idle for too long.
+    """
+    redis = get_redis()
+    segments_key = _segments_key(session_id)
+    state_key = _state_key(session_id)
+
+    next_index = 0
+    waited = 0.0
+    last_state = None
+    while True:
+        segments = await redis.lrange(segments_key, next_index, -1)
+        for segment in segments:
+            yield segment
+        next_index += len(segments)
+
+        if segments:
+            waited = 0.0
+            continue
+
+        state = await redis.get(state_key)
+        state = state.decode() if isinstance(state, bytes) else state
+        if state in ("done", "failed"):
+            # drain anything published between the last read and the state change
+            for segment in await redis.lrange(segments_key, next_index, -1):
+                yield segment
+            return
+
+        # each state has its own timeout, counted from when it was entered
+        if state != last_state:
+            last_state = state
+            waited = 0.0
+
+        if state is None:
+            timeout = START_TIMEOUT
+        elif state == "preparing":
+            timeout = PREPARE_TIMEOUT
+        else:
+            timeout = IDLE_TIMEOUT
+        if waited >= timeout:
+            return
+
+        await asyncio.sleep(POLL_INTERVAL)
+        waited += POLL_INTERVAL
@@ -1,7 +1,5 @@
-from typing import Literal, Optional, TypedDict, cast
+from typing import TYPE_CHECKING, Literal, Optional, TypedDict, cast
 
-from google.cloud.firestore_v1 import DocumentReference
-from google.cloud.firestore_v1.base_query import FieldFilter
 from pydantic import BaseModel
 
 from src.services.firestore_sdk import (
@@ -10,6 +8,9 @@ from src.services.firestore_sdk import (
     collections,
 )
 
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1 import DocumentReference
+
 
 class SourceContent(BaseModel):
     id: str
@@ -62,7 +63,7 @@ class CustomSourceManager(DBManager):
             raise Exception("Session not found")
         return doc
 
-    def _get_doc_ref(self, source_id: str) -> DocumentReference:
+    def _get_doc_ref(self, source_id: str) -> "DocumentReference":
         self._check_document()
         return (
             self._get_collection(self.collection)
@@ -106,6 +107,8 @@ class CustomSourceManager(DBManager):
         return self._get_doc_ref(source_id).delete()
 
     def _get_custom_source_by_url(self, url: str):
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
         self._check_document()
         try:
             session_ref = self._get_collection(self.collection).document(self.doc_id)
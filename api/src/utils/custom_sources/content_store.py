@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import json
+
+from fastapi import UploadFile
+from pydantic import BaseModel
+
+from src.services.storage import BLOB_BASE_URI, StorageManager, UploadItemParams
+
+from .read_content import ReadContent
+
+HASH_CHUNK_SIZE = 1024 * 1024
+UPLOADS_DIR = "uploads"
+EXTRACTED_DIR = "extracted"
+
+
+class UploadDigest(BaseModel):
+    sha256: str
+    size: int
+
+
+class ExtractedContent(BaseModel):
+    content: str
+    content_type: str
+    metadata: dict = {}
+
+
+async def hash_upload(file: UploadFile) -> UploadDigest:
+    """SHA-256 and size of an uploaded file, read in chunks. The file is rewound afterwards."""
+    digest = hashlib.sha256()
+    size = 0
+
+    await file.seek(0)
+    while chunk := await file.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    await file.seek(0)
+
+    return UploadDigest(sha256=digest.hexdigest(), size=size)
+
+
+class ContentStore(ReadContent):
+    """
+    Content-addressed store of uploaded files and the text extracted from them.
+    - blobs are named by the SHA-256 of the uploaded bytes, so identical files share one blob
+    whatever name or session they were uploaded under
+    - extracted text is cached next to them, so a file is parsed once
+    """
+
+    def __init__(self):
+        self.storage_manager = StorageManager()
+
+    def _blobname(self, filename: str):
+        return f"{BLOB_BASE_URI}/{filename}"
+
+    def _raw_filename(self, digest: UploadDigest):
+        return f"{UPLOADS_DIR}/{digest.sha256}"
+
+    def _text_filename(self, digest: UploadDigest):
+        return f"{EXTRACTED_DIR}/{digest.sha256}.txt"
+
+    def _extraction_filename(self, digest: UploadDigest):
+        return f"{EXTRACTED_DIR}/{digest.sha256}.json"
+
+    def _get_cached_extraction(self, digest: UploadDigest, content_type: str) -> ExtractedContent | None:
+        filename = self._extraction_filename(digest)
+        if not self.storage_manager.check_blob_exists(filename):
+            return None
+
+        extracted = ExtractedContent.model_validate_json(self.storage_manager.read_blob(self._blobname(filename)))
+        # the same bytes declared as another type are parsed again
+        return extracted if extracted.content_type == content_type else None
+
+    def _cache_extraction(self, digest: UploadDigest, extracted: ExtractedContent):
+        try:
+            self.storage_manager.upload_to_gcs(
+                # document metadata (e.g. pdf dates) may hold values JSON does not know
+                json.dumps(extracted.model_dump(), default=str),
+                self._blobname(self._extraction_filename(digest)),
+                UploadItemParams(content_type="application/json"),
+            )
+        except Exception as e:
+            print(f"Failed to cache extracted content {digest.sha256}: {str(e)}")
+
+    async def extract(self, file: UploadFile, digest: UploadDigest) -> ExtractedContent | None:
+        """Text of an uploaded file, parsed only if these bytes were never extracted before"""
+        content_type = file.content_type or ""
+        cached = await asyncio.to_thread(self._get_cached_extraction, digest, content_type)
+        if cached:
+            print(f"Reusing extracted content of {file.filename}: {digest.sha256}")
+            return cached
+
+        file_bytes = await file.read()
+        await file.seek(0)
+
+        result = await asyncio.to_thread(self._extract_text, file_bytes, content_type)
+        if not result:
+            return None
+
+        text_content, metadata = result
+        extracted = ExtractedContent(content=text_content, content_type=content_type, metadata=metadata)
+        await asyncio.to_thread(self._cache_extraction, digest, extracted)
+        return extracted
+
+    async def store_raw(self, file: UploadFile, digest: UploadDigest) -> str:
+        """Store the uploaded bytes unless identical bytes were stored before. Returns the gs:// URL."""
+        filename = self._raw_filename(digest)
+        if not await asyncio.to_thread(self.storage_manager.check_blob_exists, filename):
+            await file.seek(0)
+            await asyncio.to_thread(
+                self.storage_manager.upload_to_gcs,
+                file.file,
+                self._blobname(filename),
+                UploadItemParams(content_type=file.content_type or "application/octet-stream"),
+            )
+        return self.storage_manager.get_gcs_url(filename)
+
+    async def store_text(self, file: UploadFile, digest: UploadDigest) -> str | None:
+        """
+        Store the text extracted from the upload as text/plain, addressed by the hash of the uploaded bytes.
+        Returns the gs:// URL, or None if the file type has no text extractor.
+        """
+        filename = self._text_filename(digest)
+        if await asyncio.to_thread(self.storage_manager.check_blob_exists, filename):
+            return self.storage_manager.get_gcs_url(filename)
+
+        extracted = await self.extract(file, digest)
+        if not extracted:
+            return None
+
+        return await asyncio.to_thread(
+            self.storage_manager.upload_to_gcs,
+            extracted.content,
+            self._blobname(filename),
+            UploadItemParams(content_type="text/plain"),
+        )
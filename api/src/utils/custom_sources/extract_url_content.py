@@ -2,7 +2,6 @@ from urllib.parse import urlparse
 from uuid import uuid4
 
 import httpx
-from bs4 import BeautifulSoup, Tag
 from pydantic import BaseModel
 
 from src.services.storage import StorageManager
@@ -30,6 +29,8 @@ class ExtractURLContent(ReadContent):
         return self._clean_text(text_content), metadata
 
     def _extract_html(self, content: bytes) -> tuple[str, dict]:
+        from bs4 import BeautifulSoup, Tag
+
         soup = BeautifulSoup(content, "lxml")
         for element in soup(["script", "style", "nav", "footer"]):
             element.decompose()
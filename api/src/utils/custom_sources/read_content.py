@@ -1,12 +1,16 @@
 from io import BytesIO
+from typing import TYPE_CHECKING
 
-from docx import Document
 from fastapi import UploadFile
-from pypdf import PdfReader
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
 
 
 class ReadContent:
-    def _read_pdf(self, content: bytes) -> tuple[str, PdfReader]:
+    def _read_pdf(self, content: bytes) -> tuple[str, "PdfReader"]:
+        from pypdf import PdfReader
+
         pdf_reader = PdfReader(BytesIO(content))
 
         pages: list[str] = []
@@ -23,22 +27,31 @@ class ReadContent:
         return content.decode()
 
     def _read_docx(self, content: bytes) -> str:
+        from docx import Document
+
         doc = Document(BytesIO(content))
         return "\n\n".join([p.text for p in doc.paragraphs])
 
+    def _extract_text(self, content: bytes, content_type: str | None) -> tuple[str, dict] | None:
+        """Text and metadata of a supported document, or None for other content types"""
+        if content_type == "application/pdf":
+            text_content, pdf_reader = self._read_pdf(content)
+            return text_content, {**(pdf_reader.metadata or {}), "pages": pdf_reader.get_num_pages()}
+        elif content_type == "text/plain":
+            return self._read_txt(content), {}
+        elif content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+            return self._read_docx(content), {}
+
+        return None
+
     async def _read_file(self, file: UploadFile, preserve: bool):
         file_bytes = await file.read()
 
         if preserve:
             return BytesIO(file_bytes)
 
-        if file.content_type == "application/pdf":
-            text_content, _ = self._read_pdf(file_bytes)
-        elif file.content_type == "text/plain":
-            text_content = self._read_txt(file_bytes)
-        elif file.content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            text_content = self._read_docx(file_bytes)
-        else:
+        result = self._extract_text(file_bytes, file.content_type)
+        if not result:
             return BytesIO(file_bytes)
 
-        return text_content
+        return result[0]
@@ -1,46 +1,32 @@
-from uuid import uuid4
-
 from fastapi import UploadFile
 
 from .base_utils import CustomSourceManager, CustomSourceModel, SourceContent
-from .read_content import ReadContent
+from .content_store import ContentStore, hash_upload
 
 TEN_MB = 10 * 1024 * 1024
 
 
-class UploadedFiles(ReadContent):
+class UploadedFiles(ContentStore):
     def __init__(self, session_id: str):
+        super().__init__()
         self.session_id = session_id
 
     async def _extract_content(self, file: UploadFile):
-        file_bytes = await file.read()
+        digest = await hash_upload(file)
         # ensure file size is less than 10MB
-        if len(file_bytes) > TEN_MB:
+        if digest.size > TEN_MB:
             return None
 
-        if file.content_type == "application/pdf":
-            text_content, pdf_reader = self._read_pdf(file_bytes)
-
-            metadata = {**(pdf_reader.metadata or {}), "pages": pdf_reader.get_num_pages()}
-            content_type = "application/pdf"
-        elif file.content_type == "text/plain":
-            text_content = self._read_txt(file_bytes)
-
-            metadata = {}
-            content_type = "text/plain"
-        elif file.content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            text_content = self._read_docx(file_bytes)
-
-            metadata = {}
-            content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        else:
+        extracted = await self.extract(file, digest)
+        if not extracted:
             return None
 
         return SourceContent(
-            id=str(uuid4()),
-            content=text_content,
-            content_type=content_type,
-            metadata=metadata,
+            # identical files uploaded to a session map to the same source
+            id=digest.sha256,
+            content=extracted.content,
+            content_type=extracted.content_type,
+            metadata=extracted.metadata,
             title=file.filename,
         )
 
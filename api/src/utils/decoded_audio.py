@@ -0,0 +1,149 @@
+import os
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Tuple
+from uuid import uuid4
+
+from src.utils.mp3_concat import probe_mp3
+
+if TYPE_CHECKING:
+    import numpy as np
+
+PCM_SUFFIX = ".f32"
+
+
+def probe_audio_format(file_path: Path) -> Tuple[int, int]:
+    """Sample rate and channel count of an audio file"""
+    if file_path.suffix.lower() == ".mp3":
+        with open(file_path, "rb") as f:
+            info = probe_mp3(f.read())
+        return info.sample_rate, info.channels
+
+    from pydub.utils import mediainfo
+
+    info = mediainfo(str(file_path))
+    return int(info["sample_rate"]), int(info["channels"])
+
+
+def decode_to_raw(file_path: Path, raw_path: Path, sample_rate: int, channels: int) -> None:
+    """Decode an audio file to interleaved little-endian float32 PCM"""
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-i",
+        str(file_path),
+        "-f",
+        "f32le",
+        "-ar",
+        str(sample_rate),
+        "-ac",
+        str(channels),
+        str(raw_path),
+    ]
+    subprocess.run(cmd, check=True)
+
+
+def decode_to_array(file_path: Path, sample_rate: int, channels: int) -> "np.ndarray":
+    """Decode an audio file to float32 PCM of shape (frames, channels), read straight from ffmpeg's stdout"""
+    import numpy as np
+
+    cmd = [
+        "ffmpeg",
+        "-loglevel",
+        "error",
+        "-i",
+        str(file_path),
+        "-f",
+        "f32le",
+        "-ar",
+        str(sample_rate),
+        "-ac",
+        str(channels),
+        "pipe:1",
+    ]
+    result = subprocess.run(cmd, check=True, capture_output=True)
+    return np.frombuffer(result.stdout, dtype="<f4").reshape(-1, channels)
+
+
+def get_pcm_path(audio_path: str | Path) -> Path:
+    """Raw float32 PCM artifact kept next to an audio file"""
+    return Path(f"{audio_path}{PCM_SUFFIX}")
+
+
+def discard_decoded_audio(audio_path: str | Path) -> None:
+    """Remove the PCM artifact of an audio file, e.g. after the audio was rewritten"""
+    get_pcm_path(audio_path).unlink(missing_ok=True)
+
+
+@dataclass
+class DecodedAudio:
+    """
+    Decoded PCM of an audio file, shared by every stage that reads samples.
+    The PCM is a raw float32 file next to the audio, written once (ideally by the merge itself)
+    and memory-mapped by each reader instead of decoding the mp3 again.
+    Whoever rewrites the audio must rewrite or discard the PCM.
+    """
+
+    audio_path: Path
+    pcm_path: Path
+    sample_rate: int
+    channels: int
+
+    @classmethod
+    def for_audio(cls, audio_path: str | Path) -> "DecodedAudio":
+        """Reuse the PCM of an audio file, decoding it only if it does not exist yet"""
+        audio_path = Path(audio_path)
+        sample_rate, channels = probe_audio_format(audio_path)
+        decoded = cls(audio_path, get_pcm_path(audio_path), sample_rate, channels)
+
+        if not decoded.is_valid():
+            decoded.decode()
+        return decoded
+
+    def is_valid(self) -> bool:
+        """Whether the PCM file exists and holds whole frames"""
+        try:
+            size = self.pcm_path.stat().st_size
+        except FileNotFoundError:
+            return False
+        return size > 0 and size % (4 * self.channels) == 0
+
+    def decode(self) -> None:
+        """Decode the audio to the PCM file, replacing it atomically"""
+        tmp_path = self.pcm_path.with_name(f"{self.pcm_path.name}.{uuid4()}.part")
+        try:
+            decode_to_raw(self.audio_path, tmp_path, self.sample_rate, self.channels)
+            os.replace(tmp_path, self.pcm_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @property
+    def frames(self) -> int:
+        """Number of sample frames in the PCM"""
+        return self.pcm_path.stat().st_size // (4 * self.channels)
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds"""
+        return self.frames / self.sample_rate
+
+    def samples(self, mode="r") -> "np.ndarray":
+        """Memory-mapped PCM of shape (frames, channels)"""
+        import numpy as np
+
+        if not self.frames:
+            # an empty file cannot be memory-mapped
+            return np.zeros((0, self.channels), dtype="<f4")
+        return np.memmap(self.pcm_path, dtype="<f4", mode=mode).reshape(-1, self.channels)
+
+    def mono(self) -> "np.ndarray":
+        """Samples downmixed to one channel"""
+        import numpy as np
+
+        samples = self.samples()
+        if self.channels == 1:
+            return samples[:, 0]
+        return samples.mean(axis=1, dtype=np.float32)
@@ -1,18 +1,23 @@
 import asyncio
-import os
 
 from fastapi import BackgroundTasks, HTTPException
 
-from src.services.storage import StorageManager
+from src.env_var import POST_GENERATION_QUEUE
 
 from .audio_manager import AudioManager
 from .audiocast_script_maker import AudioScriptMaker
+from .audiocast_stream import AudiocastStreamPublisher
 from .audiocast_utils import GenerateAudioCastRequest
 from .chat_utils import ContentCategory
 from .custom_sources.base_utils import CustomSourceManager
 from .generate_audiocast_source import GenerateAiSourceRequest, generate_ai_source
-from .session_manager import SessionManager
-from .waveform_utils import WaveformUtils
+from .post_generation import (
+    cleanup_local_audio,
+    create_post_generation_job,
+    enqueue_post_generation,
+    run_post_generation,
+)
+from .session_manager import SessionManager, SessionModel
 
 
 class GenerateAudiocastException(HTTPException):
@@ -35,23 +40,49 @@ def post_generate_audio(
     audio_path: str,
     audio_script: str,
 ):
+    """Run the post-generation stages in this process, when no post-generation worker is deployed"""
+    job = create_post_generation_job(session_id, category, audio_path, audio_script)
     try:
-        # Store audio
-        storage_manager = StorageManager()
-        storage_manager.upload_audio_to_gcs(audio_path, session_id)
-
-        # Update session metadata
-        db = SessionManager(session_id, category)
-        db._update_transcript(audio_script)
-
-        # Generate and save audio waveform as mp4
-        waveform_utils = WaveformUtils(session_id, audio_path)
-        waveform_utils.run_all()
+        run_post_generation(job)
     except Exception as e:
         print(f"Error in generate_audiocast background_tasks: {str(e)}")
     finally:
-        if os.path.exists(audio_path):
-            os.remove(audio_path)
+        cleanup_local_audio(job)
+
+
+async def make_audio_script(db: SessionManager, session_data: SessionModel, summary: str) -> str:
+    """Generate the source material, unless the session has one, and the audio script"""
+    session_id = db.doc_id
+    category = db.category
+
+    ai_source = session_data.metadata.source if session_data.metadata else None
+
+    if not ai_source:
+        db._update_info("Generating source content...")
+        ai_source = await generate_ai_source(
+            GenerateAiSourceRequest(sessionId=session_id, category=category, preferenceSummary=summary),
+        )
+
+    if not ai_source:
+        raise GenerateAudiocastException(
+            status_code=500, detail="Failed to generate source material", session_id=session_id
+        )
+
+    # get custom sources
+    db._update_info("Checking for custom sources...")
+    compiled_custom_sources = compile_custom_sources(session_id)
+
+    # Generate audio script
+    db._update_info("Generating audio script...")
+    script_maker = AudioScriptMaker(category, ai_source, compiled_custom_sources)
+    audio_script = script_maker.create(provider="gemini")
+
+    if not audio_script:
+        raise GenerateAudiocastException(
+            status_code=500, detail="Failed to generate audio script", session_id=session_id
+        )
+
+    return audio_script
 
 
 async def generate_audiocast(request: GenerateAudioCastRequest, background_tasks: BackgroundTasks):
@@ -84,51 +115,41 @@ async def generate_audiocast(request: GenerateAudioCastRequest, background_tasks
         background_tasks.add_task(retry_generation)
         return "Audiocast generation in progress. Please wait..."
 
-    db._update({"status": "generating"})
-
-    def update_session_info(info: str):
-        db._update_info(info)
-
-    ai_source = session_data.metadata.source if session_data and session_data.metadata else None
+    db._update({"status": "generating"}, flush=True)
 
-    if not ai_source:
-        update_session_info("Generating source content...")
-        ai_source = await generate_ai_source(
-            GenerateAiSourceRequest(sessionId=session_id, category=category, preferenceSummary=summary),
-        )
-
-    if not ai_source:
-        raise GenerateAudiocastException(
-            status_code=500, detail="Failed to generate source material", session_id=session_id
-        )
+    stream_publisher = AudiocastStreamPublisher(session_id)
+    await stream_publisher.prepare()
+    try:
+        audio_script = await make_audio_script(db, session_data, summary)
+    except Exception:
+        await stream_publisher.finish("failed")
+        raise
 
-    # get custom sources
-    update_session_info("Checking for custom sources...")
-    compiled_custom_sources = compile_custom_sources(session_id)
+    # Generate audio
+    db._update_info("Generating audio...")
+    db.flush()
 
-    # Generate audio script
-    update_session_info("Generating audio script...")
-    script_maker = AudioScriptMaker(category, ai_source, compiled_custom_sources)
-    audio_script = script_maker.create(provider="gemini")
+    await stream_publisher.start()
 
-    if not audio_script:
-        raise GenerateAudiocastException(
-            status_code=500, detail="Failed to generate audio script", session_id=session_id
+    audio_manager = AudioManager(session_id=session_id)
+    try:
+        audio_path = await audio_manager.generate_speech(audio_script, stream_publisher.on_segment)
+    except Exception:
+        await stream_publisher.finish("failed")
+        raise
+    await stream_publisher.finish()
+
+    if POST_GENERATION_QUEUE:
+        job = create_post_generation_job(session_id, category, audio_path, audio_script)
+        background_tasks.add_task(enqueue_post_generation, job)
+    else:
+        background_tasks.add_task(
+            post_generate_audio,
+            session_id,
+            category,
+            audio_path,
+            audio_script,
         )
-
-    # Generate audio
-    update_session_info("Generating audio...")
-
-    audio_manager = AudioManager()
-    audio_path = await audio_manager.generate_speech(audio_script)
-
-    background_tasks.add_task(
-        post_generate_audio,
-        session_id,
-        category,
-        audio_path,
-        audio_script,
-    )
-    db._update({"status": "completed"})
+    db._update({"status": "completed"}, flush=True)
 
     return "Audiocast generated successfully!"
@@ -1,6 +1,5 @@
 from pydantic import BaseModel
 
-from src.utils.audiocast_request import GenerateSourceContent
 from src.utils.chat_utils import ContentCategory
 from src.utils.decorators.base import use_cache_manager
 from src.utils.make_seed import get_hash
@@ -29,9 +28,13 @@ async def generate_ai_source(request: GenerateAiSourceRequest):
         db = SessionManager(session_id, category)
         db._update_info("Generating source content...")
 
+        # imports the web search package, only needed by this endpoint
+        from src.utils.audiocast_request import GenerateSourceContent
+
         generator = GenerateSourceContent(category, preference_summary)
         source_content = await generator._run()
         db._update_source(source_content)
+        db.flush()
 
         return source_content
 
@@ -1,9 +1,17 @@
+import asyncio
 import os
 from dataclasses import dataclass
-from typing import List, Literal
+from pathlib import Path
+from typing import AsyncIterator, List, Literal
 
-from src.services.openai_client import get_openai
+from src.services.openai_client import get_openai, get_openai_async
 from src.utils.decorators.base import process_time
+from src.utils.tts_scheduler import get_tts_scheduler
+
+RATE_LIMIT_PAUSE = 20.0
+
+TTS_MODEL = "gpt-4o-mini-tts"
+TTS_RESPONSE_FORMAT = "mp3"
 
 OpenaiVoice = Literal["onyx", "shimmer", "echo", "nova", "alloy", "ash", "ballad", "coral", "fable", "sage"]
 openai_voices: List[OpenaiVoice] = [
@@ -27,6 +35,8 @@ class SpeechJob:
     output_file: str
     tag: str
     index: int
+    # position of the speaker turn this job belongs to; long turns span several jobs
+    turn: int = 0
 
 
 class GenerateSpeech:
@@ -43,28 +53,66 @@ class GenerateSpeech:
             print(f"Generated speech for tag {job.tag} at index {job.index}")
             return job.output_file
         except Exception as e:
-            print(f"Failed to generate speech for tag: {job.tag}. Error: {str(e)}")
-            return ""
+            return self.__handle_error(job, e)
 
     @process_time()
-    def __use_openai(self, job: SpeechJob):
-        if job.voice not in openai_voices:
-            raise ValueError("Wrong voice specification for openai tts")
+    async def run_async(self, job: SpeechJob):
+        """
+        Generate speech using the async OpenAI TTS client on the event loop.
+        The streamed audio is collected in memory and written once, off the event loop.
+        """
+        try:
+            audio = bytearray()
+            async for chunk in self.stream(job):
+                audio += chunk
 
-        # Use streaming response to write directly to a temp file then read it back
-        temp_path = f"{job.output_file}.temp"
-        with get_openai().audio.speech.with_streaming_response.create(
-            model="gpt-4o-mini-tts",
+            await asyncio.to_thread(Path(job.output_file).write_bytes, audio)
+
+            print(f"Generated speech for tag {job.tag} at index {job.index}")
+            return job.output_file
+        except Exception as e:
+            if os.path.exists(job.output_file):
+                os.remove(job.output_file)
+            return self.__handle_error(job, e)
+
+    async def stream(self, job: SpeechJob) -> AsyncIterator[bytes]:
+        """Yield audio bytes for a speech job as they arrive from OpenAI TTS"""
+        self.__validate(job)
+
+        async with get_openai_async().audio.speech.with_streaming_response.create(
+            model=TTS_MODEL,
             voice=job.voice,
             input=job.content,
-            response_format="mp3",
+            response_format=TTS_RESPONSE_FORMAT,
         ) as response:
-            response.stream_to_file(temp_path)
+            async for chunk in response.iter_bytes():
+                yield chunk
+
+    def __validate(self, job: SpeechJob):
+        if job.voice not in openai_voices:
+            raise ValueError("Wrong voice specification for openai tts")
+
+    def __handle_error(self, job: SpeechJob, e: Exception):
+        from openai import RateLimitError
 
-        with open(temp_path, "rb") as f:
-            content = f.read()
+        if isinstance(e, RateLimitError):
+            # hold back the other queued segments instead of triggering a 429 storm
+            retry_after = e.response.headers.get("retry-after")
+            get_tts_scheduler().pause(float(retry_after) if retry_after else RATE_LIMIT_PAUSE)
+            print(f"Rate limited generating speech for tag: {job.tag}. Error: {str(e)}")
+        else:
+            print(f"Failed to generate speech for tag: {job.tag}. Error: {str(e)}")
+        return ""
 
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+    @process_time()
+    def __use_openai(self, job: SpeechJob):
+        self.__validate(job)
 
-        return content
+        # Read the streamed response straight into memory
+        with get_openai().audio.speech.with_streaming_response.create(
+            model=TTS_MODEL,
+            voice=job.voice,
+            input=job.content,
+            response_format=TTS_RESPONSE_FORMAT,
+        ) as response:
+            return response.read()
@@ -3,7 +3,9 @@ from fastapi import HTTPException
 from src.services.storage import StorageManager
 
 from .decorators.base import process_time
+from .hls_packager import get_playlist_url, playlist_exists
 from .session_manager import SessionManager
+from .waveform_peaks import get_peaks_url, peaks_exist
 
 
 @process_time()
@@ -31,4 +33,10 @@ def get_audiocast(session_id: str):
     if session_data.status != "completed":
         SessionManager._update_status(session_id, "completed")
 
+    if playlist_exists(session_id):
+        session_data.playlist = get_playlist_url(session_id)
+
+    if peaks_exist(session_id):
+        session_data.peaks = get_peaks_url(session_id)
+
     return session_data.__dict__
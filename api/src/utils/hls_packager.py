@@ -0,0 +1,120 @@
+import subprocess
+import tempfile
+from pathlib import Path
+
+from src.env_var import API_URL
+from src.services.storage import BLOB_BASE_URI, SignedUrl, StorageManager, UploadItemParams
+
+PLAYLIST_NAME = "index.m3u8"
+SEGMENT_DURATION = 6
+
+
+def get_hls_prefix(session_id: str):
+    """Blob prefix holding the HLS playlist and segments of a session"""
+    return f"{BLOB_BASE_URI}/{session_id}/hls"
+
+
+def get_playlist_url(session_id: str):
+    """API route that serves the signed HLS playlist of a session"""
+    return f"{API_URL}/audiocast/{session_id}/{PLAYLIST_NAME}"
+
+
+class HLSPackager:
+    def __init__(self, session_id: str, audio_path: str, segment_duration: int = SEGMENT_DURATION):
+        self.session_id = session_id
+        self.audio_path = audio_path
+        self.segment_duration = segment_duration
+
+    def run_all(self):
+        """
+        1. Package the merged audio as fixed-duration HLS segments with a playlist
+        2. Upload them under the session prefix
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            out_dir = Path(temp_dir)
+            self.package(out_dir)
+            return self.upload(out_dir)
+
+    def package(self, out_dir: Path) -> Path:
+        """Segment the audio with ffmpeg. Audio frames are stream-copied, not re-encoded."""
+        playlist_path = out_dir / PLAYLIST_NAME
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-i",
+            self.audio_path,
+            "-c:a",
+            "copy",
+            "-f",
+            "hls",
+            "-hls_time",
+            str(self.segment_duration),
+            "-hls_playlist_type",
+            "vod",
+            "-hls_segment_filename",
+            str(out_dir / "segment_%04d.ts"),
+            str(playlist_path),
+        ]
+        subprocess.run(cmd, check=True)
+        return playlist_path
+
+    def upload(self, out_dir: Path) -> str:
+        """
+        Upload segments first and the playlist last,
+        so an existing playlist always points at complete segments.
+        """
+        storage_manager = StorageManager()
+        prefix = get_hls_prefix(self.session_id)
+
+        for segment in sorted(out_dir.glob("*.ts")):
+            storage_manager.upload_to_gcs(
+                segment,
+                f"{prefix}/{segment.name}",
+                UploadItemParams(content_type="video/mp2t"),
+            )
+
+        return storage_manager.upload_to_gcs(
+            out_dir / PLAYLIST_NAME,
+            f"{prefix}/{PLAYLIST_NAME}",
+            UploadItemParams(content_type="application/vnd.apple.mpegurl"),
+        )
+
+
+def playlist_exists(session_id: str) -> bool:
+    """check if an HLS playlist was packaged for the session"""
+    return StorageManager().blob_exists(f"{get_hls_prefix(session_id)}/{PLAYLIST_NAME}")
+
+
+def get_segment_url(session_id: str, segment_name: str):
+    """API route that redirects to a signed URL of an HLS segment"""
+    return f"{API_URL}/audiocast/{session_id}/hls/{segment_name}"
+
+
+def get_playlist(session_id: str) -> str | None:
+    """
+    Get the HLS playlist of a session with segment URIs pointing at the API.
+    The bucket is private, so each segment is signed lazily when the player requests it
+    instead of signing every segment up front.
+    """
+    storage_manager = StorageManager()
+    blobname = f"{get_hls_prefix(session_id)}/{PLAYLIST_NAME}"
+    if not storage_manager.blob_exists(blobname):
+        return None
+
+    lines = []
+    for line in storage_manager.read_blob(blobname).decode().splitlines():
+        if line and not line.startswith("#"):
+            line = get_segment_url(session_id, line)
+        lines.append(line)
+
+    return "\n".join(lines) + "\n"
+
+
+def get_signed_segment_url(session_id: str, segment_name: str) -> SignedUrl:
+    """get a signed URL for an HLS segment of a session"""
+    if "/" in segment_name or not segment_name.endswith(".ts"):
+        raise ValueError(f"Invalid HLS segment name: {segment_name}")
+
+    return StorageManager().sign_url(f"{get_hls_prefix(session_id)}/{segment_name}")
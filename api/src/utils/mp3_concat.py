@@ -0,0 +1,406 @@
+import os
+import subprocess
+from dataclasses import dataclass
+from typing import Iterator, List, Literal, Optional, Sequence, Tuple
+
+MergeMode = Literal["frames", "ffmpeg"]
+
+# Bitrates in kbps, indexed by the 4-bit bitrate index of the frame header
+_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 25: [11025, 12000, 8000]}
+_VERSIONS = {0b00: 25, 0b10: 2, 0b11: 1}
+_LAYERS = {0b01: 3, 0b10: 2, 0b11: 1}
+
+# Samples an mp3 decoder outputs before the first encoded sample, on top of the encoder delay
+DECODER_DELAY = 529
+XING_FLAGS = 0x1 | 0x2 | 0x4  # frame count, byte count, seek table
+XING_TOC_SIZE = 100
+LAME_TAG_SIZE = 36
+LAME_ENCODER = b"LAME3.100"
+
+
+@dataclass(frozen=True)
+class Mp3FrameHeader:
+    version: int  # 1, 2 or 25 (MPEG 2.5)
+    layer: int
+    sample_rate: int
+    channels: int
+    frame_length: int
+    samples_per_frame: int
+
+
+@dataclass
+class Mp3StreamInfo:
+    sample_rate: int
+    channels: int
+    version: int
+    layer: int
+    audio_start: int
+    audio_end: int
+    has_info_frame: bool = False
+    encoder_delay: int = 0
+    encoder_padding: int = 0
+
+    @property
+    def stream_key(self) -> Tuple[int, int, int, int]:
+        """Parameters that must match for frames to be joined as-is"""
+        return (self.version, self.layer, self.sample_rate, self.channels)
+
+
+def parse_frame_header(data: bytes, offset: int) -> Optional[Mp3FrameHeader]:
+    """Parse the 4-byte MPEG audio frame header at offset, if there is a valid one"""
+    if offset + 4 > len(data):
+        return None
+
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = _VERSIONS.get((b1 >> 3) & 0b11)
+    layer = _LAYERS.get((b1 >> 1) & 0b11)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0b11
+    if not version or not layer or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrate = _BITRATES[(min(version, 2), layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0b1
+    channels = 1 if (b3 >> 6) == 0b11 else 2
+
+    if layer == 1:
+        samples_per_frame = 384
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples_per_frame = 576 if layer == 3 and version != 1 else 1152
+        frame_length = (samples_per_frame // 8) * bitrate // sample_rate + padding
+
+    return Mp3FrameHeader(version, layer, sample_rate, channels, frame_length, samples_per_frame)
+
+
+def _side_info_size(header: Mp3FrameHeader) -> int:
+    if header.version == 1:
+        return 17 if header.channels == 1 else 32
+    return 9 if header.channels == 1 else 17
+
+
+def _main_data_begin(frame: memoryview, header: Mp3FrameHeader) -> int:
+    """Bytes of a layer III frame's audio data stored in earlier frames (the bit reservoir)"""
+    if header.layer != 3:
+        return 0
+    # a CRC follows the header when the protection bit is 0
+    side_info = 4 if frame[1] & 0x1 else 6
+    if header.version == 1:
+        return (frame[side_info] << 1) | (frame[side_info + 1] >> 7)
+    return frame[side_info]
+
+
+def _skip_id3v2(data: bytes) -> int:
+    """Return the offset just past any leading ID3v2 tags"""
+    offset = 0
+    while data[offset : offset + 3] == b"ID3" and offset + 10 <= len(data):
+        flags = data[offset + 5]
+        size = 0
+        for byte in data[offset + 6 : offset + 10]:
+            size = (size << 7) | (byte & 0x7F)
+        offset += 10 + size + (10 if flags & 0x10 else 0)
+    return offset
+
+
+def _trailing_tags_start(data: bytes) -> int:
+    """Return the offset where trailing ID3v1/APE tags begin"""
+    end = len(data)
+    if end >= 128 and data[end - 128 : end - 125] == b"TAG":
+        end -= 128
+    if end >= 32 and data[end - 32 : end - 24] == b"APETAGEX":
+        tag_size = int.from_bytes(data[end - 20 : end - 16], "little")
+        end -= tag_size + (32 if data[end - 9] & 0x80 else 0)
+    return max(end, 0)
+
+
+def _find_first_frame(data: bytes, start: int, end: int) -> Tuple[int, Mp3FrameHeader]:
+    """Find the first frame whose successor is also a valid frame (avoids false sync words)"""
+    offset = start
+    while offset < end - 4:
+        header = parse_frame_header(data, offset)
+        if header:
+            next_offset = offset + header.frame_length
+            if next_offset >= end or parse_frame_header(data, next_offset):
+                return offset, header
+        offset += 1
+
+    raise ValueError("No MPEG audio frames found")
+
+
+def _read_info_frame(data: bytes, offset: int, header: Mp3FrameHeader) -> Optional[Tuple[int, int]]:
+    """
+    Check for a Xing/Info/VBRI header in the frame at offset.
+    Returns (encoder_delay, encoder_padding) if the frame is an info frame, otherwise None.
+    """
+    xing_offset = offset + 4 + _side_info_size(header)
+    tag = data[xing_offset : xing_offset + 4]
+    if tag == b"VBRI" or data[offset + 36 : offset + 40] == b"VBRI":
+        return (0, 0)
+    if tag not in (b"Xing", b"Info"):
+        return None
+
+    flags = int.from_bytes(data[xing_offset + 4 : xing_offset + 8], "big")
+    lame_offset = xing_offset + 8
+    lame_offset += 4 if flags & 0x1 else 0
+    lame_offset += 4 if flags & 0x2 else 0
+    lame_offset += 100 if flags & 0x4 else 0
+    lame_offset += 4 if flags & 0x8 else 0
+
+    delay_bytes = data[lame_offset + 21 : lame_offset + 24]
+    if data[lame_offset : lame_offset + 4].isalpha() and len(delay_bytes) == 3:
+        packed = int.from_bytes(delay_bytes, "big")
+        return (packed >> 12, packed & 0xFFF)
+    return (0, 0)
+
+
+def probe_mp3(data: bytes) -> Mp3StreamInfo:
+    """Locate the audio frames of an mp3 file and read its stream parameters"""
+    start = _skip_id3v2(data)
+    end = _trailing_tags_start(data)
+    first_offset, header = _find_first_frame(data, start, end)
+
+    info = Mp3StreamInfo(
+        sample_rate=header.sample_rate,
+        channels=header.channels,
+        version=header.version,
+        layer=header.layer,
+        audio_start=first_offset,
+        audio_end=end,
+    )
+
+    gapless = _read_info_frame(data, first_offset, header)
+    if gapless is not None:
+        info.has_info_frame = True
+        info.encoder_delay, info.encoder_padding = gapless
+
+    return info
+
+
+def iter_audio_frames(data: bytes, info: Mp3StreamInfo) -> Iterator[memoryview]:
+    """Yield the audio frames of an mp3 file, skipping tags and the Xing/Info frame"""
+    view = memoryview(data)
+    offset = info.audio_start
+    if info.has_info_frame:
+        header = parse_frame_header(data, offset)
+        offset += header.frame_length if header else 0
+
+    while offset < info.audio_end - 4:
+        header = parse_frame_header(data, offset)
+        if not header or header.sample_rate != info.sample_rate:
+            # resync on junk between frames
+            offset += 1
+            continue
+
+        frame_end = min(offset + header.frame_length, info.audio_end)
+        yield view[offset:frame_end]
+        offset = frame_end
+
+
+def strip_to_frames(data: bytes) -> bytes:
+    """Return only the audio frames of an mp3 file, so it can be appended to a running stream"""
+    return b"".join(iter_audio_frames(data, probe_mp3(data)))
+
+
+def can_concat_frames(infos: List[Mp3StreamInfo]) -> bool:
+    """Frames can be joined without re-encoding when every stream shares the same parameters"""
+    return len({info.stream_key for info in infos}) <= 1
+
+
+def gapless_frames(data: bytes, info: Mp3StreamInfo, trim_head: bool, trim_tail: bool) -> List[memoryview]:
+    """
+    Audio frames of an mp3 file, without the whole frames of silence the encoder added.
+    - the head keeps any frame whose audio data starts in a dropped frame (bit reservoir)
+    - the tail keeps the samples the decoder delay shifts into the last frames
+    """
+    frames = list(iter_audio_frames(data, info))
+    header = parse_frame_header(bytes(frames[0][:4]), 0) if frames else None
+    if not header:
+        return frames
+
+    spf = header.samples_per_frame
+    head = info.encoder_delay // spf if trim_head else 0
+    tail = max(info.encoder_padding - DECODER_DELAY, 0) // spf if trim_tail else 0
+    if head + tail >= len(frames):
+        return frames
+
+    while head and _main_data_begin(frames[head], header) > 0:
+        head -= 1
+    return frames[head : len(frames) - tail]
+
+
+def _crc16(data: bytes) -> int:
+    """CRC-16/ARC, which protects the LAME tag"""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+def build_info_frame(frames: List[memoryview], encoder_delay: int, encoder_padding: int) -> bytes:
+    """
+    Xing/Info frame describing a stream of frames: frame and byte counts, a seek table,
+    and a LAME tag with the encoder delay and padding gapless players trim.
+    The frame is silent, in the stream's format, at the lowest bitrate that fits the tags.
+    """
+    first = bytes(frames[0][:4])
+    header = parse_frame_header(first, 0)
+    if not header:
+        raise ValueError("Invalid MPEG audio frame")
+
+    xing_offset = 4 + _side_info_size(header)
+    lame_offset = xing_offset + 16 + XING_TOC_SIZE
+    size = lame_offset + LAME_TAG_SIZE
+
+    frame_header = info_header = None
+    for bitrate_index in range(1, 15):
+        # no CRC, no padding; version, layer, sample rate and channel mode of the stream
+        frame_header = bytes([0xFF, first[1] | 0x1, (bitrate_index << 4) | (first[2] & 0x0D), first[3]])
+        info_header = parse_frame_header(frame_header, 0)
+        if info_header and info_header.frame_length >= size:
+            break
+    if not frame_header or not info_header or info_header.frame_length < size:
+        raise ValueError("No bitrate fits a Xing frame")
+
+    frame = bytearray(info_header.frame_length)
+    frame[:4] = frame_header
+
+    total_bytes = len(frame) + sum(len(f) for f in frames)
+    positions = [len(frame)]
+    for f in frames[:-1]:
+        positions.append(positions[-1] + len(f))
+    toc = bytes(min(255, positions[i * len(frames) // XING_TOC_SIZE] * 256 // total_bytes) for i in range(100))
+
+    constant_bitrate = len({f[2] >> 4 for f in frames}) == 1
+    frame[xing_offset:lame_offset] = (
+        (b"Info" if constant_bitrate else b"Xing")
+        + XING_FLAGS.to_bytes(4, "big")
+        + len(frames).to_bytes(4, "big")
+        + total_bytes.to_bytes(4, "big")
+        + toc
+    )
+
+    lame = bytearray(LAME_TAG_SIZE)
+    lame[:9] = LAME_ENCODER
+    lame[9] = 1 if constant_bitrate else 0  # VBR method: CBR, or unknown
+    lame[21:24] = ((min(encoder_delay, 0xFFF) << 12) | min(encoder_padding, 0xFFF)).to_bytes(3, "big")
+    lame[28:32] = total_bytes.to_bytes(4, "big")
+    frame[lame_offset:size] = lame
+    frame[size - 2 : size] = _crc16(bytes(frame[: size - 2])).to_bytes(2, "big")
+    return bytes(frame)
+
+
+def concat_mp3_frames(contents: List[bytes], infos: List[Mp3StreamInfo], output_file: str) -> None:
+    """
+    Join mp3 streams at the frame level without decoding or re-encoding.
+    - ID3 tags and per-file Xing/Info frames are dropped, and one Info frame for the merged stream
+    is written first, so players read its real duration and seek table.
+    - Whole frames of encoder delay and padding are dropped between segments; the rest,
+    less than a frame (~24ms at 24 kHz), stays in the stream as silence between speaker turns.
+    - The first segment's delay and the last segment's padding go into the merged LAME tag.
+    """
+    last = len(contents) - 1
+    frames: List[memoryview] = []
+    for index, (data, info) in enumerate(zip(contents, infos)):
+        frames += gapless_frames(data, info, trim_head=index > 0, trim_tail=index < last)
+    if not frames:
+        raise ValueError("No MPEG audio frames found")
+
+    tmp_output = f"{output_file}.part"
+    with open(tmp_output, "wb") as out:
+        out.write(build_info_frame(frames, infos[0].encoder_delay, infos[-1].encoder_padding))
+        for frame in frames:
+            out.write(frame)
+    os.replace(tmp_output, output_file)
+
+
+def merge_mp3_files(
+    audio_files: List[str],
+    output_file: str,
+    pcm_output: Optional[str] = None,
+) -> MergeMode:
+    """
+    Merge mp3 files in the given order.
+    Frames are copied as-is when every file shares the same stream parameters,
+    otherwise a single streaming ffmpeg concat is used.
+    With pcm_output, an ffmpeg merge also writes the merged audio as raw float32 PCM;
+    a frame-level merge never decodes, so it leaves pcm_output to the caller.
+    Returns the merge mode that was used.
+    """
+    contents: List[bytes] = []
+    infos: List[Mp3StreamInfo] = []
+    for file_path in audio_files:
+        with open(file_path, "rb") as f:
+            data = f.read()
+        contents.append(data)
+        infos.append(probe_mp3(data))
+
+    if can_concat_frames(infos):
+        concat_mp3_frames(contents, infos, output_file)
+        return "frames"
+
+    sample_rate = max(info.sample_rate for info in infos)
+    channels = max(info.channels for info in infos)
+    ffmpeg_concat(audio_files, output_file, sample_rate, channels, pcm_output=pcm_output)
+    return "ffmpeg"
+
+
+def ffmpeg_concat(
+    audio_files: List[str],
+    output_file: str,
+    sample_rate: int,
+    channels: int,
+    quality_args: Sequence[str] = ("-b:a", "128k"),
+    pcm_output: Optional[str] = None,
+) -> None:
+    """
+    Concatenate audio files in a single ffmpeg pass.
+    Every input is resampled to a common format before the concat filter;
+    decoding and encoding are streamed, so memory stays flat regardless of length.
+    With pcm_output, the same stream is also written as raw float32 PCM.
+    """
+    layout = "mono" if channels == 1 else "stereo"
+    inputs: List[str] = []
+    chains: List[str] = []
+    for index, file_path in enumerate(audio_files):
+        inputs += ["-i", file_path]
+        chains.append(f"[{index}:a]aresample={sample_rate},aformat=channel_layouts={layout}[a{index}]")
+
+    labels = "".join(f"[a{index}]" for index in range(len(audio_files)))
+    concat = f"{labels}concat=n={len(audio_files)}:v=0:a=1"
+    if pcm_output:
+        filter_graph = ";".join(chains + [f"{concat},asplit=2[out][pcm]"])
+    else:
+        filter_graph = ";".join(chains + [f"{concat}[out]"])
+
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        *inputs,
+        "-filter_complex",
+        filter_graph,
+        "-map",
+        "[out]",
+        "-c:a",
+        "libmp3lame",
+        *quality_args,
+        output_file,
+    ]
+    if pcm_output:
+        cmd += ["-map", "[pcm]", "-f", "f32le", pcm_output]
+    subprocess.run(cmd, check=True)
@@ -0,0 +1,266 @@
+import asyncio
+import os
+from typing import Callable, Dict, List, Optional
+
+from src.env_var import HLS_PACKAGING, POST_GENERATION_SHARED_HOST, WAVEFORM_PREVIEW, WAVEFORM_VIDEO
+from src.services.storage import StorageManager
+
+from .chat_utils import ContentCategory
+from .decoded_audio import discard_decoded_audio
+from .hls_packager import HLSPackager
+from .post_generation_queue import (
+    MAX_ATTEMPTS,
+    RETRY_BACKOFF,
+    VISIBILITY_TIMEOUT,
+    JobQueue,
+    PostGenerationJob,
+    RedisJobQueue,
+    StageStatus,
+)
+from .session_manager import SessionManager
+from .video_mux import discard_aac_track
+from .waveform_peaks import WaveformPeaks
+
+POLL_INTERVAL = 2
+
+
+class PermanentStageError(Exception):
+    """A stage failure that retrying cannot fix"""
+
+
+def get_local_audio(job: PostGenerationJob) -> str:
+    """
+    Path of the merged audio on this machine.
+    Falls back to the uploaded copy when the worker does not share the API's disk or the file was cleaned up.
+    """
+    if os.path.exists(job.audio_path):
+        return job.audio_path
+    return StorageManager().download_from_gcs(job.session_id)
+
+
+def upload_stage(job: PostGenerationJob):
+    """Store audio"""
+    if os.path.exists(job.audio_path):
+        StorageManager().upload_audio_to_gcs(job.audio_path, job.session_id)
+    elif not StorageManager().check_blob_exists(job.session_id):
+        raise PermanentStageError(f"Audio file not found: {job.audio_path}")
+
+
+def transcript_stage(job: PostGenerationJob):
+    """Update session metadata"""
+    db = SessionManager(job.session_id, job.category)  # type: ignore
+    db._update_transcript(job.audio_script)
+
+
+def peaks_stage(job: PostGenerationJob):
+    """Generate and save waveform peaks, a few KB clients can draw a waveform from"""
+    WaveformPeaks(job.session_id, get_local_audio(job)).run_all()
+
+
+def hls_stage(job: PostGenerationJob):
+    """Package audio as HLS for flat seek latency on long audiocasts"""
+    HLSPackager(job.session_id, get_local_audio(job)).run_all()
+
+
+def waveform_preview_stage(job: PostGenerationJob):
+    """Generate and save a low-quality waveform mp4 as a fast first visual"""
+    from .waveform_utils import WaveformUtils
+
+    WaveformUtils(job.session_id, get_local_audio(job)).run_preview()
+
+
+def waveform_stage(job: PostGenerationJob):
+    """Generate and save audio waveform as mp4, replacing the preview"""
+    from .waveform_utils import WaveformUtils
+
+    WaveformUtils(job.session_id, get_local_audio(job)).run_all()
+
+
+STAGES: Dict[str, Callable[[PostGenerationJob], None]] = {
+    "upload": upload_stage,
+    "transcript": transcript_stage,
+    "peaks": peaks_stage,
+    "waveform_preview": waveform_preview_stage,
+    "hls": hls_stage,
+    "waveform": waveform_stage,
+}
+
+
+def get_post_generation_stages() -> List[str]:
+    """Stages to run after an audiocast is generated, in order"""
+    stages = ["upload", "transcript", "peaks"]
+    if WAVEFORM_VIDEO and WAVEFORM_PREVIEW:
+        stages.append("waveform_preview")
+    if HLS_PACKAGING:
+        stages.append("hls")
+    if WAVEFORM_VIDEO:
+        stages.append("waveform")
+    return stages
+
+
+def create_post_generation_job(
+    session_id: str,
+    category: ContentCategory,
+    audio_path: str,
+    audio_script: str,
+) -> PostGenerationJob:
+    return PostGenerationJob(
+        session_id=session_id,
+        category=category,
+        audio_path=audio_path,
+        audio_script=audio_script,
+        stages={stage: "pending" for stage in get_post_generation_stages()},
+    )
+
+
+def cleanup_local_audio(job: PostGenerationJob):
+    storage_manager = StorageManager()
+    for path in (job.audio_path, storage_manager.get_local_path(job.session_id)):
+        discard_decoded_audio(path)
+        discard_aac_track(path)
+        if os.path.exists(path):
+            os.remove(path)
+    storage_manager.discard_local_copy(job.session_id)
+
+
+def update_stage_status(job: PostGenerationJob, stage: str, status: StageStatus, flush=True):
+    """
+    Record the status of a stage on the job and the session.
+    With flush=False the session update is buffered, e.g. to write a stage's "done" with the next stage's "running".
+    """
+    job.stages[stage] = status
+    try:
+        SessionManager._update_post_generation(job.session_id, stage, status, flush)
+    except Exception as e:
+        print(f"Failed to update post-generation status for {job.session_id}: {str(e)}")
+
+
+def flush_stage_status(job: PostGenerationJob):
+    try:
+        SessionManager.flush_session(job.session_id)
+    except Exception as e:
+        print(f"Failed to update post-generation status for {job.session_id}: {str(e)}")
+
+
+def run_post_generation(job: PostGenerationJob):
+    """Run every pending stage in order, in the calling thread"""
+    for stage in job.pending_stages():
+        update_stage_status(job, stage, "running")
+        try:
+            STAGES[stage](job)
+        except Exception:
+            update_stage_status(job, stage, "failed")
+            raise
+        update_stage_status(job, stage, "done", flush=False)
+    flush_stage_status(job)
+
+
+async def enqueue_post_generation(
+    job: PostGenerationJob,
+    queue: Optional[JobQueue] = None,
+    shared_host=POST_GENERATION_SHARED_HOST,
+):
+    """
+    Hand the post-generation stages of an audiocast over to the worker.
+    Run it after the response (e.g. as a background task), since it may upload the audio.
+    - on a shared host, the worker uploads the audio itself and reuses it and its decoded PCM
+    - otherwise the worker cannot read the local files: the audio is uploaded here and they are removed,
+    and the worker works from the uploaded copy
+    """
+    if not shared_host:
+        try:
+            if job.stages.get("upload") == "pending":
+                await asyncio.to_thread(upload_stage, job)
+                job.stages["upload"] = "done"
+        except Exception as e:
+            print(f"Failed to upload audio for {job.session_id}: {str(e)}")
+            await asyncio.to_thread(update_stage_status, job, "upload", "failed")
+            return
+        finally:
+            await asyncio.to_thread(cleanup_local_audio, job)
+
+    for stage, status in job.stages.items():
+        update_stage_status(job, stage, status, flush=False)
+    await asyncio.to_thread(flush_stage_status, job)
+    await (queue or RedisJobQueue()).enqueue(job)
+
+
+class PostGenerationWorker:
+    """
+    Runs post-generation jobs from the durable queue, outside the API workers.
+    - every stage is recorded on the job, so a retried or redelivered job resumes at the first unfinished stage
+    - the job's visibility is extended while it runs; if the worker dies, the job is delivered again
+    - failed jobs are retried with exponential backoff, up to max_attempts
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        visibility_timeout: float = VISIBILITY_TIMEOUT,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        self.queue = queue
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """Finish the current job, then exit"""
+        self._stopping.set()
+
+    async def run(self):
+        """Claim and process jobs until stopped"""
+        while not self._stopping.is_set():
+            job = await self.queue.claim(self.visibility_timeout)
+            if not job:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.process(job)
+
+    async def _heartbeat(self, job: PostGenerationJob):
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                await self.queue.extend(job, self.visibility_timeout)
+            except Exception as e:
+                print(f"Failed to extend post-generation job {job.id}: {str(e)}")
+
+    async def process(self, job: PostGenerationJob):
+        """Run the pending stages of a claimed job, then ack, retry or dead-letter it"""
+        print(f"Post-generation job {job.id} for {job.session_id}, attempt {job.attempts}: {job.pending_stages()}")
+
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        stage = None
+        try:
+            for stage in job.pending_stages():
+                await asyncio.to_thread(update_stage_status, job, stage, "running")
+                await asyncio.to_thread(STAGES[stage], job)
+                await asyncio.to_thread(update_stage_status, job, stage, "done", False)
+                await self.queue.save(job)
+            await asyncio.to_thread(flush_stage_status, job)
+        except Exception as e:
+            job.error = f"{stage}: {str(e)}" if stage else str(e)
+            if stage:
+                await asyncio.to_thread(update_stage_status, job, stage, "failed")
+            await self._fail(job, permanent=isinstance(e, PermanentStageError))
+            return
+        finally:
+            heartbeat.cancel()
+
+        await self.queue.ack(job)
+        cleanup_local_audio(job)
+
+    async def _fail(self, job: PostGenerationJob, permanent: bool):
+        if not permanent and job.attempts < self.max_attempts:
+            delay = RETRY_BACKOFF * 2 ** (job.attempts - 1)
+            print(f"Post-generation job {job.id} failed ({job.error}), retrying in {delay}s")
+            await self.queue.retry(job, delay)
+            return
+
+        print(f"Post-generation job {job.id} failed permanently: {job.error}")
+        await self.queue.dead(job)
+        cleanup_local_audio(job)
@@ -0,0 +1,240 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from time import time
+from typing import Dict, List, Literal, Optional
+from uuid import uuid4
+
+from src.services.redis_client import get_redis
+
+StageStatus = Literal["pending", "running", "done", "failed"]
+
+QUEUE_PREFIX = "post_generation"
+VISIBILITY_TIMEOUT = 900  # seconds a claimed job stays invisible before it is redelivered
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 30  # seconds, doubled on every attempt
+
+
+@dataclass
+class PostGenerationJob:
+    session_id: str
+    category: str
+    audio_path: str
+    audio_script: str
+    stages: Dict[str, StageStatus]
+    id: str = field(default_factory=lambda: str(uuid4()))
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time)
+
+    def to_json(self) -> str:
+        """Serialize the job as stored in the queue"""
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "PostGenerationJob":
+        """Load a job serialized with to_json"""
+        return cls(**json.loads(data))
+
+    def pending_stages(self) -> List[str]:
+        """Stages that are not done yet, in order"""
+        return [stage for stage, status in self.stages.items() if status != "done"]
+
+
+class JobQueue(ABC):
+    """
+    Durable queue of post-generation jobs with at-least-once delivery.
+    - claim: hand out the next due job and hide it for the visibility timeout
+    - extend: keep a long-running job hidden while the worker is alive
+    - a job that is neither acked nor retried before its deadline is delivered again
+    """
+
+    @abstractmethod
+    async def enqueue(self, job: PostGenerationJob) -> None:
+        """Add a job, due right away"""
+
+    @abstractmethod
+    async def claim(self, visibility_timeout: float = VISIBILITY_TIMEOUT) -> Optional[PostGenerationJob]:
+        """Take the next due job, hidden from other workers for visibility_timeout seconds"""
+
+    @abstractmethod
+    async def extend(self, job: PostGenerationJob, visibility_timeout: float = VISIBILITY_TIMEOUT) -> None:
+        """Keep a claimed job hidden for another visibility_timeout seconds"""
+
+    @abstractmethod
+    async def save(self, job: PostGenerationJob) -> None:
+        """Persist job progress, so a redelivered job skips the stages that are done"""
+
+    @abstractmethod
+    async def ack(self, job: PostGenerationJob) -> None:
+        """Remove a finished job"""
+
+    @abstractmethod
+    async def retry(self, job: PostGenerationJob, delay: float) -> None:
+        """Release a claimed job, due again after delay seconds"""
+
+    @abstractmethod
+    async def dead(self, job: PostGenerationJob) -> None:
+        """Park a job that ran out of attempts"""
+
+
+# Requeue expired in-flight jobs, then move the first due job to in-flight.
+# Runs atomically so concurrent workers never claim the same job.
+_CLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+local deadline = tonumber(ARGV[2])
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+for _, id in ipairs(expired) do
+  redis.call('ZREM', KEYS[2], id)
+  redis.call('ZADD', KEYS[1], now, id)
+end
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, 1)
+if #ids == 0 then
+  return nil
+end
+redis.call('ZREM', KEYS[1], ids[1])
+redis.call('ZADD', KEYS[2], deadline, ids[1])
+return redis.call('HGET', KEYS[3], ids[1])
+"""
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Redis-backed job queue.
+    - {prefix}:jobs       hash of job id -> job JSON
+    - {prefix}:scheduled  sorted set of job ids by the time they are due
+    - {prefix}:inflight   sorted set of claimed job ids by visibility deadline
+    - {prefix}:dead       list of job ids that ran out of attempts
+    """
+
+    def __init__(self, prefix: str = QUEUE_PREFIX):
+        self.redis = get_redis()
+        self.jobs_key = f"{prefix}:jobs"
+        self.scheduled_key = f"{prefix}:scheduled"
+        self.inflight_key = f"{prefix}:inflight"
+        self.dead_key = f"{prefix}:dead"
+        self._claim = self.redis.register_script(_CLAIM_SCRIPT)
+
+    async def enqueue(self, job: PostGenerationJob) -> None:
+        """Store the job and schedule it now, in one transaction"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.jobs_key, job.id, job.to_json())
+            pipe.zadd(self.scheduled_key, {job.id: time()})
+            await pipe.execute()
+
+    async def claim(self, visibility_timeout: float = VISIBILITY_TIMEOUT) -> Optional[PostGenerationJob]:
+        """Requeue expired claims and claim the first due job, atomically in a Lua script"""
+        now = time()
+        data = await self._claim(
+            keys=[self.scheduled_key, self.inflight_key, self.jobs_key],
+            args=[now, now + visibility_timeout],
+        )
+        if not data:
+            return None
+
+        job = PostGenerationJob.from_json(data)
+        job.attempts += 1
+        await self.save(job)
+        return job
+
+    async def extend(self, job: PostGenerationJob, visibility_timeout: float = VISIBILITY_TIMEOUT) -> None:
+        """Push back the visibility deadline, unless the job is no longer in flight"""
+        await self.redis.zadd(self.inflight_key, {job.id: time() + visibility_timeout}, xx=True)
+
+    async def save(self, job: PostGenerationJob) -> None:
+        """Store the job's progress"""
+        await self.redis.hset(self.jobs_key, job.id, job.to_json())
+
+    async def ack(self, job: PostGenerationJob) -> None:
+        """Drop the job and its claim"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.inflight_key, job.id)
+            pipe.hdel(self.jobs_key, job.id)
+            await pipe.execute()
+
+    async def retry(self, job: PostGenerationJob, delay: float) -> None:
+        """Store the job and move it from in-flight back to scheduled"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.jobs_key, job.id, job.to_json())
+            pipe.zrem(self.inflight_key, job.id)
+            pipe.zadd(self.scheduled_key, {job.id: time() + delay})
+            await pipe.execute()
+
+    async def dead(self, job: PostGenerationJob) -> None:
+        """Store the job and move it from in-flight to the dead-letter list"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.jobs_key, job.id, job.to_json())
+            pipe.zrem(self.inflight_key, job.id)
+            pipe.rpush(self.dead_key, job.id)
+            await pipe.execute()
+
+
+class LocalJobQueue(JobQueue):
+    """In-process stand-in for RedisJobQueue with the same delivery semantics, for tests and local runs"""
+
+    def __init__(self):
+        self.jobs: Dict[str, str] = {}
+        self.scheduled: Dict[str, float] = {}
+        self.inflight: Dict[str, float] = {}
+        self.dead_jobs: List[str] = []
+        self._lock = asyncio.Lock()
+
+    async def enqueue(self, job: PostGenerationJob) -> None:
+        """Store the job and schedule it now"""
+        async with self._lock:
+            self.jobs[job.id] = job.to_json()
+            self.scheduled[job.id] = time()
+
+    async def claim(self, visibility_timeout: float = VISIBILITY_TIMEOUT) -> Optional[PostGenerationJob]:
+        """Requeue expired claims and claim the first due job"""
+        async with self._lock:
+            now = time()
+            for job_id, deadline in list(self.inflight.items()):
+                if deadline <= now:
+                    del self.inflight[job_id]
+                    self.scheduled[job_id] = now
+
+            due = [(ready_at, job_id) for job_id, ready_at in self.scheduled.items() if ready_at <= now]
+            if not due:
+                return None
+
+            _, job_id = min(due)
+            del self.scheduled[job_id]
+            self.inflight[job_id] = now + visibility_timeout
+
+            job = PostGenerationJob.from_json(self.jobs[job_id])
+            job.attempts += 1
+            self.jobs[job.id] = job.to_json()
+            return job
+
+    async def extend(self, job: PostGenerationJob, visibility_timeout: float = VISIBILITY_TIMEOUT) -> None:
+        """Push back the visibility deadline, unless the job is no longer in flight"""
+        async with self._lock:
+            if job.id in self.inflight:
+                self.inflight[job.id] = time() + visibility_timeout
+
+    async def save(self, job: PostGenerationJob) -> None:
+        """Store the job's progress"""
+        async with self._lock:
+            self.jobs[job.id] = job.to_json()
+
+    async def ack(self, job: PostGenerationJob) -> None:
+        """Drop the job and its claim"""
+        async with self._lock:
+            self.inflight.pop(job.id, None)
+            self.jobs.pop(job.id, None)
+
+    async def retry(self, job: PostGenerationJob, delay: float) -> None:
+        """Store the job and move it from in-flight back to scheduled"""
+        async with self._lock:
+            self.jobs[job.id] = job.to_json()
+            self.inflight.pop(job.id, None)
+            self.scheduled[job.id] = time() + delay
+
+    async def dead(self, job: PostGenerationJob) -> None:
+        """Store the job and move it from in-flight to the dead-letter list"""
+        async with self._lock:
+            self.jobs[job.id] = job.to_json()
+            self.inflight.pop(job.id, None)
+            self.dead_jobs.append(job.id)
@@ -0,0 +1,224 @@
+import copy
+import math
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock, Timer
+from time import monotonic
+from typing import Callable, Dict, List, Optional
+
+from src.env_var import SESSION_CACHE_TTL, SESSION_WRITE_WINDOW
+
+
+@dataclass
+class CachedSession:
+    # None when the document is known to exist but was not read, e.g. right after it was created
+    data: Optional[Dict]
+    expires_at: float
+
+
+@dataclass
+class PendingWrite:
+    fields: Dict = field(default_factory=dict)
+    timer: Optional[Timer] = None
+    # keeps the writes of a session in order
+    write_lock: Lock = field(default_factory=Lock)
+
+
+# sessions read while handling the current request, kept until it ends whatever the process-wide ttl
+_request_entries: ContextVar[Optional[Dict[str, CachedSession]]] = ContextVar("request_session_entries", default=None)
+
+
+@contextmanager
+def request_scope():
+    """Serve repeated reads of a session from memory until the block (e.g. a request) ends"""
+    token = _request_entries.set({})
+    try:
+        yield
+    finally:
+        _request_entries.reset(token)
+
+
+def apply_update(data: Dict, updates: Dict) -> bool:
+    """Apply a Firestore update (dotted field paths) to a cached document. False if it cannot be computed locally."""
+    from google.cloud import firestore
+
+    # values only Firestore can compute: a cached document they apply to is dropped instead
+    server_transforms = (firestore.Increment, firestore.Maximum, firestore.Minimum)
+
+    for path, value in updates.items():
+        *parents, name = path.split(".")
+        target = data
+        for parent in parents:
+            if not isinstance(target.get(parent), dict):
+                target[parent] = {}
+            target = target[parent]
+
+        if isinstance(value, firestore.ArrayUnion):
+            current = list(target.get(name) or [])
+            target[name] = current + [item for item in value.values if item not in current]
+        elif isinstance(value, firestore.ArrayRemove):
+            target[name] = [item for item in target.get(name) or [] if item not in value.values]
+        elif value is firestore.DELETE_FIELD:
+            target.pop(name, None)
+        elif value is firestore.SERVER_TIMESTAMP or isinstance(value, server_transforms):
+            return False
+        else:
+            target[name] = value
+    return True
+
+
+def merge_fields(pending: Dict, updates: Dict):
+    """merge updates into the pending fields of a session; a later value of a field replaces the earlier one"""
+    from google.cloud import firestore
+
+    for path, value in updates.items():
+        previous = pending.get(path)
+        if isinstance(value, (firestore.ArrayUnion, firestore.ArrayRemove)) and type(previous) is type(value):
+            value = type(value)([*previous.values, *value.values])
+        pending[path] = value
+
+
+class SessionCache:
+    """
+    Per-process cache of session documents, with coalesced writes.
+    - within a request_scope, a session is read from Firestore once and served from memory afterwards
+    - across requests, reads are served from memory for `ttl` seconds, and writes from other processes are seen
+    once the entry expires; ttl=0 turns this off
+    - writes from this process are applied to the cached copies, so a request reads its own writes
+    - buffered updates to a session are merged into one Firestore write, `window` seconds after the first one,
+    or right away on flush (e.g. at the end of a stage)
+    """
+
+    def __init__(
+        self,
+        write: Callable[[str, Dict], None],
+        ttl: float = SESSION_CACHE_TTL,
+        window: float = SESSION_WRITE_WINDOW,
+    ):
+        self.write = write
+        self.ttl = ttl
+        self.window = window
+        self._entries: Dict[str, CachedSession] = {}
+        self._pending: Dict[str, PendingWrite] = {}
+        self._lock = Lock()
+
+    def _stores(self) -> List[Dict[str, CachedSession]]:
+        """the request's entries, if in a request_scope, then the process-wide ones"""
+        request_entries = _request_entries.get()
+        return [self._entries] if request_entries is None else [request_entries, self._entries]
+
+    def get(self, doc_id: str) -> Optional[CachedSession]:
+        """cached session, or None if unknown or expired"""
+        with self._lock:
+            for entries in self._stores():
+                entry = entries.get(doc_id)
+                if entry and entry.expires_at <= monotonic():
+                    del entries[doc_id]
+                    entry = None
+                if entry:
+                    break
+            else:
+                return None
+            return CachedSession(data=copy.deepcopy(entry.data), expires_at=entry.expires_at)
+
+    def set(self, doc_id: str, data: Optional[Dict]) -> Optional[Dict]:
+        """Cache a session read from (or created in) Firestore. Returns the cached data."""
+        with self._lock:
+            data = copy.deepcopy(data)
+            pending = self._pending.get(doc_id)
+            # updates not written yet are newer than what was read
+            if data is not None and pending and not apply_update(data, pending.fields):
+                data = None
+            if self.ttl > 0:
+                self._entries[doc_id] = CachedSession(data=copy.deepcopy(data), expires_at=monotonic() + self.ttl)
+            request_entries = _request_entries.get()
+            if request_entries is not None:
+                request_entries[doc_id] = CachedSession(data=copy.deepcopy(data), expires_at=math.inf)
+            return copy.deepcopy(data)
+
+    def invalidate(self, doc_id: str):
+        """Drop the cached copy of a session, so the next read goes to Firestore"""
+        with self._lock:
+            for entries in self._stores():
+                entries.pop(doc_id, None)
+
+    def update(self, doc_id: str, fields: Dict, flush=False):
+        """Buffer an update of a session, written within `window` seconds, or right away with flush=True"""
+        with self._lock:
+            for entries in self._stores():
+                entry = entries.get(doc_id)
+                if entry and entry.data is not None and not apply_update(entry.data, fields):
+                    entry.data = None
+
+            pending = self._pending.setdefault(doc_id, PendingWrite())
+            merge_fields(pending.fields, fields)
+
+            flush = flush or self.window <= 0
+            if not flush and not pending.timer:
+                pending.timer = Timer(self.window, self._flush_quietly, (doc_id,))
+                pending.timer.daemon = True
+                pending.timer.start()
+
+        if flush:
+            self.flush(doc_id)
+
+    def flush(self, doc_id: str):
+        """Write the buffered updates of a session, if any"""
+        with self._lock:
+            pending = self._pending.get(doc_id)
+        if not pending:
+            return
+
+        with pending.write_lock:
+            with self._lock:
+                fields, pending.fields = pending.fields, {}
+                if pending.timer:
+                    pending.timer.cancel()
+                    pending.timer = None
+                if not fields:
+                    self._drop_pending(doc_id, pending)
+                    return
+
+            try:
+                self.write(doc_id, fields)
+            except Exception:
+                # the cached copy holds updates that were not stored
+                self.invalidate(doc_id)
+                raise
+            finally:
+                with self._lock:
+                    self._drop_pending(doc_id, pending)
+
+    def _drop_pending(self, doc_id: str, pending: PendingWrite):
+        """forget a written buffer, unless updates were added to it meanwhile"""
+        if not pending.fields and self._pending.get(doc_id) is pending:
+            del self._pending[doc_id]
+
+    def _flush_quietly(self, doc_id: str):
+        try:
+            self.flush(doc_id)
+        except Exception as e:
+            print(f"Failed to write session updates for {doc_id}: {str(e)}")
+
+    def flush_all(self):
+        """Write the buffered updates of every session, e.g. at exit"""
+        with self._lock:
+            doc_ids = list(self._pending)
+        for doc_id in doc_ids:
+            self._flush_quietly(doc_id)
+
+    def discard(self, doc_id: str):
+        """Drop the cached copy and buffered updates of a session, e.g. when it is deleted"""
+        with self._lock:
+            for entries in self._stores():
+                entries.pop(doc_id, None)
+            pending = self._pending.pop(doc_id, None)
+            if pending and pending.timer:
+                pending.timer.cancel()
+
+    def reset(self):
+        """forked children start empty: buffered updates belong to the parent, which writes them"""
+        self._entries = {}
+        self._pending = {}
+        self._lock = Lock()
@@ -1,5 +1,7 @@
+import atexit
+import os
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Literal, Optional, cast
+from typing import Callable, Dict, List, Literal, Optional
 
 from src.services.firestore_sdk import (
     Collection,
@@ -9,6 +11,7 @@ from src.services.firestore_sdk import (
     collections,
 )
 from src.utils.chat_utils import ContentCategory, SessionChatItem
+from src.utils.session_cache import SessionCache
 
 
 @dataclass
@@ -30,9 +33,32 @@ class SessionModel:
     metadata: Optional[ChatMetadata]
     created_at: Optional[str] = None
     status: Optional[SessionStatus] = None
+    playlist: Optional[str] = None
+    peaks: Optional[str] = None
+    post_generation: Optional[Dict[str, str]] = None
+    waveform_quality: Optional[str] = None
+
+
+def _write_session(doc_id: str, data: Dict):
+    DBManager()._update_document(collections["audiora_sessions"], doc_id, data)
+
+
+session_cache = SessionCache(_write_session)
+atexit.register(session_cache.flush_all)
+os.register_at_fork(after_in_child=session_cache.reset)
 
 
 class SessionManager(DBManager):
+    """
+    Session documents, read through the per-process session cache.
+    - updates are buffered and merged into one write per session within SESSION_WRITE_WINDOW seconds;
+    call flush() at stage boundaries, or pass flush=True for updates others must see right away (e.g. status)
+    - within a request (see session_cache.request_scope), a session is read once, then served from memory
+    with this process' buffered updates applied
+    - with SESSION_CACHE_TTL > 0, the same holds across requests for that many seconds; it is 0 (off) by default,
+    since other workers change sessions too (e.g. their status)
+    """
+
     collection: Collection = collections["audiora_sessions"]
     category: ContentCategory
 
@@ -45,6 +71,9 @@ class SessionManager(DBManager):
 
     def _init_document(self):
         """if the collection does not exist, create it"""
+        if session_cache.get(self.doc_id):
+            return
+
         try:
             session_doc = self._get_document(self.collection, self.doc_id)
         except Exception:
@@ -53,19 +82,43 @@ class SessionManager(DBManager):
         if not session_doc or not session_doc.exists:
             payload = SessionModel(id=self.doc_id, chats=[], metadata=None, category=self.category)
             self._set_document(self.collection, self.doc_id, payload.__dict__)
+            session_cache.set(self.doc_id, None)
+        else:
+            session_cache.set(self.doc_id, session_doc.to_dict())
 
-    def _update(self, data: Dict):
-        return self._update_document(self.collection, self.doc_id, data)
+    def _update(self, data: Dict, flush=False):
+        return session_cache.update(self.doc_id, data, flush)
 
-    @classmethod
-    def data(cls, doc_id: str) -> SessionModel | None:
-        """Get session data"""
-        doc = DBManager()._get_document(collections["audiora_sessions"], doc_id)
+    def flush(self):
+        """Write the buffered updates of this session"""
+        return session_cache.flush(self.doc_id)
 
+    @staticmethod
+    def flush_session(doc_id: str):
+        """Write the buffered updates of a session"""
+        return session_cache.flush(doc_id)
+
+    @staticmethod
+    def _get_data(doc_id: str) -> Dict | None:
+        """session document, from the session cache or Firestore"""
+        cached = session_cache.get(doc_id)
+        if cached and cached.data is not None:
+            return cached.data
+
+        doc = DBManager()._get_document(collections["audiora_sessions"], doc_id)
         data = doc.to_dict()
         if not doc.exists or not data:
             return None
 
+        return session_cache.set(doc_id, data) or data
+
+    @classmethod
+    def data(cls, doc_id: str) -> SessionModel | None:
+        """Get session data"""
+        data = cls._get_data(doc_id)
+        if not data:
+            return None
+
         metadata = data["metadata"] or {}
 
         return SessionModel(
@@ -80,6 +133,8 @@ class SessionManager(DBManager):
                 title=metadata.get("title"),
             ),
             created_at=str(data["created_at"]),
+            post_generation=data.get("post_generation"),
+            waveform_quality=data.get("waveform_quality"),
         )
 
     def _update_source(self, source: str):
@@ -95,26 +150,22 @@ class SessionManager(DBManager):
         return self._update({"metadata.title": title})
 
     def _add_chat(self, chat: SessionChatItem):
-        return self._update_document(self.collection, self.doc_id, {"chats": arrayUnion([chat.__dict__])})
+        return self._update({"chats": arrayUnion([chat.__dict__])}, flush=True)
 
     def _delete_chat(self, chat_id: str):
-        doc = self._get_document(self.collection, self.doc_id)
-        if not doc.exists:
+        data = self._get_data(self.doc_id)
+        if not data:
             return
 
-        chat_to_remove = [chat for chat in doc.get("chats") if chat.id == chat_id]
-        self._update_document(
-            self.collection,
-            self.doc_id,
-            {"chats": arrayRemove([chat_to_remove.__dict__])},
-        )
+        chats_to_remove = [chat for chat in data["chats"] if chat["id"] == chat_id]
+        self._update({"chats": arrayRemove(chats_to_remove)}, flush=True)
 
     def _get_chat(self, chat_id: str) -> SessionChatItem | None:
-        doc = self._get_document(self.collection, self.doc_id)
-        if not doc.exists:
+        data = self._get_data(self.doc_id)
+        if not data:
             return None
 
-        item = [chat for chat in doc.get("chats") if chat.id == chat_id][0]
+        item = next((chat for chat in data["chats"] if chat["id"] == chat_id), None)
         if item:
             return SessionChatItem(
                 content=item["content"],
@@ -123,18 +174,17 @@ class SessionManager(DBManager):
             )
 
     def _get_chats(self) -> List[SessionChatItem]:
-        doc = self._get_document(self.collection, self.doc_id)
-        if not doc.exists:
+        data = self._get_data(self.doc_id)
+        if not data:
             return []
 
-        chats = cast(Dict, doc.get("chats"))
         return [
             SessionChatItem(
                 id=chat["id"],
                 content=chat["content"],
                 role=chat["role"],
             )
-            for chat in chats
+            for chat in data["chats"]
         ]
 
     def subscribe_to_metadata_info(self, callback: Callable):
@@ -152,8 +202,18 @@ class SessionManager(DBManager):
 
     @staticmethod
     def _delete_session(doc_id: str):
+        session_cache.discard(doc_id)
         return DBManager()._delete_document(collections["audiora_sessions"], doc_id)
 
     @staticmethod
     def _update_status(doc_id: str, status: SessionStatus):
-        return DBManager()._update_document(collections["audiora_sessions"], doc_id, data={"status": status})
+        return session_cache.update(doc_id, {"status": status}, flush=True)
+
+    @staticmethod
+    def _update_waveform_quality(doc_id: str, quality: str):
+        """Record which waveform video quality is live"""
+        return session_cache.update(doc_id, {"waveform_quality": quality}, flush=True)
+
+    @staticmethod
+    def _update_post_generation(doc_id: str, stage: str, status: str, flush=False):
+        return session_cache.update(doc_id, {f"post_generation.{stage}": status}, flush)
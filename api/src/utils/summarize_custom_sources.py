@@ -38,17 +38,17 @@ async def get_source_content(source_url: str):
     content_reader = ReadContent()
 
     blob_name = source_url.replace(f"gs://{storage_manager.bucket_name}/", "")
-    blob = storage_manager.get_blob(blob_name)
-    content_byte = blob.download_as_bytes()
+    content_type = storage_manager.get_blob_info(blob_name).content_type
+    content_byte = storage_manager.read_blob(blob_name)
 
-    if blob.content_type == "application/pdf":
+    if content_type == "application/pdf":
         text_content, _ = content_reader._read_pdf(content_byte)
-    elif blob.content_type == "text/plain":
+    elif content_type == "text/plain":
         text_content = content_reader._read_txt(content_byte)
-    elif blob.content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+    elif content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
         text_content = content_reader._read_docx(content_byte)
     else:
-        print(f"Unsupported content type: {blob.content_type}")
+        print(f"Unsupported content type: {content_type}")
         return None
 
     return text_content
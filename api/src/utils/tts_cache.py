@@ -0,0 +1,123 @@
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+from src.services.storage import BLOB_BASE_URI, StorageManager, UploadItemParams
+from src.utils.make_seed import get_hash
+
+TTS_CACHE_DIR = "/tmp/audiora/tts_cache"
+TTS_CACHE_PREFIX = f"{BLOB_BASE_URI}/tts_cache"
+TTS_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+@dataclass
+class TTSCacheConfig:
+    local_dir: str = TTS_CACHE_DIR
+    max_local_bytes: int = TTS_CACHE_MAX_BYTES
+    remote_prefix: str = TTS_CACHE_PREFIX
+    use_remote: bool = True
+
+
+def normalize_tts_text(text: str) -> str:
+    """Collapse whitespace so formatting differences map to the same segment"""
+    return " ".join(text.split())
+
+
+def get_tts_cache_key(model: str, voice: str, response_format: str, text: str) -> str:
+    """Content address of a synthesized segment"""
+    return get_hash(f"{model}|{voice}|{response_format}|{normalize_tts_text(text)}")
+
+
+class TTSSegmentCache:
+    """
+    Two-tier cache of synthesized TTS segments.
+    - local: size-bounded directory on disk, evicted least-recently-used first
+    - remote: shared blobs under the storage bucket, reused across workers and instances,
+    uploaded from the local tier so callers can run the upload in the background
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, config: TTSCacheConfig | None = None):
+        self.config = config or TTSCacheConfig()
+        Path(self.config.local_dir).mkdir(parents=True, exist_ok=True)
+
+    def _local_path(self, key: str, response_format: str):
+        return Path(self.config.local_dir) / f"{key}.{response_format}"
+
+    def _blobname(self, key: str, response_format: str):
+        return f"{self.config.remote_prefix}/{key}.{response_format}"
+
+    def get(self, key: str, response_format: str, output_file: str) -> bool:
+        """Copy a cached segment to output_file. Returns False on a miss."""
+        local_path = self._local_path(key, response_format)
+
+        if not local_path.exists() and self.config.use_remote:
+            self._download(key, response_format, local_path)
+
+        try:
+            shutil.copyfile(local_path, output_file)
+            # mark as recently used for LRU eviction
+            os.utime(local_path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def put(self, key: str, response_format: str, file_path: str) -> bool:
+        """Store a synthesized segment in the local tier. Returns False if it could not be stored."""
+        try:
+            self._atomic_copy(file_path, self._local_path(key, response_format))
+            self._evict()
+            return True
+        except Exception as e:
+            print(f"Failed to cache TTS segment {key}: {str(e)}")
+            return False
+
+    def upload(self, key: str, response_format: str) -> None:
+        """Store a segment of the local tier in the remote tier"""
+        if not self.config.use_remote:
+            return
+        try:
+            StorageManager().upload_to_gcs(
+                self._local_path(key, response_format),
+                self._blobname(key, response_format),
+                UploadItemParams(content_type=f"audio/{response_format}"),
+            )
+        except Exception as e:
+            # e.g. the local copy was evicted before the upload ran
+            print(f"Failed to upload TTS segment {key}: {str(e)}")
+
+    def _download(self, key: str, response_format: str, local_path: Path) -> None:
+        try:
+            StorageManager().download_blob(self._blobname(key, response_format), local_path)
+            self._evict()
+        except Exception:
+            # missing remote blob is a cache miss
+            pass
+
+    def _atomic_copy(self, src: str, dest: Path) -> None:
+        tmp_path = dest.with_name(f"{dest.name}.{uuid4()}.part")
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dest)
+
+    def _evict(self) -> None:
+        """Remove least-recently-used segments until the local tier fits its byte budget"""
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.config.local_dir):
+                if entry.is_file() and not entry.name.endswith(".part"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.config.max_local_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,226 @@
+import asyncio
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import AsyncIterator, Deque, Optional
+
+from src.env_var import TTS_CHARS_PER_MINUTE, TTS_MAX_CONCURRENCY, TTS_REQUESTS_PER_MINUTE
+
+
+@dataclass
+class TTSSchedulerConfig:
+    max_concurrency: int = TTS_MAX_CONCURRENCY
+    requests_per_minute: int = TTS_REQUESTS_PER_MINUTE
+    chars_per_minute: int = TTS_CHARS_PER_MINUTE
+
+
+@dataclass
+class TTSSchedulerStats:
+    queue_depth: int
+    running: int
+    sessions: int
+    completed: int
+    cancelled: int
+    avg_wait_seconds: float
+    max_wait_seconds: float
+    paused_for_seconds: float
+
+
+class TokenBucket:
+    """Token bucket refilled continuously up to its capacity"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated_at = monotonic()
+
+    def _refill(self):
+        now = monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_second)
+        self._updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount tokens are available"""
+        self._refill()
+        missing = min(amount, self.capacity) - self._tokens
+        return max(missing, 0) / self.refill_per_second
+
+    def consume(self, amount: float):
+        """Take amount tokens, capped at the capacity"""
+        self._refill()
+        self._tokens -= min(amount, self.capacity)
+
+    def drain(self):
+        """Empty the bucket, e.g. when the provider says we are over its limit"""
+        self._refill()
+        self._tokens = 0
+
+
+@dataclass
+class _Ticket:
+    chars: int
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=monotonic)
+
+
+class TTSScheduler:
+    """
+    Process-wide scheduler for TTS calls.
+    - global concurrency limit shared by every request in the worker
+    - token buckets sized to the provider's requests and characters per minute
+    - round-robin between sessions so one long audiocast cannot starve the others
+    Callers reserve a slot and run their async TTS call on their own event loop.
+    """
+
+    def __init__(self, config: Optional[TTSSchedulerConfig] = None):
+        self.config = config or TTSSchedulerConfig()
+        self._cond = threading.Condition()
+        self._queues: OrderedDict[str, Deque[_Ticket]] = OrderedDict()
+        self._running = 0
+        self._paused_until = 0.0
+
+        self._requests = TokenBucket(self.config.requests_per_minute, self.config.requests_per_minute / 60)
+        self._chars = TokenBucket(self.config.chars_per_minute, self.config.chars_per_minute / 60)
+
+        self._granted = 0
+        self._completed = 0
+        self._cancelled = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="tts-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def _enqueue(self, session_id: str, ticket: _Ticket) -> Future:
+        with self._cond:
+            self._queues.setdefault(session_id, deque()).append(ticket)
+            self._cond.notify()
+        return ticket.future
+
+    @asynccontextmanager
+    async def slot(self, session_id: str, chars: int) -> AsyncIterator[None]:
+        """Wait for a scheduling slot and hold it while async TTS work runs on the event loop"""
+        granted = self._enqueue(session_id, _Ticket(chars=chars))
+        try:
+            await asyncio.wrap_future(granted)
+        except asyncio.CancelledError:
+            # a queued ticket is dropped by the dispatcher; a slot granted meanwhile, even one the
+            # dispatcher is still handing over, is given back once the grant completes
+            granted.cancel()
+            granted.add_done_callback(self._release_abandoned)
+            raise
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def pause(self, seconds: float):
+        """Hold back dispatching after the provider rate limited us"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, monotonic() + seconds)
+            self._requests.drain()
+            self._cond.notify()
+
+    def stats(self) -> TTSSchedulerStats:
+        """Queue depth and wait times of this scheduler"""
+        with self._cond:
+            return TTSSchedulerStats(
+                queue_depth=sum(len(queue) for queue in self._queues.values()),
+                running=self._running,
+                sessions=len(self._queues),
+                completed=self._completed,
+                cancelled=self._cancelled,
+                avg_wait_seconds=round(self._total_wait / self._granted, 3) if self._granted else 0.0,
+                max_wait_seconds=round(self._max_wait, 3),
+                paused_for_seconds=round(max(self._paused_until - monotonic(), 0.0), 3),
+            )
+
+    def _next_delay(self, ticket: _Ticket) -> float:
+        return max(
+            self._paused_until - monotonic(),
+            self._requests.wait_time(1),
+            self._chars.wait_time(ticket.chars),
+        )
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while self._running >= self.config.max_concurrency or not self._queues:
+                    self._cond.wait()
+
+                session_id, queue = next(iter(self._queues.items()))
+                ticket = queue[0]
+
+                if ticket.future.cancelled():
+                    # the caller stopped waiting: drop the ticket without spending tokens or the session's turn
+                    queue.popleft()
+                    if not queue:
+                        self._queues.pop(session_id)
+                    self._cancelled += 1
+                    continue
+
+                delay = self._next_delay(ticket)
+                if delay > 0:
+                    self._cond.wait(timeout=delay)
+                    continue
+
+                queue.popleft()
+                # rotate the session to the back of the line
+                self._queues.pop(session_id)
+                if queue:
+                    self._queues[session_id] = queue
+
+                # from here on the caller can no longer cancel the ticket, only give back the slot
+                if not ticket.future.set_running_or_notify_cancel():
+                    self._cancelled += 1
+                    continue
+
+                self._requests.consume(1)
+                self._chars.consume(ticket.chars)
+                self._running += 1
+                self._granted += 1
+
+                wait = monotonic() - ticket.enqueued_at
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+
+            ticket.future.set_result(None)
+
+    def _release(self, completed=True):
+        with self._cond:
+            self._running -= 1
+            if completed:
+                self._completed += 1
+            else:
+                self._cancelled += 1
+            self._cond.notify()
+
+    def _release_abandoned(self, granted: Future):
+        # a slot granted to a caller that was cancelled before it could use it
+        if not granted.cancelled():
+            self._release(completed=False)
+
+
+_scheduler: Optional[TTSScheduler] = None
+_scheduler_pid: Optional[int] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_tts_scheduler() -> TTSScheduler:
+    """
+    Return the TTS scheduler of the current process.
+    Created on first use and again after a fork, since threads do not survive gunicorn's --preload fork.
+    """
+    global _scheduler, _scheduler_pid
+
+    with _scheduler_lock:
+        if _scheduler is None or _scheduler_pid != os.getpid():
+            _scheduler = TTSScheduler()
+            _scheduler_pid = os.getpid()
+        return _scheduler
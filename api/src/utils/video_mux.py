@@ -0,0 +1,82 @@
+import os
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+from uuid import uuid4
+
+from src.env_var import VIDEO_AAC_BITRATE, VIDEO_CRF, VIDEO_PRESET
+
+AAC_SUFFIX = ".m4a"
+
+
+@dataclass(frozen=True)
+class VideoEncodeConfig:
+    """
+    libx264 settings for the visual track.
+    Our videos are static or low-motion, so a fast preset with a high CRF keeps them small and cheap to encode.
+    """
+
+    preset: str = VIDEO_PRESET
+    crf: int = VIDEO_CRF
+    tune: Optional[str] = None
+
+    def args(self) -> List[str]:
+        """ffmpeg output options for the video stream"""
+        args = ["-c:v", "libx264", "-preset", self.preset, "-crf", str(self.crf)]
+        if self.tune:
+            args += ["-tune", self.tune]
+        return args + ["-pix_fmt", "yuv420p"]
+
+
+STILL_IMAGE_ENCODE = VideoEncodeConfig(tune="stillimage")
+WAVEFORM_ENCODE = VideoEncodeConfig(tune="animation")
+
+
+def get_aac_path(audio_path: str | Path) -> Path:
+    """AAC track kept next to an audio file, shared by every video made from it"""
+    return Path(f"{audio_path}{AAC_SUFFIX}")
+
+
+def discard_aac_track(audio_path: str | Path) -> None:
+    get_aac_path(audio_path).unlink(missing_ok=True)
+
+
+def ensure_aac_track(audio_path: str | Path) -> Path:
+    """
+    Encode the audio to AAC once and reuse it afterwards.
+    Video outputs stream-copy this track instead of each re-encoding the audio.
+    """
+    aac_path = get_aac_path(audio_path)
+    if aac_path.exists() and aac_path.stat().st_size:
+        return aac_path
+
+    tmp_path = aac_path.with_name(f"{aac_path.name}.{uuid4()}.part")
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-i",
+        str(audio_path),
+        "-vn",
+        "-c:a",
+        "aac",
+        "-b:a",
+        VIDEO_AAC_BITRATE,
+        "-f",
+        "ipod",
+        str(tmp_path),
+    ]
+    try:
+        subprocess.run(cmd, check=True)
+        os.replace(tmp_path, aac_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    return aac_path
+
+
+def audio_copy_args(audio_input_index: int) -> List[str]:
+    """Map the shared AAC track of the given input into the output without re-encoding it"""
+    return ["-map", f"{audio_input_index}:a", "-c:a", "copy"]
@@ -0,0 +1,105 @@
+import json
+from typing import TYPE_CHECKING, Dict, Sequence, Tuple
+
+from src.env_var import API_URL
+from src.services.storage import BLOB_BASE_URI, StorageManager, UploadItemParams
+from src.utils.decoded_audio import DecodedAudio
+
+if TYPE_CHECKING:
+    import numpy as np
+
+PEAKS_NAME = "peaks.json"
+PEAKS_VERSION = 1
+PEAK_RESOLUTIONS = (256, 1024, 4096)
+PEAK_BITS = 8
+
+Peaks = Dict[int, Tuple["np.ndarray", "np.ndarray"]]
+
+
+def get_peaks_blobname(session_id: str):
+    """Blob holding the waveform peaks of a session, next to its audio"""
+    return f"{BLOB_BASE_URI}/{session_id}.{PEAKS_NAME}"
+
+
+def get_peaks_url(session_id: str):
+    """API route that serves the waveform peaks of a session"""
+    return f"{API_URL}/audiocast/{session_id}/{PEAKS_NAME}"
+
+
+def compute_peaks(samples: "np.ndarray", resolutions: Sequence[int] = PEAK_RESOLUTIONS) -> Peaks:
+    """Min/max of mono float PCM over equal-width buckets, for each resolution"""
+    import numpy as np
+
+    peaks: Peaks = {}
+    for buckets in resolutions:
+        data = samples if len(samples) >= buckets else np.pad(samples, (0, buckets - len(samples)))
+        edges = np.arange(buckets) * len(data) // buckets
+        peaks[buckets] = (np.minimum.reduceat(data, edges), np.maximum.reduceat(data, edges))
+    return peaks
+
+
+def encode_peaks(peaks: Peaks, sample_rate: int, duration: float) -> str:
+    """
+    Serialize peaks as compact JSON.
+    Values are quantized to signed 8-bit and interleaved as [min0, max0, min1, max1, ...] per resolution.
+    That is 10,752 values at the default resolutions, about 48 KB for speech and at most about 54 KB,
+    whatever the length of the audio.
+    """
+    import numpy as np
+
+    scale = 2 ** (PEAK_BITS - 1) - 1
+    resolutions = {}
+    for buckets, (mins, maxs) in peaks.items():
+        interleaved = np.empty(2 * buckets, dtype=np.int64)
+        interleaved[0::2] = np.round(np.clip(mins, -1.0, 1.0) * scale)
+        interleaved[1::2] = np.round(np.clip(maxs, -1.0, 1.0) * scale)
+        resolutions[str(buckets)] = interleaved.tolist()
+
+    content = {
+        "version": PEAKS_VERSION,
+        "sample_rate": sample_rate,
+        "duration": round(duration, 3),
+        "bits": PEAK_BITS,
+        "resolutions": resolutions,
+    }
+    return json.dumps(content, separators=(",", ":"))
+
+
+class WaveformPeaks:
+    def __init__(self, session_id: str, audio_path: str):
+        self.session_id = session_id
+        self.audio_path = audio_path
+
+    def run_all(self):
+        """
+        1. Compute multi-resolution min/max peaks of the audio file
+        2. Upload them as a JSON sidecar next to the audio
+        """
+        return self.upload(self.generate())
+
+    def generate(self) -> str:
+        """Encode the peaks of the audio's shared PCM, decoded only if no stage has done so yet"""
+        decoded = DecodedAudio.for_audio(self.audio_path)
+        return encode_peaks(compute_peaks(decoded.mono()), decoded.sample_rate, decoded.duration)
+
+    def upload(self, content: str) -> str:
+        """Store the encoded peaks next to the audio. Returns the blob URL."""
+        return StorageManager().upload_to_gcs(
+            content,
+            get_peaks_blobname(self.session_id),
+            UploadItemParams(content_type="application/json"),
+        )
+
+
+def peaks_exist(session_id: str) -> bool:
+    """check if waveform peaks were generated for the session"""
+    return StorageManager().blob_exists(get_peaks_blobname(session_id))
+
+
+def get_peaks(session_id: str) -> str | None:
+    """get the waveform peaks JSON of a session"""
+    storage_manager = StorageManager()
+    blobname = get_peaks_blobname(session_id)
+    if not storage_manager.blob_exists(blobname):
+        return None
+    return storage_manager.read_blob(blobname).decode()
@@ -0,0 +1,300 @@
+import multiprocessing
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.decoded_audio import DecodedAudio
+from src.utils.video_mux import WAVEFORM_ENCODE, VideoEncodeConfig, audio_copy_args, ensure_aac_track
+
+Color = Tuple[float, float, float]
+
+FG_COLOR: Color = (0.0, 1.0, 0.6)  # Bright green
+BG_COLOR: Color = (0.05, 0.05, 0.05)  # Near black
+VIDEO_SIZE = (400, 400)
+
+BAR_PAD_RATIO = 0.1  # spacing between two bars, relative to the bar width
+LOWER_ALPHA = 0.8  # opacity of the mirrored lower half of each bar
+LOWER_SCALE = 0.9  # height of the lower half relative to the upper half
+CHUNK_SECONDS = 2
+MIN_SHARD_SECONDS = 10  # shorter shards cost more in process start-up than they save
+
+
+@dataclass
+class WaveformRenderSettings:
+    bars: int
+    speed: float
+    time: float
+    rate: int
+    oversample: int
+    size: Tuple[int, int] = VIDEO_SIZE
+    fg_color: Color = FG_COLOR
+    bg_color: Color = BG_COLOR
+    video: VideoEncodeConfig = WAVEFORM_ENCODE
+
+
+def sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def _to_rgb(color: Color) -> np.ndarray:
+    return np.round(np.asarray(color, dtype=np.float64) * 255).astype(np.uint8)
+
+
+class WaveformRenderer:
+    """
+    Render an animated bar waveform video, drawn the same way as seewav.
+    - envelopes of every frame are computed in vectorized form from one decoded mono signal
+    - bars are rasterized straight into NumPy RGB buffers from pre-drawn pixel columns, a chunk of frames at a time
+    - raw frames are piped into ffmpeg's stdin, so no intermediate images touch the disk
+    - optionally, frame ranges are rendered in parallel processes and stitched with a stream-copy concat
+    """
+
+    def __init__(self, settings: WaveformRenderSettings):
+        self.settings = settings
+        self.width, self.height = settings.size
+
+        self._fg = _to_rgb(settings.fg_color)
+        self._bg = _to_rgb(settings.bg_color)
+        self._fg_lower = _to_rgb(
+            tuple(LOWER_ALPHA * f + (1 - LOWER_ALPHA) * b for f, b in zip(settings.fg_color, settings.bg_color))
+        )
+        self._column_bar, self._column_mask = self._bar_columns()
+        self._smooth = np.hanning(settings.bars)
+        self._upper_columns, self._lower_columns = self._column_tables()
+
+    def _bar_columns(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Index of the bar covering each pixel column, and whether the column is covered at all"""
+        bars = self.settings.bars
+        bar_width = self.width / (bars * (1 + 2 * BAR_PAD_RATIO))
+        pad = BAR_PAD_RATIO * bar_width
+        delta = 2 * pad + bar_width
+
+        centers = np.arange(self.width) + 0.5
+        step = np.clip(np.round((centers - pad) / delta).astype(np.int64), 0, bars - 1)
+        covered = np.abs(centers - (pad + step * delta)) < bar_width / 2
+        return step, covered
+
+    def envelope(self, wav: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, int]:
+        """Compressed positive envelope of the signal, sampled every `stride` samples"""
+        settings = self.settings
+        window = max(int(sample_rate * settings.time / settings.bars), 1)
+        stride = max(int(window / settings.oversample), 1)
+
+        std = wav.std()
+        wav = wav / std if std > 0 else wav
+        padded = np.pad(np.maximum(wav, 0), window // 2)
+
+        cumulative = np.concatenate([[0.0], np.cumsum(padded, dtype=np.float64)])
+        offsets = np.arange(0, max(len(padded) - window, 0), stride)
+        env = (cumulative[offsets + window] - cumulative[offsets]) / window
+        env = 1.9 * (sigmoid(2.5 * env) - 0.5)
+
+        return np.pad(env, (settings.bars // 2, 2 * settings.bars)), stride
+
+    def frame_envelopes(self, env: np.ndarray, stride: int, sample_rate: int, start: int, stop: int) -> np.ndarray:
+        """Bar heights in [0, 1] of frames [start, stop), shape (frames, bars)"""
+        settings = self.settings
+        bars = settings.bars
+
+        pos = np.arange(start, stop) / settings.rate * sample_rate / stride / bars
+        off = pos.astype(np.int64)
+        loc = pos - off
+
+        columns = np.arange(bars)
+        env1 = env.take(off[:, None] * bars + columns, mode="clip")
+        env2 = env.take((off[:, None] + 1) * bars + columns, mode="clip")
+
+        # loud parts are updated faster
+        maxvol = np.log10(1e-4 + env2.max(axis=1)) * 10
+        speedup = np.clip(0.5 + 1.5 * (maxvol + 6) / 6, 0.5, 2)
+        w = sigmoid(settings.speed * speedup * (loc - 0.5))[:, None]
+
+        return ((1 - w) * env1 + w * env2) * self._smooth
+
+    def _column_tables(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pre-drawn pixel columns for every possible bar height.
+        upper[k] is the upper half of a column with k lit pixels above the midrule,
+        lower[k] the lower half with k lit pixels below it.
+        """
+        mid = self.height // 2
+        upper_rows = np.arange(mid)
+        lower_rows = np.arange(self.height - mid)
+
+        lit_upper = upper_rows[None, :] >= mid - np.arange(mid + 1)[:, None]
+        lit_lower = lower_rows[None, :] < np.arange(self.height - mid + 1)[:, None]
+        upper = np.where(lit_upper[..., None], self._fg, self._bg).astype(np.uint8)
+        lower = np.where(lit_lower[..., None], self._fg_lower, self._bg).astype(np.uint8)
+        return upper, lower
+
+    def rasterize(self, envs: np.ndarray) -> np.ndarray:
+        """
+        Draw bar heights of shape (frames, bars) into RGB frames.
+        Frames are column-major, shape (frames, width, height, 3): every pixel column is then one contiguous
+        copy from the pre-drawn tables, and ffmpeg transposes the frames back while encoding.
+        """
+        height = self.height
+        mid = height // 2
+        heights = envs[:, self._column_bar] * self._column_mask
+
+        # upper bar grows up from the midrule, the dimmer lower bar mirrors it at 90% height
+        top = height * (0.5 - 0.5 * heights)
+        bottom = height * (0.5 + 0.5 * LOWER_SCALE * heights)
+
+        # lit pixels are the ones whose center lies inside the bar
+        upper_count = np.clip(mid - np.ceil(top - 0.5), 0, mid).astype(np.int64)
+        lower_count = np.clip(np.ceil(bottom - 0.5) - mid, 0, height - mid).astype(np.int64)
+
+        frames = np.empty((len(envs), self.width, height, 3), dtype=np.uint8)
+        frames[:, :, :mid] = self._upper_columns[upper_count]
+        frames[:, :, mid:] = self._lower_columns[lower_count]
+        return frames
+
+    def iter_frames(
+        self, env: np.ndarray, stride: int, sample_rate: int, start: int, stop: int
+    ) -> Iterator[np.ndarray]:
+        """Yield chunks of rendered frames covering frames [start, stop)"""
+        chunk = max(self.settings.rate * CHUNK_SECONDS, 1)
+        for chunk_start in range(start, stop, chunk):
+            chunk_stop = min(chunk_start + chunk, stop)
+            yield self.rasterize(self.frame_envelopes(env, stride, sample_rate, chunk_start, chunk_stop))
+
+    def frame_count(self, num_samples: int, sample_rate: int) -> int:
+        """Number of video frames covering num_samples of audio"""
+        return int(self.settings.rate * num_samples / sample_rate)
+
+    def encode(self, frames: Iterator[np.ndarray], output_path: Path, audio_path: Optional[Path] = None) -> Path:
+        """
+        Pipe rendered frames into ffmpeg, muxed with the audio when audio_path is given.
+        The audio goes in as a stream copy of its shared AAC track.
+        """
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            "-s",
+            f"{self.height}x{self.width}",
+            "-r",
+            str(self.settings.rate),
+            "-i",
+            "pipe:0",
+        ]
+        if audio_path:
+            cmd += ["-i", str(ensure_aac_track(audio_path)), "-map", "0:v", *audio_copy_args(1)]
+        cmd += ["-vf", "transpose=cclock_flip", *self.settings.video.args(), str(output_path)]
+
+        encoder = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        try:
+            assert encoder.stdin
+            for chunk in frames:
+                encoder.stdin.write(chunk.tobytes())
+            encoder.stdin.close()
+            if encoder.wait() != 0:
+                raise RuntimeError(f"ffmpeg exited with {encoder.returncode}")
+        finally:
+            if encoder.poll() is None:
+                encoder.kill()
+
+        return output_path
+
+    def render(self, audio_path: Path, output_path: Path, workers: int = 1) -> Path:
+        """
+        Render the waveform video of an audio file, muxed with the audio.
+        With more than one worker, the timeline is split into frame ranges rendered in parallel processes.
+        """
+        decoded = DecodedAudio.for_audio(audio_path)
+        sample_rate = decoded.sample_rate
+        wav = decoded.mono()
+        env, stride = self.envelope(wav, sample_rate)
+        total = self.frame_count(len(wav), sample_rate)
+        del wav
+
+        shards = split_frame_ranges(total, workers, self.settings.rate * MIN_SHARD_SECONDS)
+        if len(shards) <= 1:
+            return self.encode(self.iter_frames(env, stride, sample_rate, 0, total), output_path, audio_path)
+
+        return self._render_sharded(env, stride, sample_rate, shards, audio_path, output_path)
+
+    def _render_sharded(
+        self,
+        env: np.ndarray,
+        stride: int,
+        sample_rate: int,
+        shards: List[Tuple[int, int]],
+        audio_path: Path,
+        output_path: Path,
+    ) -> Path:
+        """
+        Encode each frame range as its own video chunk, then stream-copy the chunks and the shared AAC track together.
+        Every chunk holds a whole number of frames at the same rate, so chunk boundaries fall exactly on frame boundaries.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            chunk_paths = [Path(temp_dir) / f"chunk_{index:03d}.mp4" for index in range(len(shards))]
+
+            concat_list = Path(temp_dir) / "chunks.txt"
+            concat_list.write_text("".join(f"file '{path}'\n" for path in chunk_paths))
+
+            # spawn rather than fork: the web worker runs threads that must not be forked mid-flight
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+                futures = [
+                    pool.submit(_render_shard, self.settings, env, stride, sample_rate, start, stop, chunk_path)
+                    for (start, stop), chunk_path in zip(shards, chunk_paths)
+                ]
+                for future in futures:
+                    future.result()
+
+            cmd = [
+                "ffmpeg",
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                str(concat_list),
+                "-i",
+                str(ensure_aac_track(audio_path)),
+                "-map",
+                "0:v",
+                "-c:v",
+                "copy",
+                *audio_copy_args(1),
+                str(output_path),
+            ]
+            subprocess.run(cmd, check=True)
+
+        return output_path
+
+
+def split_frame_ranges(total: int, shards: int, min_frames: int = 1) -> List[Tuple[int, int]]:
+    """Split frames [0, total) into at most `shards` contiguous ranges of at least min_frames each"""
+    shards = max(min(shards, total // max(min_frames, 1)), 1)
+    bounds = [total * index // shards for index in range(shards + 1)]
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+def _render_shard(
+    settings: WaveformRenderSettings,
+    env: np.ndarray,
+    stride: int,
+    sample_rate: int,
+    start: int,
+    stop: int,
+    chunk_path: Path,
+) -> Path:
+    """Process pool entrypoint: render and encode frames [start, stop) as a video-only chunk"""
+    renderer = WaveformRenderer(settings)
+    return renderer.encode(renderer.iter_frames(env, stride, sample_rate, start, stop), chunk_path)
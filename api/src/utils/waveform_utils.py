@@ -1,10 +1,10 @@
-import tempfile
 from pathlib import Path
 from typing import Literal
 
-from seewav import visualize
-
-from src.services.storage import StorageManager
+from src.env_var import WAVEFORM_RENDER_WORKERS
+from src.services.storage import BLOB_BASE_URI, StorageManager, UploadItemParams
+from src.utils.session_manager import SessionManager
+from src.utils.waveform_renderer import WaveformRenderer, WaveformRenderSettings
 
 WaveformQuality = Literal["low", "medium", "high", "ultra"]
 WaveFormSettings = {
@@ -13,6 +13,7 @@ WaveFormSettings = {
     "high": {"bars": 80, "speed": 1.5, "time": 1.0, "rate": 30, "oversample": 4},
     "ultra": {"bars": 120, "speed": 1, "time": 1.2, "rate": 60, "oversample": 8},
 }
+PREVIEW_QUALITY: WaveformQuality = "low"
 
 
 class WaveformUtils:
@@ -23,46 +24,70 @@ class WaveformUtils:
     def _get_quality_settings(self, quality: WaveformQuality = "high"):
         return WaveFormSettings.get(quality, WaveFormSettings["high"])
 
-    def run_all(self):
+    def run_all(self, quality: WaveformQuality = "high"):
         """
         1. Generate a waveform video from the audio file
         2. Upload it to Google Cloud Storage.
         """
-        tmp_path = self.get_tmp_video_path()
-        self.generate_waveform_video(tmp_path)
-        self.save_waveform_video_to_gcs(str(tmp_path))
+        tmp_path = self.get_tmp_video_path(quality)
+        try:
+            self.generate_waveform_video(tmp_path, quality)
+            self.save_waveform_video_to_gcs(str(tmp_path), quality)
+        finally:
+            tmp_path.unlink(missing_ok=True)
 
-    def get_tmp_video_path(self):
+    def run_preview(self):
+        """
+        Render and upload a fast low-quality waveform, so the session has a visual
+        while the requested quality is rendered. run_all later replaces the same blob.
+        """
+        self.run_all(PREVIEW_QUALITY)
+
+    def get_tmp_video_path(self, quality: WaveformQuality = "high"):
         """
         Get temporary video path for waveform visualization.
         """
         tmp_directory = Path("/tmp/audiora/waveforms")
         tmp_directory.mkdir(parents=True, exist_ok=True)
-        tmp_vid_path = tmp_directory / f"{self.session_id}.mp4"
+        tmp_vid_path = tmp_directory / f"{self.session_id}.{quality}.mp4"
 
         return tmp_vid_path
 
-    def save_waveform_video_to_gcs(self, video_path: str):
-        """Ingest waveform visualization to GCS."""
-        full_path = StorageManager().upload_video_to_gcs(video_path, f"{self.session_id}.mp4")
+    def save_waveform_video_to_gcs(self, video_path: str, quality: WaveformQuality = "high"):
+        """
+        Ingest waveform visualization to GCS.
+        - an object upload replaces the previous blob atomically, so readers see either the preview or the final video
+        - the preview must not be cached, since the final video is uploaded under the same name
+        """
+        params = UploadItemParams(content_type="video/mp4", metadata={"quality": quality})
+        if quality == PREVIEW_QUALITY:
+            params.cache_control = "no-cache"
+
+        full_path = StorageManager().upload_to_gcs(Path(video_path), f"{BLOB_BASE_URI}/{self.session_id}.mp4", params)
+        SessionManager._update_waveform_quality(self.session_id, quality)
         return full_path
 
-    def generate_waveform_video(self, output_path: Path, quality: WaveformQuality = "high") -> Path:
-        """Generate waveform video from audio file using SeeWav with quality settings."""
+    def generate_waveform_video(
+        self,
+        output_path: Path,
+        quality: WaveformQuality = "high",
+        workers: int = WAVEFORM_RENDER_WORKERS,
+    ) -> Path:
+        """
+        Generate waveform video from audio file with quality settings.
+        With more than one worker, frame ranges are rendered in parallel processes.
+        """
         settings = self._get_quality_settings(quality)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            visualize(
-                audio=Path(self.audio_path),
-                tmp=Path(temp_dir),
-                out=output_path,
+        renderer = WaveformRenderer(
+            WaveformRenderSettings(
                 bars=settings["bars"],
                 speed=settings["speed"],
                 time=settings["time"],
                 rate=settings["rate"],
                 oversample=settings["oversample"],
-                # size=(120, 68),
                 fg_color=(0.0, 1.0, 0.6),  # Bright green
                 bg_color=(0.05, 0.05, 0.05),  # Near black
             )
-            return output_path
+        )
+        return renderer.render(Path(self.audio_path), output_path, workers)
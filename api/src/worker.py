@@ -0,0 +1,29 @@
+"""
+Post-generation worker entrypoint.
+Runs the upload, transcript and waveform stages of generated audiocasts from the durable queue,
+separately from the API workers. Enable enqueueing in the API with POST_GENERATION_QUEUE=true.
+
+    python -m src.worker
+"""
+
+import asyncio
+import signal
+
+from .utils.post_generation import PostGenerationWorker
+from .utils.post_generation_queue import RedisJobQueue
+
+
+async def main():
+    worker = PostGenerationWorker(RedisJobQueue())
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    print("Post-generation worker started")
+    await worker.run()
+    print("Post-generation worker stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
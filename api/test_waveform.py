@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Test script to verify SeeWav waveform generation with different quality settings
+Test script to verify waveform generation with different quality settings
 """
 
 import os
@@ -22,7 +22,7 @@ def test_waveform_generation():
         print("❌ Test audio file not found. Please run TTS test first.")
         return False
 
-    print("Testing SeeWav waveform generation...")
+    print("Testing waveform generation...")
 
     # Test different quality settings
     for quality in ("medium", "high"):
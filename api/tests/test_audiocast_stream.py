@@ -0,0 +1,74 @@
+import asyncio
+import os
+import tempfile
+
+from src.utils.audiocast_stream import AudiocastStreamPublisher, SegmentReorderBuffer
+from src.utils.generate_speech_utils import SpeechJob
+
+FRAME = bytes([0xFF, 0xF3, 0x84, 0xC4]) + bytes(188)
+
+
+class ListRedis:
+    """the Redis commands the publisher uses, kept in memory"""
+
+    def __init__(self):
+        self.lists: dict[str, list[bytes]] = {}
+
+    async def rpush(self, key: str, *values: bytes):
+        """append values to a list"""
+        self.lists.setdefault(key, []).extend(values)
+
+    async def expire(self, key: str, ttl: int):
+        """lists never expire here"""
+
+
+def test_reorder_buffer_releases_in_order():
+    buffer = SegmentReorderBuffer()
+
+    assert buffer.push(2, b"b") == []
+    assert buffer.push(3, b"c") == []
+    assert buffer.pending == 2
+    assert buffer.push(1, b"a") == [b"a", b"b", b"c"]
+    assert buffer.pending == 0
+
+
+def test_reorder_buffer_skips_failed_segments():
+    buffer = SegmentReorderBuffer()
+
+    assert buffer.push(3, b"c") == []
+    # a failed segment takes its turn, so the ones after it are not held back
+    assert buffer.push(2, None) == []
+    assert buffer.push(1, b"a") == [b"a", b"c"]
+    assert buffer.pending == 0
+
+
+def test_publisher_skips_unparseable_segment():
+    async def run():
+        publisher = AudiocastStreamPublisher("test-session")
+        publisher.redis = ListRedis()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            contents = {1: FRAME * 3, 2: b"not an mp3", 3: FRAME * 2}
+            jobs = []
+            for index, data in contents.items():
+                output_file = os.path.join(tmp, f"{index}.mp3")
+                with open(output_file, "wb") as f:
+                    f.write(data)
+                jobs.append(SpeechJob(content="", voice="alloy", output_file=output_file, tag="Speaker1", index=index))
+
+            for job in reversed(jobs):
+                await publisher.on_segment(job, job.output_file)
+
+        return publisher
+
+    publisher = asyncio.run(run())
+    (segments,) = publisher.redis.lists.values()
+    assert segments == [FRAME * 3, FRAME * 2]
+    assert publisher.buffer.pending == 0
+
+
+if __name__ == "__main__":
+    test_reorder_buffer_releases_in_order()
+    test_reorder_buffer_skips_failed_segments()
+    test_publisher_skips_unparseable_segment()
+    print("audiocast_stream tests passed")
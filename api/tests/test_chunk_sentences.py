@@ -0,0 +1,50 @@
+from src.utils.audio_manager_utils import ContentSplitter
+
+chunk_sentences = ContentSplitter.chunk_sentences
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_sentences("One sentence. Another one.", 100) == ["One sentence. Another one."]
+
+
+def test_sentences_are_packed_whole():
+    text = "First sentence here. Second one! Is this the third? Fourth."
+    chunks = chunk_sentences(text, 35)
+
+    assert chunks == ["First sentence here. Second one!", "Is this the third? Fourth."]
+    assert all(len(chunk) <= 35 for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_quoted_sentence_ends():
+    text = 'He said "stop." Then he left.'
+    assert chunk_sentences(text, 16) == ['He said "stop."', "Then he left."]
+
+
+def test_long_sentence_splits_at_clauses_then_words():
+    text = "A long sentence, with clauses; and words without punctuation that go on and on"
+    chunks = chunk_sentences(text, 20)
+
+    assert chunks[:2] == ["A long sentence,", "with clauses;"]
+    assert all(len(chunk) <= 20 for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_split_long_turns_keeps_speaker_and_turn():
+    turns = [("Speaker1", "Short turn."), ("Speaker2", "One sentence here. Another sentence here.")]
+    segments = ContentSplitter().split_long_turns(turns, 25)
+
+    assert segments == [
+        ("Speaker1", "Short turn.", 1),
+        ("Speaker2", "One sentence here.", 2),
+        ("Speaker2", "Another sentence here.", 2),
+    ]
+
+
+if __name__ == "__main__":
+    test_short_text_is_one_chunk()
+    test_sentences_are_packed_whole()
+    test_quoted_sentence_ends()
+    test_long_sentence_splits_at_clauses_then_words()
+    test_split_long_turns_keeps_speaker_and_turn()
+    print("chunk_sentences tests passed")
@@ -0,0 +1,99 @@
+import os
+import tempfile
+
+from src.utils.mp3_concat import (
+    build_info_frame,
+    can_concat_frames,
+    iter_audio_frames,
+    merge_mp3_files,
+    parse_frame_header,
+    probe_mp3,
+    strip_to_frames,
+)
+
+# MPEG-2 layer III, 24 kHz, mono, 64 kbps, no CRC: the format of the TTS segments
+FRAME_HEADER = bytes([0xFF, 0xF3, 0x84, 0xC4])
+FRAME_LENGTH = 192
+SAMPLES_PER_FRAME = 576
+
+
+def make_frames(count: int) -> list[bytes]:
+    """silent frames, each tagged in its last byte so they can be told apart"""
+    return [FRAME_HEADER + bytes(FRAME_LENGTH - 5) + bytes([index % 256]) for index in range(count)]
+
+
+def make_mp3(frame_count: int, delay=576, padding=1200, id3=True) -> bytes:
+    frames = make_frames(frame_count)
+    info_frame = build_info_frame([memoryview(frame) for frame in frames], delay, padding)
+    tag = b"ID3\x04\x00\x00\x00\x00\x00\x0a" + bytes(10) if id3 else b""
+    return tag + info_frame + b"".join(frames)
+
+
+def test_parse_frame_header():
+    header = parse_frame_header(FRAME_HEADER, 0)
+    assert header
+    assert (header.version, header.layer, header.sample_rate, header.channels) == (2, 3, 24000, 1)
+    assert header.frame_length == FRAME_LENGTH
+    assert header.samples_per_frame == SAMPLES_PER_FRAME
+
+    assert parse_frame_header(b"\x00\x00\x00\x00", 0) is None
+    # reserved sample rate index
+    assert parse_frame_header(bytes([0xFF, 0xF3, 0x8C, 0xC4]), 0) is None
+
+
+def test_probe_reads_info_frame():
+    data = make_mp3(10, delay=576, padding=1200)
+    info = probe_mp3(data)
+
+    assert info.audio_start == 20
+    assert info.has_info_frame
+    assert (info.encoder_delay, info.encoder_padding) == (576, 1200)
+    assert len(list(iter_audio_frames(data, info))) == 10
+    assert strip_to_frames(data) == b"".join(make_frames(10))
+
+
+def test_concat_trims_whole_frames_and_writes_one_info_frame():
+    segments = [make_mp3(10, delay=1152, padding=1700) for _ in range(3)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for index, data in enumerate(segments):
+            paths.append(os.path.join(tmp, f"{index}.mp3"))
+            with open(paths[-1], "wb") as f:
+                f.write(data)
+
+        output = os.path.join(tmp, "merged.mp3")
+        assert merge_mp3_files(paths, output) == "frames"
+        with open(output, "rb") as f:
+            merged = f.read()
+
+    info = probe_mp3(merged)
+    assert info.audio_start == 0
+    # the first segment's delay and the last segment's padding
+    assert (info.encoder_delay, info.encoder_padding) == (1152, 1700)
+
+    # inner boundaries drop 1152 // 576 = 2 leading and (1700 - 529) // 576 = 2 trailing frames
+    frames = list(iter_audio_frames(merged, info))
+    assert len(frames) == 8 + 6 + 8
+    assert [frame[-1] for frame in frames[:9]] == [0, 1, 2, 3, 4, 5, 6, 7, 2]
+
+    xing_offset = 4 + 9
+    assert merged[xing_offset : xing_offset + 4] == b"Info"
+    assert int.from_bytes(merged[xing_offset + 8 : xing_offset + 12], "big") == len(frames)
+    assert int.from_bytes(merged[xing_offset + 12 : xing_offset + 16], "big") == len(merged)
+
+
+def test_concat_requires_matching_streams():
+    mono = probe_mp3(make_mp3(2))
+    stereo = probe_mp3(make_mp3(2))
+    stereo.channels = 2
+    assert can_concat_frames([mono, mono])
+    assert not can_concat_frames([mono, stereo])
+
+
+if __name__ == "__main__":
+    test_parse_frame_header()
+    test_probe_reads_info_frame()
+    test_concat_trims_whole_frames_and_writes_one_info_frame()
+    test_concat_requires_matching_streams()
+    print("mp3_concat tests passed")
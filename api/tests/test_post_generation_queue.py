@@ -0,0 +1,188 @@
+import asyncio
+import os
+import tempfile
+from time import time
+
+from src.services import storage_backends
+from src.services.storage import BLOB_BASE_URI, StorageManager
+from src.services.storage_backends import get_storage_backend
+from src.utils import post_generation
+from src.utils.post_generation import PostGenerationWorker, enqueue_post_generation
+from src.utils.post_generation_queue import RETRY_BACKOFF, LocalJobQueue, PostGenerationJob
+
+
+class SessionStatus:
+    """the session updates post_generation makes, kept in memory instead of Firestore"""
+
+    updates: dict[str, dict[str, str]] = {}
+
+    @classmethod
+    def _update_post_generation(cls, doc_id: str, stage: str, status: str, flush=False):
+        """record a stage status"""
+        cls.updates.setdefault(doc_id, {})[stage] = status
+
+    @staticmethod
+    def flush_session(doc_id: str):
+        """nothing is buffered here"""
+
+
+def make_job(**stages: str) -> PostGenerationJob:
+    return PostGenerationJob(
+        session_id="test-session",
+        category="podcast",
+        audio_path="/tmp/test-session.mp3",
+        audio_script="",
+        stages=stages or {"upload": "pending", "transcript": "pending"},  # type: ignore
+    )
+
+
+def test_claimed_job_is_hidden_until_its_deadline():
+    async def run():
+        queue = LocalJobQueue()
+        job = make_job()
+        await queue.enqueue(job)
+
+        claimed = await queue.claim(visibility_timeout=0.05)
+        assert claimed and claimed.id == job.id and claimed.attempts == 1
+        assert await queue.claim() is None
+
+        # a worker that stops extending its claim loses the job
+        await asyncio.sleep(0.06)
+        redelivered = await queue.claim(visibility_timeout=60)
+        assert redelivered and redelivered.id == job.id and redelivered.attempts == 2
+
+        await queue.extend(redelivered, visibility_timeout=60)
+        assert await queue.claim() is None
+
+        await queue.ack(redelivered)
+        assert queue.jobs == {} and queue.inflight == {}
+
+    asyncio.run(run())
+
+
+def test_redelivered_job_keeps_its_progress():
+    async def run():
+        queue = LocalJobQueue()
+        await queue.enqueue(make_job())
+
+        job = await queue.claim(visibility_timeout=0)
+        assert job
+        job.stages["upload"] = "done"
+        await queue.save(job)
+
+        redelivered = await queue.claim()
+        assert redelivered and redelivered.pending_stages() == ["transcript"]
+
+    asyncio.run(run())
+
+
+def test_failed_job_is_retried_with_backoff():
+    async def run():
+        queue = LocalJobQueue()
+        await queue.enqueue(make_job())
+        job = await queue.claim()
+        assert job
+
+        await PostGenerationWorker(queue, max_attempts=3)._fail(job, permanent=False)
+        assert queue.inflight == {} and queue.dead_jobs == []
+        assert queue.scheduled[job.id] >= time() + RETRY_BACKOFF - 1
+        assert await queue.claim() is None
+
+    asyncio.run(run())
+
+
+def test_failed_job_is_dead_lettered():
+    async def run():
+        queue = LocalJobQueue()
+        worker = PostGenerationWorker(queue, max_attempts=2)
+
+        # out of attempts
+        await queue.enqueue(make_job())
+        job = await queue.claim()
+        assert job
+        await queue.retry(job, delay=0)
+        job = await queue.claim()
+        assert job and job.attempts == 2
+        await worker._fail(job, permanent=False)
+
+        # or failed in a way retrying cannot fix
+        await queue.enqueue(make_job())
+        job = await queue.claim()
+        assert job
+        await worker._fail(job, permanent=True)
+
+        assert len(queue.dead_jobs) == 2
+        assert queue.inflight == {} and queue.scheduled == {}
+
+    asyncio.run(run())
+
+
+def test_enqueue_uploads_audio_and_cleans_up():
+    backend, session_manager = storage_backends.STORAGE_BACKEND, post_generation.SessionManager
+    storage_backends.STORAGE_BACKEND = "memory"
+    post_generation.SessionManager = SessionStatus  # type: ignore
+    get_storage_backend.reset()
+
+    async def run():
+        queue = LocalJobQueue()
+        with tempfile.TemporaryDirectory() as tmp:
+            job = make_job(upload="pending", transcript="pending")
+            job.audio_path = os.path.join(tmp, "audio.mp3")
+            with open(job.audio_path, "wb") as f:
+                f.write(b"audio")
+
+            await enqueue_post_generation(job, queue, shared_host=False)
+            assert not os.path.exists(job.audio_path)
+
+        # a worker on any machine finds the audio in storage and skips the upload
+        assert StorageManager().blob_exists(f"{BLOB_BASE_URI}/{job.session_id}")
+        assert SessionStatus.updates[job.session_id] == {"upload": "done", "transcript": "pending"}
+        claimed = await queue.claim()
+        assert claimed and claimed.pending_stages() == ["transcript"]
+
+    try:
+        asyncio.run(run())
+    finally:
+        storage_backends.STORAGE_BACKEND, post_generation.SessionManager = backend, session_manager
+        get_storage_backend.reset()
+
+
+def test_enqueue_on_shared_host_keeps_local_audio():
+    backend, session_manager = storage_backends.STORAGE_BACKEND, post_generation.SessionManager
+    storage_backends.STORAGE_BACKEND = "memory"
+    post_generation.SessionManager = SessionStatus  # type: ignore
+    get_storage_backend.reset()
+
+    async def run():
+        queue = LocalJobQueue()
+        with tempfile.TemporaryDirectory() as tmp:
+            job = make_job(upload="pending", transcript="pending")
+            job.session_id = "shared-session"
+            job.audio_path = os.path.join(tmp, "audio.mp3")
+            with open(job.audio_path, "wb") as f:
+                f.write(b"audio")
+
+            await enqueue_post_generation(job, queue, shared_host=True)
+            assert os.path.exists(job.audio_path)
+
+        # the worker uploads the audio itself, from the local copy
+        assert not StorageManager().blob_exists(f"{BLOB_BASE_URI}/{job.session_id}")
+        assert SessionStatus.updates[job.session_id] == {"upload": "pending", "transcript": "pending"}
+        claimed = await queue.claim()
+        assert claimed and claimed.pending_stages() == ["upload", "transcript"]
+
+    try:
+        asyncio.run(run())
+    finally:
+        storage_backends.STORAGE_BACKEND, post_generation.SessionManager = backend, session_manager
+        get_storage_backend.reset()
+
+
+if __name__ == "__main__":
+    test_claimed_job_is_hidden_until_its_deadline()
+    test_redelivered_job_keeps_its_progress()
+    test_failed_job_is_retried_with_backoff()
+    test_failed_job_is_dead_lettered()
+    test_enqueue_uploads_audio_and_cleans_up()
+    test_enqueue_on_shared_host_keeps_local_audio()
+    print("post_generation_queue tests passed")
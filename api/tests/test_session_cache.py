@@ -0,0 +1,110 @@
+from google.cloud import firestore
+
+from src.utils.session_cache import SessionCache, apply_update, merge_fields, request_scope
+
+
+def test_apply_update_dotted_paths():
+    data = {"metadata": {"source": "a", "title": "t"}, "status": "collating"}
+
+    assert apply_update(data, {"metadata.source": "b", "post_generation.upload": "done", "status": "generating"})
+    assert data == {
+        "metadata": {"source": "b", "title": "t"},
+        "post_generation": {"upload": "done"},
+        "status": "generating",
+    }
+
+    assert apply_update(data, {"metadata.title": firestore.DELETE_FIELD})
+    assert data["metadata"] == {"source": "b"}
+
+
+def test_apply_update_array_transforms():
+    data = {"chats": [{"id": "1"}]}
+
+    assert apply_update(data, {"chats": firestore.ArrayUnion([{"id": "1"}, {"id": "2"}])})
+    assert data["chats"] == [{"id": "1"}, {"id": "2"}]
+
+    assert apply_update(data, {"chats": firestore.ArrayRemove([{"id": "1"}])})
+    assert data["chats"] == [{"id": "2"}]
+
+    # only Firestore can compute these
+    assert not apply_update(data, {"updated_at": firestore.SERVER_TIMESTAMP})
+    assert not apply_update(data, {"count": firestore.Increment(1)})
+
+
+def test_merge_fields_combines_array_unions():
+    pending = {}
+    merge_fields(pending, {"chats": firestore.ArrayUnion([{"id": "1"}]), "status": "collating"})
+    merge_fields(pending, {"chats": firestore.ArrayUnion([{"id": "2"}]), "status": "generating"})
+
+    assert pending["status"] == "generating"
+    assert isinstance(pending["chats"], firestore.ArrayUnion)
+    assert pending["chats"].values == [{"id": "1"}, {"id": "2"}]
+
+    # a different transform replaces the earlier one
+    merge_fields(pending, {"chats": firestore.ArrayRemove([{"id": "1"}])})
+    assert isinstance(pending["chats"], firestore.ArrayRemove)
+
+
+def test_updates_are_coalesced_into_one_write():
+    writes = []
+    cache = SessionCache(lambda doc_id, fields: writes.append((doc_id, fields)), ttl=60, window=60)
+    cache.set("s1", {"status": "collating", "metadata": {"source": ""}})
+
+    cache.update("s1", {"metadata.source": "content"})
+    cache.update("s1", {"status": "generating"})
+    assert writes == []
+
+    # the cached copy reads its own writes
+    cached = cache.get("s1")
+    assert cached and cached.data == {"status": "generating", "metadata": {"source": "content"}}
+
+    cache.update("s1", {"metadata.title": "title"}, flush=True)
+    assert writes == [("s1", {"metadata.source": "content", "status": "generating", "metadata.title": "title"})]
+
+    cache.flush("s1")
+    assert len(writes) == 1
+
+
+def test_failed_write_drops_cached_copy():
+    def write(doc_id, fields):
+        raise RuntimeError("Firestore unavailable")
+
+    cache = SessionCache(write, ttl=60, window=60)
+    cache.set("s1", {"status": "collating"})
+    cache.update("s1", {"status": "generating"})
+
+    try:
+        cache.flush("s1")
+    except RuntimeError:
+        pass
+    assert cache.get("s1") is None
+
+
+def test_zero_ttl_does_not_cache_reads():
+    cache = SessionCache(lambda doc_id, fields: None, ttl=0, window=60)
+    cache.set("s1", {"status": "collating"})
+    assert cache.get("s1") is None
+
+
+def test_request_scope_caches_reads_whatever_the_ttl():
+    cache = SessionCache(lambda doc_id, fields: None, ttl=0, window=60)
+
+    with request_scope():
+        cache.set("s1", {"status": "collating"})
+        cache.update("s1", {"status": "generating"})
+        cached = cache.get("s1")
+        assert cached and cached.data == {"status": "generating"}
+
+    # the next request reads Firestore again
+    assert cache.get("s1") is None
+
+
+if __name__ == "__main__":
+    test_apply_update_dotted_paths()
+    test_apply_update_array_transforms()
+    test_merge_fields_combines_array_unions()
+    test_updates_are_coalesced_into_one_write()
+    test_failed_write_drops_cached_copy()
+    test_zero_ttl_does_not_cache_reads()
+    test_request_scope_caches_reads_whatever_the_ttl()
+    print("session_cache tests passed")
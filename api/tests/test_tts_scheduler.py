@@ -0,0 +1,132 @@
+import asyncio
+from concurrent.futures import Future
+from contextlib import suppress
+
+from src.utils.tts_scheduler import TTSScheduler, TTSSchedulerConfig
+
+
+def make_scheduler(max_concurrency=1) -> TTSScheduler:
+    # rate limits high enough to never hold a slot back
+    return TTSScheduler(
+        TTSSchedulerConfig(max_concurrency=max_concurrency, requests_per_minute=10**6, chars_per_minute=10**9)
+    )
+
+
+async def hold_slot(scheduler: TTSScheduler, session_id: str, entered: asyncio.Event, release: asyncio.Event):
+    async with scheduler.slot(session_id, 1):
+        entered.set()
+        await release.wait()
+
+
+async def take_slot(scheduler: TTSScheduler, session_id: str):
+    async with scheduler.slot(session_id, 1):
+        pass
+
+
+async def wait_until_idle(scheduler: TTSScheduler):
+    for _ in range(100):
+        stats = scheduler.stats()
+        if stats.running == 0 and stats.queue_depth == 0:
+            return
+        await asyncio.sleep(0.01)
+
+
+def test_sessions_take_turns():
+    async def run():
+        scheduler = make_scheduler()
+        order = []
+
+        async def job(session_id: str):
+            async with scheduler.slot(session_id, 1):
+                order.append(session_id)
+
+        # queue every job behind a busy slot, so they are all waiting when it frees up
+        entered, release = asyncio.Event(), asyncio.Event()
+        blocker = asyncio.create_task(hold_slot(scheduler, "blocker", entered, release))
+        await entered.wait()
+        jobs = [asyncio.create_task(job(session_id)) for session_id in ["a", "a", "a", "a", "b", "b"]]
+        await asyncio.sleep(0.05)
+        assert scheduler.stats().queue_depth == 6
+
+        release.set()
+        await asyncio.gather(blocker, *jobs)
+        return order
+
+    # one long audiocast does not hold back the other session
+    assert asyncio.run(run()) == ["a", "b", "a", "b", "a", "a"]
+
+
+def test_slot_is_released_on_error():
+    async def run():
+        scheduler = make_scheduler()
+        try:
+            async with scheduler.slot("a", 1):
+                raise RuntimeError("TTS failed")
+        except RuntimeError:
+            pass
+
+        await wait_until_idle(scheduler)
+        stats = scheduler.stats()
+        assert (stats.running, stats.completed, stats.cancelled) == (0, 1, 0)
+
+        # the slot can be taken again
+        await asyncio.wait_for(take_slot(scheduler, "a"), timeout=1)
+
+    asyncio.run(run())
+
+
+def test_slot_is_released_when_waiter_is_cancelled():
+    async def run():
+        scheduler = make_scheduler()
+        entered, release = asyncio.Event(), asyncio.Event()
+        blocker = asyncio.create_task(hold_slot(scheduler, "blocker", entered, release))
+        await entered.wait()
+
+        waiter = asyncio.create_task(hold_slot(scheduler, "a", asyncio.Event(), asyncio.Event()))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        release.set()
+        await blocker
+
+        await wait_until_idle(scheduler)
+        stats = scheduler.stats()
+        # the cancelled ticket neither ran nor counts as completed
+        assert (stats.running, stats.queue_depth) == (0, 0)
+        assert (stats.completed, stats.cancelled) == (1, 1)
+
+        await asyncio.wait_for(take_slot(scheduler, "b"), timeout=1)
+
+    asyncio.run(run())
+
+
+def test_slot_granted_while_waiter_is_cancelled_is_released():
+    async def run():
+        scheduler = make_scheduler()
+
+        # the dispatcher has taken the slot but not handed it over yet
+        granted = Future()
+        granted.set_running_or_notify_cancel()
+        with scheduler._cond:
+            scheduler._running += 1
+        scheduler._enqueue = lambda session_id, ticket: granted  # type: ignore
+
+        waiter = asyncio.create_task(take_slot(scheduler, "a"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with suppress(asyncio.CancelledError):
+            await waiter
+        assert scheduler.stats().running == 1
+
+        granted.set_result(None)
+        stats = scheduler.stats()
+        assert (stats.running, stats.completed, stats.cancelled) == (0, 0, 1)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_sessions_take_turns()
+    test_slot_is_released_on_error()
+    test_slot_is_released_when_waiter_is_cancelled()
+    test_slot_granted_while_waiter_is_cancelled_is_released()
+    print("tts_scheduler tests passed")